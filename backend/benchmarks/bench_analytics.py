@@ -0,0 +1,124 @@
+"""Benchmark for the vectorized analytics against a per-item Python loop.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_analytics
+
+Synthetic data: 500 items with a 12-month plan and 10 years of monthly actuals, in cents.
+Reports build (rows -> arrays) and compute time for the NumPy implementation and the
+same metrics computed item by item with plain Python loops.
+"""
+import random
+import time
+from types import SimpleNamespace
+
+from services.analytics import ROLLING_WINDOWS, build_matrix, compute_analytics
+from services.finance_engine import CATEGORIES, POSITIVE_CATEGORIES
+
+N_ITEMS = 500
+YEARS = list(range(2016, 2026))
+REPEAT = 3
+
+def make_data(n_items: int = N_ITEMS, years=YEARS, seed: int = 42):
+    rng = random.Random(seed)
+    items = [SimpleNamespace(id=i, name=f"Item {i}", category=rng.choice(CATEGORIES)) for i in range(1, n_items + 1)]
+    planned_rows = [(item.id, month, rng.randint(0, 200_000)) for item in items for month in range(1, 13)]
+    actual_rows = [
+        (item.id, year, month, rng.randint(0, 200_000))
+        for item in items for year in years for month in range(1, 13) if rng.random() < 0.8
+    ]
+    return items, planned_rows, actual_rows
+
+def _round(value):
+    return None if value is None else round(value, 2)
+
+def _money(cents):
+    return None if cents is None else round(cents / 100, 2)
+
+def naive_analytics(items, planned_rows, actual_rows, year: int, elapsed: int):
+    """Reference implementation: one pass per item and per category with dicts and loops."""
+    planned = {}
+    for item_id, month, amount in planned_rows:
+        planned.setdefault(item_id, {})
+        planned[item_id][month] = planned[item_id].get(month, 0) + amount
+    actual = {}
+    for item_id, row_year, month, amount in actual_rows:
+        key = (row_year, month)
+        actual.setdefault(item_id, {})
+        actual[item_id][key] = actual[item_id].get(key, 0) + amount
+    years = sorted({y for rows in actual.values() for y, _ in rows} | {year - 1, year})
+    years = list(range(years[0], years[-1] + 1))
+
+    rolling = {}
+    for category in CATEGORIES:
+        timeline = []
+        for y in years:
+            for month in range(1, 13):
+                total = 0
+                for item in items:
+                    if item.category == category:
+                        total += actual.get(item.id, {}).get((y, month), 0)
+                timeline.append(total)
+        start = years.index(year) * 12
+        points = []
+        for m in range(12):
+            t = start + m
+            point = {"month": m + 1, "actual": _money(timeline[t])}
+            for window in ROLLING_WINDOWS:
+                point[f"avg_{window}"] = _money(sum(timeline[t - window + 1:t + 1]) / window) if t >= window - 1 else None
+            points.append(point)
+        rolling[category] = points
+
+    year_over_year, projections = [], []
+    categories = {c: {"ytd_actual": 0, "projected": 0.0, "planned": 0} for c in CATEGORIES}
+    for item in sorted(items, key=lambda i: i.id):
+        rows = actual.get(item.id, {})
+        current = sum(rows.get((year, m), 0) for m in range(1, 13))
+        previous = sum(rows.get((year - 1, m), 0) for m in range(1, 13))
+        delta = current - previous
+        year_over_year.append({
+            "budget_item_id": item.id, "actual": _money(current), "previous_actual": _money(previous),
+            "delta": _money(delta), "delta_pct": _round(delta / abs(previous) * 100) if previous else None,
+        })
+        ytd = sum(rows.get((year, m), 0) for m in range(1, elapsed + 1))
+        projected = ytd / elapsed * 12 if elapsed else None
+        plan = sum(planned.get(item.id, {}).values())
+        diff = None
+        if projected is not None:
+            diff = projected - plan if item.category in POSITIVE_CATEGORIES else plan - projected
+        projections.append({
+            "budget_item_id": item.id, "ytd_actual": _money(ytd), "projected": _money(projected),
+            "planned": _money(plan), "projected_diff": _money(diff),
+        })
+        totals = categories[item.category]
+        totals["ytd_actual"] += ytd
+        totals["projected"] += projected or 0.0
+        totals["planned"] += plan
+    categories = {c: {k: _money(v) for k, v in totals.items()} for c, totals in categories.items()}
+    return {"rolling": rolling, "year_over_year": year_over_year, "projection": projections, "categories": categories}
+
+def best_of(fn, repeat: int = REPEAT) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def run():
+    items, planned_rows, actual_rows = make_data()
+    year, elapsed = YEARS[-1], 9
+    print(f"{N_ITEMS} items x {len(YEARS)} years, {len(planned_rows) + len(actual_rows)} rows")
+
+    build = best_of(lambda: build_matrix(items, planned_rows, actual_rows, years=(year - 1, year)))
+    matrix = build_matrix(items, planned_rows, actual_rows, years=(year - 1, year))
+    compute = best_of(lambda: compute_analytics(matrix, year, elapsed))
+    naive = best_of(lambda: naive_analytics(items, planned_rows, actual_rows, year, elapsed))
+
+    print(f"{'numpy build':<16} {build * 1000:>9.2f} ms")
+    print(f"{'numpy compute':<16} {compute * 1000:>9.2f} ms")
+    print(f"{'numpy total':<16} {(build + compute) * 1000:>9.2f} ms")
+    print(f"{'python loops':<16} {naive * 1000:>9.2f} ms  ({naive / (build + compute):.1f}x slower)")
+
+if __name__ == "__main__":
+    run()
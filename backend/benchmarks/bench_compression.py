@@ -0,0 +1,81 @@
+"""Payload size and latency of dashboard and transaction-list responses per encoding.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_compression
+
+Builds a typical /dashboard/summary (300 budget items) and a 500-row and 10k-row
+/transactions/ page, serves them through CompressionMiddleware in-process and reports,
+for identity, gzip and brotli at a few levels:
+
+  KB        bytes on the wire
+  ratio     uncompressed / compressed
+  local     in-process request time: encode, compress and decode (best of REPEAT)
+  <link>    local time + modelled transfer (one RTT + size / bandwidth) per link profile
+"""
+import asyncio
+import time
+
+from httpx import ASGITransport, AsyncClient
+from starlette.applications import Starlette
+from starlette.routing import Route
+
+from benchmarks.bench_finance_engine import make_data
+from benchmarks.bench_list_serialization import make_rows
+from services.compression import CompressionMiddleware, brotli_available
+from services.fast_json import FastJSONResponse
+from services.finance_engine import summarize
+
+REPEAT = 5
+# name -> (bandwidth in bytes per second, round trip in seconds)
+LINKS = {"3g": (750_000 / 8, 0.300), "4g": (9_000_000 / 8, 0.070), "wifi": (50_000_000 / 8, 0.020)}
+SETTINGS = [("identity", None), ("gzip", 1), ("gzip", 6), ("gzip", 9), ("br", 4), ("br", 5), ("br", 8)]
+
+def payloads():
+    items, planned_rows, actual_rows = make_data(300, 20_000)
+    summary = summarize(items, planned_rows, actual_rows)
+    _, transactions = make_rows()
+    return {
+        "dashboard summary": summary,
+        "transactions x500": transactions[:500],
+        "transactions x10k": transactions,
+    }
+
+def make_app(bodies, encoding, level):
+    async def endpoint(request):
+        return FastJSONResponse(bodies[request.path_params["name"]])
+
+    app = Starlette(routes=[Route("/{name}", endpoint)])
+    if encoding == "identity":
+        return app
+    return CompressionMiddleware(
+        app, encodings=[encoding], minimum_size=1024,
+        gzip_level=level or 6, brotli_quality=level or 5,
+    )
+
+async def measure(bodies, encoding, level):
+    results = {}
+    async with AsyncClient(transport=ASGITransport(app=make_app(bodies, encoding, level)), base_url="http://bench") as client:
+        for name in bodies:
+            best = float("inf")
+            for _ in range(REPEAT):
+                start = time.perf_counter()
+                response = await client.get(f"/{name}", headers={"Accept-Encoding": encoding})
+                best = min(best, time.perf_counter() - start)
+            # Content-Length is the size on the wire; httpx has already decoded the body
+            results[name] = (best, int(response.headers["content-length"]), len(response.content))
+    return results
+
+async def main():
+    bodies = {name.replace(" ", "-"): body for name, body in payloads().items()}
+    print(f"{'response':<20} {'encoding':<10} {'KB':>8} {'ratio':>6} {'local ms':>10}" + "".join(f" {link + ' ms':>9}" for link in LINKS))
+    for encoding, level in SETTINGS:
+        if encoding == "br" and not brotli_available():
+            continue
+        label = encoding if level is None else f"{encoding}-{level}"
+        for name, (local, size, raw) in (await measure(bodies, encoding, level)).items():
+            links = "".join(f" {(local + rtt + size / bandwidth) * 1000:>9.0f}" for bandwidth, rtt in LINKS.values())
+            print(f"{name.replace('-', ' '):<20} {label:<10} {size / 1024:>8.1f} {raw / size:>6.1f} {local * 1000:>10.2f}{links}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
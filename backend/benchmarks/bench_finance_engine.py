@@ -0,0 +1,46 @@
+"""Micro-benchmark for the dashboard accumulator.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_finance_engine
+
+Grows items and transactions together and reports the cost per input row.
+A flat "us/row" column means the summary scales linearly in items + transactions.
+"""
+import random
+import time
+from datetime import date
+from types import SimpleNamespace
+
+from services.finance_engine import CATEGORIES, summarize
+
+SIZES = [(150, 5_000), (300, 10_000), (600, 20_000), (1_200, 40_000), (2_400, 80_000)]
+REPEAT = 5
+
+def make_data(n_items: int, n_transactions: int, seed: int = 42):
+    rng = random.Random(seed)
+    items = [
+        SimpleNamespace(id=i, name=f"Item {i}", category=rng.choice(CATEGORIES), type=rng.choice(["active", "passive"]))
+        for i in range(1, n_items + 1)
+    ]
+    planned_rows = [(item.id, month, rng.randint(0, 200_000)) for item in items for month in range(1, 13)]
+    actual_rows = [
+        (rng.randint(1, n_items), date(2024, rng.randint(1, 12), rng.randint(1, 28)).month, rng.randint(1, 50_000))
+        for _ in range(n_transactions)
+    ]
+    return items, planned_rows, actual_rows
+
+def run():
+    print(f"{'items':>7} {'transactions':>13} {'best ms':>9} {'us/row':>8}")
+    for n_items, n_transactions in SIZES:
+        items, planned_rows, actual_rows = make_data(n_items, n_transactions)
+        best = float("inf")
+        for _ in range(REPEAT):
+            start = time.perf_counter()
+            summarize(items, planned_rows, actual_rows)
+            best = min(best, time.perf_counter() - start)
+        rows = n_items + len(planned_rows) + n_transactions
+        print(f"{n_items:>7} {n_transactions:>13} {best * 1000:>9.2f} {best * 1e6 / rows:>8.3f}")
+
+if __name__ == "__main__":
+    run()
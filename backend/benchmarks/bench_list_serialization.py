@@ -0,0 +1,103 @@
+"""Benchmark for the list response paths of GET /transactions/.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_list_serialization
+
+Serializes a page of 10k transactions, plain and with expand=budget_item.monthly_values,
+three ways:
+
+  orm + pydantic   ORM instances validated and dumped through the response model (before,
+                   expanded pages only)
+  dict + pydantic  the dict rows the routes build now, still through the response model
+  dict + orjson    the same rows with ?fast=true: no validation, orjson encoding (after)
+
+Row construction and the database are left out; only serialization is timed.
+"""
+import random
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import List
+
+from pydantic import TypeAdapter
+
+import main # noqa: F401, registers every model for the ORM constructors
+from models.budget_item import BudgetItem
+from models.monthly_value import MonthlyValue
+from models.transaction import Transaction
+from schemas import schemas
+from services.fast_json import FastJSONResponse
+from services.finance_engine import CATEGORIES
+
+N_TRANSACTIONS = 10_000
+N_ITEMS = 50
+REPEAT = 5
+
+def make_rows(seed: int = 42):
+    rng = random.Random(seed)
+    items = []
+    for i in range(1, N_ITEMS + 1):
+        values = [
+            {"budget_item_id": i, "month": m, "planned_amount": Decimal(rng.randint(0, 200_000)) / 100, "id": i * 12 + m}
+            for m in range(1, 13)
+        ]
+        items.append({
+            "name": f"Item {i}", "category": rng.choice(CATEGORIES), "sub_category": None,
+            "type": "active", "is_active": True, "id": i, "monthly_values": values,
+        })
+    start = date(2024, 1, 1)
+    transactions = [
+        {"date": start + timedelta(days=rng.randint(0, 364)), "amount": Decimal(rng.randint(1, 50_000)) / 100,
+         "budget_item_id": rng.randint(1, N_ITEMS), "comment": rng.choice([None, "groceries", "monthly"]), "id": i}
+        for i in range(1, N_TRANSACTIONS + 1)
+    ]
+    return items, transactions
+
+def expanded(items, transactions):
+    by_id = {item["id"]: item for item in items}
+    return [{**tx, "budget_item": by_id[tx["budget_item_id"]]} for tx in transactions]
+
+def as_orm(items, transactions):
+    orm_items = {}
+    for item in items:
+        values = [MonthlyValue(**value) for value in item["monthly_values"]]
+        orm_items[item["id"]] = BudgetItem(**{k: v for k, v in item.items() if k != "monthly_values"}, monthly_values=values)
+    return [Transaction(**tx, budget_item=orm_items[tx["budget_item_id"]]) for tx in transactions]
+
+def best_of(fn, repeat: int = REPEAT) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def run():
+    adapter = TypeAdapter(List[schemas.Transaction])
+    items, transactions = make_rows()
+
+    def pydantic_path(rows, from_attributes):
+        # What FastAPI does with response_model: validate, then dump to JSON bytes
+        return adapter.dump_json(adapter.validate_python(rows, from_attributes=from_attributes), exclude_unset=True)
+
+    print(f"{N_TRANSACTIONS} transactions, {N_ITEMS} budget items")
+    print(f"{'':<14} {'path':<16} {'best ms':>9} {'KB':>7} {'speedup':>8}")
+    for label, expand in (("plain", False), ("expand", True)):
+        rows = expanded(items, transactions) if expand else transactions
+        results = {
+            "dict + pydantic": lambda: pydantic_path(rows, False),
+            "dict + orjson": lambda: FastJSONResponse(rows).body,
+        }
+        if expand:
+            # The expansion used to serialize ORM items; the plain page was already built from columns
+            orm_rows = as_orm(items, transactions)
+            results = {"orm + pydantic": lambda: pydantic_path(orm_rows, True), **results}
+        baseline = None
+        for path, fn in results.items():
+            elapsed = best_of(fn)
+            baseline = baseline or elapsed
+            print(f"{label:<14} {path:<16} {elapsed * 1000:>9.2f} {len(fn()) / 1024:>7.0f} {baseline / elapsed:>7.1f}x")
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,74 @@
+"""Benchmark for the Excel template reader behind POST /import/workbook.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_workbook_import
+
+Parses the bundled "Yearly Budget Template.xlsm" as shipped, then copies of it with a
+growing transaction log. Peak Python memory (tracemalloc) should stay roughly flat as
+the log grows, since the sheets are streamed row by row; time grows linearly.
+"""
+import os
+import random
+import shutil
+import tempfile
+import time
+import tracemalloc
+import warnings
+from datetime import date, timedelta
+
+import openpyxl
+
+from services.workbook import TRANSACTIONS_SHEET, TemplateWorkbook
+
+TEMPLATE = os.path.join(os.path.dirname(__file__), "..", "..", "Yearly Budget Template.xlsm")
+EXTRA_ROWS = [0, 10_000, 50_000, 100_000]
+CATEGORIES = [("Income", "Student Job"), ("Expenses", "Rent"), ("Expenses", "Groceries"), ("Debt", "Student Loan"), ("Savings_Investments", "Investing")]
+
+def make_copy(extra_rows: int, directory: str, seed: int = 42) -> str:
+    path = os.path.join(directory, f"template_{extra_rows}.xlsm")
+    if not extra_rows:
+        shutil.copy(TEMPLATE, path)
+        return path
+    rng = random.Random(seed)
+    book = openpyxl.load_workbook(TEMPLATE, keep_vba=True)
+    sheet = book[TRANSACTIONS_SHEET]
+    start = date(2025, 1, 1)
+    for _ in range(extra_rows):
+        category, name = rng.choice(CATEGORIES)
+        sheet.append([None, start + timedelta(days=rng.randint(0, 364)), category, name, rng.randint(1, 50_000) / 100, "synthetic"])
+    book.save(path)
+    return path
+
+def parse(path: str):
+    with open(path, "rb") as f:
+        book = TemplateWorkbook(f)
+        try:
+            book.settings()
+            lines = sum(1 for _ in book.budget_lines())
+            transactions = sum(1 for _ in book.transactions())
+        finally:
+            book.close()
+    return lines, transactions
+
+def run():
+    warnings.simplefilter("ignore") # openpyxl warns about unsupported extensions in the template
+    print(f"{'transactions':>13} {'file KB':>9} {'parse ms':>10} {'us/row':>8} {'peak KB':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        for extra_rows in EXTRA_ROWS:
+            path = make_copy(extra_rows, directory)
+            start = time.perf_counter()
+            _, transactions = parse(path)
+            elapsed = time.perf_counter() - start
+            # Separate pass: tracemalloc slows allocation-heavy code several times over
+            tracemalloc.start()
+            parse(path)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(
+                f"{transactions:>13} {os.path.getsize(path) / 1024:>9.0f} {elapsed * 1000:>10.1f} "
+                f"{elapsed * 1e6 / transactions:>8.2f} {peak / 1024:>9.0f}"
+            )
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,81 @@
+"""Load test: /dashboard/summary latency while logins are in flight.
+
+Start the API (e.g. `uvicorn main:app --workers 1`) and run from the backend directory:
+
+    python -m benchmarks.load_login_dashboard --base-url http://localhost:8000
+
+Measures dashboard latency twice, first alone and then with concurrent logins
+hammering bcrypt. With hashing offloaded to the password pool the p99 of both
+phases should stay close; with hashing on the event loop every login stalls the
+dashboard requests queued behind it. Requires httpx.
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+EMAIL = "loadtest@example.com"
+PASSWORD = "loadtest-password"
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+async def login(client):
+    response = await client.post("/auth/login", data={"username": EMAIL, "password": PASSWORD})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+async def dashboard_loop(client, headers, stop_at, latencies):
+    while time.perf_counter() < stop_at:
+        start = time.perf_counter()
+        response = await client.get("/dashboard/summary", headers=headers)
+        response.raise_for_status()
+        latencies.append((time.perf_counter() - start) * 1000)
+
+async def login_loop(client, stop_at, counter):
+    while time.perf_counter() < stop_at:
+        await login(client)
+        counter[0] += 1
+
+async def run_phase(client, headers, duration, dashboard_concurrency, login_concurrency):
+    stop_at = time.perf_counter() + duration
+    latencies, logins = [], [0]
+    tasks = [dashboard_loop(client, headers, stop_at, latencies) for _ in range(dashboard_concurrency)]
+    tasks += [login_loop(client, stop_at, logins) for _ in range(login_concurrency)]
+    await asyncio.gather(*tasks)
+    return latencies, logins[0]
+
+def report(name, latencies, logins, duration):
+    print(
+        f"{name:<18} requests={len(latencies):>6} rps={len(latencies) / duration:>8.1f} "
+        f"p50={percentile(latencies, 50):>7.1f}ms p95={percentile(latencies, 95):>7.1f}ms "
+        f"p99={percentile(latencies, 99):>7.1f}ms logins={logins}"
+    )
+
+async def main(args):
+    limits = httpx.Limits(max_connections=args.dashboard_concurrency + args.login_concurrency + 2)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=60, limits=limits) as client:
+        await client.post("/auth/register", json={"email": EMAIL, "password": PASSWORD})
+        headers = {"Authorization": f"Bearer {await login(client)}"}
+
+        latencies, logins = await run_phase(client, headers, args.duration, args.dashboard_concurrency, 0)
+        report("dashboard only", latencies, logins, args.duration)
+
+        latencies, logins = await run_phase(client, headers, args.duration, args.dashboard_concurrency, args.login_concurrency)
+        report("dashboard + logins", latencies, logins, args.duration)
+
+        response = await client.get("/auth/hash-pool", headers=headers)
+        print(f"password pool after run: {response.json()}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per phase")
+    parser.add_argument("--dashboard-concurrency", type=int, default=8)
+    parser.add_argument("--login-concurrency", type=int, default=4)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,229 @@
+"""Load test: concurrent user sessions against the API, with a JSON report per run.
+
+Each virtual user logs in with its own synthetic budget (see benchmarks.synthetic) and then
+repeats a session: login, dashboard, page through transactions, edit a planning grid row,
+dashboard again. Run from the backend directory, either in-process on a SQLite stand-in
+
+    python -m benchmarks.load_scenario --output load-$(git rev-parse --short HEAD).json
+
+or against a running server (local Postgres behind `uvicorn main:app`)
+
+    python -m benchmarks.load_scenario --base-url http://localhost:8000 --output after.json --compare before.json
+
+Users missing on the target are registered and seeded through the API (items, the plan and
+a CSV import); pre-seed large profiles with `python -m benchmarks.synthetic` instead. The
+report has p50/p95/p99 latency per step and overall throughput; `--compare` prints the
+change against an earlier report. The seed fixes the data and every user's edits, so runs on
+different commits are comparable. Requires httpx.
+"""
+import argparse
+import asyncio
+import csv
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import time
+from collections import defaultdict
+
+import httpx
+
+from benchmarks.load_login_dashboard import percentile
+from benchmarks.synthetic import PASSWORD, PROFILES, generate_profile
+
+STEPS = ("login", "dashboard", "transactions", "edit grid")
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list) # step -> ms
+        self.errors = defaultdict(int)
+
+    async def call(self, step, request, expected=(200,)):
+        start = time.perf_counter()
+        try:
+            response = await request
+        except httpx.HTTPError:
+            self.errors[step] += 1
+            return None
+        self.latencies[step].append((time.perf_counter() - start) * 1000)
+        if response.status_code not in expected:
+            self.errors[step] += 1
+            return None
+        return response
+
+async def login(client, email):
+    response = await client.post("/auth/login", data={"username": email, "password": PASSWORD})
+    return response if response.status_code == 200 else None
+
+async def ensure_user(client, data):
+    """Log in, registering and seeding the user through the API if it does not exist yet."""
+    response = await login(client, data.email)
+    if response is None:
+        (await client.post("/auth/register", json={"email": data.email, "password": PASSWORD})).raise_for_status()
+        response = await login(client, data.email)
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    items = (await client.get("/budget-items/", params={"limit": 100_000, "fast": "true"}, headers=headers)).json()
+    if not items:
+        (await client.post("/settings/", json={"year": data.year, "currency": "EUR"}, headers=headers)).raise_for_status()
+        for item in data.items:
+            response = await client.post("/budget-items/", json=item, headers=headers)
+            response.raise_for_status()
+            items.append(response.json())
+        rows = [
+            {"budget_item_id": item["id"], "planned_amounts": [str(amount) for amount in amounts]}
+            for item, amounts in zip(items, data.planned)
+        ]
+        (await client.post("/monthly-values/batch", json={"rows": rows}, headers=headers)).raise_for_status()
+        body = io.StringIO()
+        writer = csv.writer(body)
+        writer.writerow(["date", "amount", "budget_item_id", "comment"])
+        for i, tx_date, amount, comment in data.transactions:
+            writer.writerow([tx_date.isoformat(), amount, items[i]["id"], comment])
+        response = await client.post("/transactions/bulk", params={"format": "csv"}, content=body.getvalue().encode(), headers=headers)
+        response.raise_for_status()
+    return [item["id"] for item in items]
+
+async def session(client, recorder, email, item_ids, rng, pages):
+    response = await recorder.call("login", login(client, email), expected=(200,))
+    if response is None:
+        return
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    await recorder.call("dashboard", client.get("/dashboard/summary", headers=headers))
+
+    params = {"limit": 100}
+    for _ in range(pages):
+        response = await recorder.call("transactions", client.get("/transactions/", params=params, headers=headers))
+        cursor = response is not None and response.headers.get("x-next-cursor")
+        if not cursor:
+            break
+        params = {"limit": 100, "cursor": cursor}
+
+    # A planning grid row edit invalidates the cached dashboard, which is fetched again
+    row = {"budget_item_id": rng.choice(item_ids), "planned_amounts": [rng.randint(0, 200_000) / 100 for _ in range(12)]}
+    await recorder.call("edit grid", client.post("/monthly-values/batch", json={"rows": [row]}, headers=headers))
+    await recorder.call("dashboard", client.get("/dashboard/summary", headers=headers))
+
+async def virtual_user(client, recorder, email, item_ids, seed, index, sessions, pages):
+    rng = random.Random(f"{seed}-{index}-edits")
+    for _ in range(sessions):
+        await session(client, recorder, email, item_ids, rng, pages)
+
+def in_process_app(database_url):
+    # The app talks to `database_url` instead of DATABASE_URL; tables are created if missing
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+    from sqlalchemy.orm import sessionmaker
+    from database import Base, engine_options, get_db
+    from main import app
+
+    engine = create_async_engine(database_url, **engine_options(database_url))
+    factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def override_get_db():
+        async with factory() as session:
+            yield session
+
+    async def create_tables():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    app.dependency_overrides[get_db] = override_get_db
+    return app, engine, create_tables
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def summarize(recorder, elapsed, args):
+    steps = {}
+    for step in STEPS:
+        samples = recorder.latencies[step]
+        steps[step] = {
+            "requests": len(samples),
+            "errors": recorder.errors[step],
+            "mean_ms": round(sum(samples) / len(samples), 2) if samples else 0.0,
+            "p50_ms": round(percentile(samples, 50), 2),
+            "p95_ms": round(percentile(samples, 95), 2),
+            "p99_ms": round(percentile(samples, 99), 2),
+        }
+    requests = sum(len(samples) for samples in recorder.latencies.values())
+    return {
+        "commit": git_commit(),
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "target": args.base_url or args.database_url,
+        "python": platform.python_version(),
+        "params": {name: getattr(args, name) for name in ("profile", "users", "sessions", "pages", "seed")},
+        "elapsed_s": round(elapsed, 3),
+        "requests": requests,
+        "errors": sum(recorder.errors.values()),
+        "throughput_rps": round(requests / elapsed, 2) if elapsed else 0.0,
+        "sessions_per_s": round(args.users * args.sessions / elapsed, 2) if elapsed else 0.0,
+        "steps": steps,
+    }
+
+def change(new, old):
+    return f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+
+def print_report(report, baseline=None):
+    print(f"commit={report['commit']} target={report['target']} params={report['params']}")
+    print(f"{'step':<14} {'requests':>9} {'errors':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}" + (" p95 vs baseline" if baseline else ""))
+    for step, stats in report["steps"].items():
+        line = f"{step:<14} {stats['requests']:>9} {stats['errors']:>7} {stats['p50_ms']:>9.1f} {stats['p95_ms']:>9.1f} {stats['p99_ms']:>9.1f}"
+        if baseline and step in baseline["steps"]:
+            line += f" {change(stats['p95_ms'], baseline['steps'][step]['p95_ms']):>16}"
+        print(line)
+    line = f"throughput {report['throughput_rps']:.1f} req/s, {report['sessions_per_s']:.2f} sessions/s, {report['errors']} errors"
+    if baseline:
+        line += f" ({change(report['throughput_rps'], baseline['throughput_rps'])} vs {baseline['commit'] or 'baseline'})"
+    print(line)
+
+async def main(args):
+    users = [generate_profile(args.profile, seed=args.seed, index=index) for index in range(args.users)]
+    limits = httpx.Limits(max_connections=args.users + 2)
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=120, limits=limits)
+    else:
+        app, engine, create_tables = in_process_app(args.database_url)
+        await create_tables()
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://load", timeout=120)
+
+    async with client:
+        start = time.perf_counter()
+        item_ids = await asyncio.gather(*(ensure_user(client, data) for data in users))
+        print(f"{args.users} users ready in {time.perf_counter() - start:.1f}s")
+
+        recorder = Recorder()
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            virtual_user(client, recorder, data.email, ids, args.seed, index, args.sessions, args.pages)
+            for index, (data, ids) in enumerate(zip(users, item_ids))
+        ))
+        report = summarize(recorder, time.perf_counter() - start, args)
+    if not args.base_url:
+        await engine.dispose()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", help="running server; in-process on --database-url when omitted")
+    parser.add_argument("--database-url", default=os.getenv("LOAD_DATABASE_URL", "sqlite+aiosqlite:///bench.sqlite3"))
+    parser.add_argument("--profile", choices=PROFILES, default="small")
+    parser.add_argument("--users", type=int, default=8, help="concurrent virtual users")
+    parser.add_argument("--sessions", type=int, default=10, help="sessions per user")
+    parser.add_argument("--pages", type=int, default=5, help="transaction pages per session, 100 rows each")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the report as JSON")
+    parser.add_argument("--compare", help="earlier JSON report to compare with")
+    asyncio.run(main(parser.parse_args()))
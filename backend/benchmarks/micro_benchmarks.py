@@ -0,0 +1,124 @@
+"""pytest-benchmark micro-benchmarks: dashboard summary per backend and the hot router handlers.
+
+Needs `pip install pytest-benchmark`. Run from the backend directory (the file is not
+collected by the regular test run):
+
+    python -m pytest benchmarks/micro_benchmarks.py --benchmark-autosave
+    python -m pytest benchmarks/micro_benchmarks.py --benchmark-compare --benchmark-compare-fail=median:15%
+
+`--benchmark-autosave` stores the results under .benchmarks/ tagged with the commit, and
+`--benchmark-compare` checks the current tree against the latest saved run. The data is
+one synthetic user (BENCH_PROFILE: small, medium or large) in an in-memory SQLite database.
+Handlers are called through the ASGI app, so routing, validation and middleware are included.
+"""
+import asyncio
+import os
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+pytest.importorskip("aiosqlite")
+
+from benchmarks.synthetic import PASSWORD, generate_profile, populate
+from services.finance_engine import BACKENDS, FinanceEngine
+
+BENCH_PROFILE = os.getenv("BENCH_PROFILE", "medium")
+BENCH_SEED = int(os.getenv("BENCH_SEED", "42"))
+
+@pytest.fixture(scope="module")
+def world():
+    from httpx import ASGITransport, AsyncClient
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+    from database import Base, get_db
+    from main import app
+    from services.auth_utils import get_password_hash
+    from services.cache import InMemoryCacheBackend, dashboard_cache
+    from services.events import InMemoryBroker, dashboard_events
+
+    loop = asyncio.new_event_loop()
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    data = generate_profile(BENCH_PROFILE, seed=BENCH_SEED)
+
+    async def setup():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with factory() as db:
+            user_id = await populate(db, data, get_password_hash(PASSWORD))
+
+        async def override_get_db():
+            async with factory() as session:
+                yield session
+
+        app.dependency_overrides[get_db] = override_get_db
+        dashboard_cache.backend = InMemoryCacheBackend()
+        dashboard_events.broker = InMemoryBroker()
+        client = AsyncClient(transport=ASGITransport(app=app), base_url="http://bench")
+        await client.__aenter__()
+        token = (await client.post("/auth/login", data={"username": data.email, "password": PASSWORD})).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        items = (await client.get("/budget-items/?limit=10000&fast=true", headers=headers)).json()
+        return SimpleNamespace(
+            run=loop.run_until_complete, factory=factory, user_id=user_id, client=client,
+            headers=headers, item_ids=[item["id"] for item in items],
+        )
+
+    world = loop.run_until_complete(setup())
+    yield world
+    loop.run_until_complete(world.client.__aexit__(None, None, None))
+    app.dependency_overrides.clear()
+    dashboard_cache.backend = InMemoryCacheBackend()
+    loop.run_until_complete(engine.dispose())
+    loop.close()
+
+def get(world, url):
+    async def request():
+        response = await world.client.get(url, headers=world.headers)
+        assert response.status_code == 200
+        return response
+    return world.run(request())
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_dashboard_summary(benchmark, world, backend):
+    async def summary():
+        async with world.factory() as db:
+            return await FinanceEngine(db, world.user_id, backend=backend).get_dashboard_summary()
+
+    result = benchmark(lambda: world.run(summary()))
+    assert result["settings"]["year"] == 2024
+
+@pytest.mark.parametrize("cached", [False, True], ids=["computed", "cached"])
+def test_handler_dashboard_summary(benchmark, world, cached):
+    # An explicit backend bypasses the dashboard cache
+    url = "/dashboard/summary" if cached else "/dashboard/summary?backend=rollup"
+    benchmark(get, world, url)
+
+@pytest.mark.parametrize("fast", [False, True], ids=["pydantic", "orjson"])
+def test_handler_transactions_page(benchmark, world, fast):
+    response = benchmark(get, world, f"/transactions/?limit=100&fast={str(fast).lower()}")
+    assert len(response.json()) == 100
+
+def test_handler_transactions_paginate(benchmark, world):
+    def paginate(pages=5):
+        url = "/transactions/?limit=100&fast=true"
+        for _ in range(pages):
+            cursor = get(world, url).headers["x-next-cursor"]
+            url = f"/transactions/?limit=100&fast=true&cursor={cursor}"
+
+    benchmark(paginate)
+
+def test_handler_budget_items(benchmark, world):
+    response = benchmark(get, world, "/budget-items/?limit=10000")
+    assert len(response.json()) == len(world.item_ids)
+
+def test_handler_edit_grid(benchmark, world):
+    rows = [{"budget_item_id": item_id, "planned_amounts": [100 + i] * 12} for i, item_id in enumerate(world.item_ids[:10])]
+
+    async def edit():
+        response = await world.client.post("/monthly-values/batch", json={"rows": rows}, headers=world.headers)
+        assert response.status_code == 200
+
+    benchmark(lambda: world.run(edit()))
@@ -0,0 +1,55 @@
+import pytest
+import pytest_asyncio
+
+
+@pytest_asyncio.fixture
+async def session_factory():
+    pytest.importorskip("aiosqlite")
+    from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+    from database import Base
+    import main  # registers every model
+
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def client(session_factory):
+    from httpx import AsyncClient, ASGITransport
+    from database import get_db
+    from main import app
+    from services.cache import dashboard_cache, InMemoryCacheBackend
+    from services.auth_utils import principal_cache
+    from services.events import dashboard_events, InMemoryBroker
+
+    async def override_get_db():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    principal_cache.clear()
+    dashboard_cache.backend = InMemoryCacheBackend()
+    dashboard_events.broker = InMemoryBroker()
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        yield ac
+    app.dependency_overrides.clear()
+    # Module-level caches outlive the per-test database
+    dashboard_cache.backend = InMemoryCacheBackend()
+
+
+async def register_and_login(client, email="user@example.com", password="secret"):
+    response = await client.post("/auth/register", json={"email": email, "password": password})
+    assert response.status_code == 200
+    response = await client.post("/auth/login", data={"username": email, "password": password})
+    assert response.status_code == 200
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest_asyncio.fixture
+async def auth_headers(client):
+    return await register_and_login(client)
@@ -1,5 +1,8 @@
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.dialects import postgresql, sqlite
 
 import os
 import ssl
@@ -13,21 +16,61 @@ if DATABASE_URL.startswith("postgres://"):
 elif DATABASE_URL.startswith("postgresql://"):
     DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
 
-# Render/Production usually requires SSL but often uses self-signed certificates
-ssl_context = None
-# Only use SSL if we are NOT on localhost/local network and NOT in docker-compose (host 'db' or 'postgres')
-is_local = "localhost" in DATABASE_URL or "127.0.0.1" in DATABASE_URL or "@db:" in DATABASE_URL or "@postgres:" in DATABASE_URL
+def env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    return default if value is None else value.strip().lower() in ("1", "true", "yes", "on")
 
-if not is_local or os.getenv("RENDER"):
-    ssl_context = ssl.create_default_context()
-    ssl_context.check_hostname = False
-    ssl_context.verify_mode = ssl.CERT_NONE
+# Engine and pool configuration
+DB_ECHO = env_bool("DB_ECHO", False) # logs every statement, development only
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30")) # seconds to wait for a connection
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800")) # seconds, -1 disables
+DB_POOL_PRE_PING = env_bool("DB_POOL_PRE_PING", True)
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0")) # 0 disables
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100")) # asyncpg prepared statements, 0 behind pgbouncer
 
-engine = create_async_engine(
-    DATABASE_URL, 
-    echo=True,
-    connect_args={"ssl": ssl_context} if ssl_context else {}
-)
+def engine_options(url: str) -> dict:
+    options = {"echo": DB_ECHO}
+    if url.startswith("sqlite"):
+        # SQLite (tests, local benchmarks) has no server-side pool or settings to tune
+        return options
+
+    options.update(
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+    )
+    connect_args = {
+        "statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+        "prepared_statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+    }
+    if DB_STATEMENT_TIMEOUT_MS:
+        connect_args["server_settings"] = {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}
+
+    # Render/Production usually requires SSL but often uses self-signed certificates
+    # Only use SSL if we are NOT on localhost/local network and NOT in docker-compose (host 'db' or 'postgres')
+    is_local = "localhost" in url or "127.0.0.1" in url or "@db:" in url or "@postgres:" in url
+    if not is_local or os.getenv("RENDER"):
+        ssl_context = ssl.create_default_context()
+        ssl_context.check_hostname = False
+        ssl_context.verify_mode = ssl.CERT_NONE
+        connect_args["ssl"] = ssl_context
+
+    options["connect_args"] = connect_args
+    return options
+
+@event.listens_for(Engine, "connect")
+def _sqlite_foreign_keys(dbapi_connection, connection_record):
+    # SQLite (tests, local benchmarks) only enforces foreign keys and their ON DELETE actions when asked
+    if "sqlite" in type(dbapi_connection).__module__:
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+engine = create_async_engine(DATABASE_URL, **engine_options(DATABASE_URL))
 
 
 SessionLocal = sessionmaker(
@@ -42,3 +85,9 @@ Base = declarative_base()
 async def get_db():
     async with SessionLocal() as session:
         yield session
+
+def dialect_insert(db: AsyncSession, model):
+    # INSERT construct supporting ON CONFLICT for the session's dialect (SQLite is used in tests)
+    if db.get_bind().dialect.name == "sqlite":
+        return sqlite.insert(model)
+    return postgresql.insert(model)
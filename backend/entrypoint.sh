@@ -0,0 +1,11 @@
+#!/bin/sh
+# Container entrypoint: apply pending schema migrations, then run the command (uvicorn by default).
+# The API refuses to start against an outdated schema, so a deploy migrates before serving.
+# Set MIGRATE_ON_START=false where migrations run as a separate step (docker-compose `migrate`).
+set -e
+
+if [ "${MIGRATE_ON_START:-true}" != "false" ]; then
+    python migrate.py
+fi
+
+exec "$@"
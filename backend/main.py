@@ -1,9 +1,15 @@
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, HTTPException, Request, Response
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy import text
-from database import engine, Base
+import migrations
+from database import engine
 # Import models to ensure they are registered with Base.metadata
-from models import user, settings as settings_model, budget_item, monthly_value, transaction
+from models import user, settings as settings_model, budget_item, monthly_value, transaction, monthly_rollup
+from routers import auth, settings, budget_items, monthly_values, transactions, dashboard, imports, exports
+from services.query_tracer import SQL_TRACE, QueryTracerMiddleware, tracer
+from services.data_version import NotModified
+from services.compression import COMPRESSION_ENCODINGS, CompressionMiddleware
+from services.metrics import METRICS_ENABLED, PROFILE_SAMPLE_RATE, MetricsMiddleware, RequestProfiler, registry, require_metrics_token
 
 app = FastAPI(
     title="Yearly Budget App Backend",
@@ -19,26 +25,50 @@ app.add_middleware(
     allow_credentials=False,  # Must be False when using allow_origins=["*"]
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
+# Brotli/gzip for JSON bodies above COMPRESSION_MINIMUM_SIZE, streaming responses included
+if COMPRESSION_ENCODINGS:
+    app.add_middleware(CompressionMiddleware)
+
+# Opt-in SQL tracing (statement count, DB time and slow queries per request)
+if SQL_TRACE:
+    tracer.install(engine)
+    app.add_middleware(QueryTracerMiddleware)
+
+# Request metrics for /metrics; added last so it also times the middlewares above
+if METRICS_ENABLED:
+    tracer.install(engine) # per-request DB time comes from the tracer's engine events (slow queries only with SQL_TRACE)
+    app.add_middleware(MetricsMiddleware, profiler=RequestProfiler() if PROFILE_SAMPLE_RATE > 0 else None)
+
 @app.on_event("startup")
 async def startup():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-        
-        # Manual migration for existing tables created in Phase 0
-        tables = ["settings", "budget_items", "monthly_values", "transactions"]
-        for table in tables:
-            try:
-                await conn.execute(text(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS user_id INTEGER REFERENCES users(id) ON DELETE CASCADE"))
-                print(f"Successfully ensured user_id exists in {table}")
-            except Exception as e:
-                print(f"Migration note for {table}: {e}")
+    # Schema changes are applied by `python migrate.py` as a separate deploy step;
+    # workers only refuse to start against an outdated schema
+    await migrations.check(engine)
+
+@app.exception_handler(NotModified)
+async def not_modified(request: Request, exc: NotModified):
+    # Raised by data_version.conditional_get before the route body runs
+    return Response(status_code=304, headers={"ETag": exc.etag, "Cache-Control": "private, no-cache"})
 
 @app.get("/")
 async def root():
     return {"message": "Yearly Budget Backend is running"}
 
+@app.get("/metrics", include_in_schema=False, dependencies=[Depends(require_metrics_token)])
+async def metrics():
+    if not METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/debug/sql-stats", dependencies=[Depends(require_metrics_token)])
+async def sql_stats():
+    if not SQL_TRACE:
+        raise HTTPException(status_code=404, detail="SQL tracing is disabled")
+    return tracer.snapshot()
+
 # Include Routers
 app.include_router(auth.router)
 app.include_router(settings.router)
@@ -46,4 +76,6 @@ app.include_router(budget_items.router)
 app.include_router(monthly_values.router)
 app.include_router(transactions.router)
 app.include_router(dashboard.router)
+app.include_router(imports.router)
+app.include_router(exports.router)
 
@@ -0,0 +1,30 @@
+"""Apply pending schema migrations.
+
+    python migrate.py           # upgrade to the latest version
+    python migrate.py --status  # show current and latest version
+"""
+import argparse
+import asyncio
+import sys
+
+import migrations
+from database import engine
+
+async def main(status_only: bool) -> int:
+    try:
+        if status_only:
+            async with engine.connect() as conn:
+                current = await migrations.current_version(conn)
+            print(f"Schema version {current}, latest {migrations.latest_version()}")
+            return 0 if current == migrations.latest_version() else 1
+        applied = await migrations.upgrade(engine)
+        print(f"Applied {len(applied)} migration(s)" if applied else "Schema is up to date")
+        return 0
+    finally:
+        await engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--status", action="store_true", help="only report the schema version")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.status)))
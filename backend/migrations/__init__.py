@@ -0,0 +1,85 @@
+"""Versioned schema migrations.
+
+Each module named vNNNN_<description>.py defines VERSION, DESCRIPTION and
+`async def upgrade(conn)`. `python migrate.py` applies the pending ones in order,
+each in its own transaction, and records them in the schema_version table.
+The API only checks at startup that the database is up to date.
+"""
+import importlib
+import pkgutil
+import re
+from typing import List, Optional
+
+from sqlalchemy import text
+
+SCHEMA_VERSION_TABLE = "schema_version"
+# Arbitrary key so two deploys never migrate concurrently (PostgreSQL only)
+ADVISORY_LOCK_ID = 8_271_604
+
+class SchemaVersionError(RuntimeError):
+    pass
+
+def load_migrations() -> List:
+    modules = []
+    for info in pkgutil.iter_modules(__path__):
+        if re.match(r"v\d{4}_", info.name):
+            modules.append(importlib.import_module(f"{__name__}.{info.name}"))
+    modules.sort(key=lambda m: m.VERSION)
+    versions = [m.VERSION for m in modules]
+    if len(set(versions)) != len(versions):
+        raise SchemaVersionError(f"Duplicate migration versions: {versions}")
+    return modules
+
+def latest_version(migrations: Optional[List] = None) -> int:
+    migrations = load_migrations() if migrations is None else migrations
+    return migrations[-1].VERSION if migrations else 0
+
+async def _ensure_version_table(conn):
+    await conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {SCHEMA_VERSION_TABLE} ("
+        "version INTEGER PRIMARY KEY, description VARCHAR NOT NULL, "
+        "applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"
+    ))
+
+async def current_version(conn) -> int:
+    def has_table(sync_conn):
+        from sqlalchemy import inspect
+        return inspect(sync_conn).has_table(SCHEMA_VERSION_TABLE)
+
+    if not await conn.run_sync(has_table):
+        return 0
+    result = await conn.execute(text(f"SELECT MAX(version) FROM {SCHEMA_VERSION_TABLE}"))
+    return result.scalar() or 0
+
+async def upgrade(engine, migrations: Optional[List] = None, log=print) -> List[int]:
+    """Apply every pending migration; returns the versions that were applied."""
+    migrations = load_migrations() if migrations is None else migrations
+    applied = []
+    async with engine.begin() as conn:
+        await _ensure_version_table(conn)
+    for migration in migrations:
+        async with engine.begin() as conn:
+            if conn.dialect.name == "postgresql":
+                await conn.execute(text(f"SELECT pg_advisory_xact_lock({ADVISORY_LOCK_ID})"))
+            # Re-read under the lock: another deploy may have applied it meanwhile
+            if migration.VERSION <= await current_version(conn):
+                continue
+            log(f"Applying migration {migration.VERSION}: {migration.DESCRIPTION}")
+            await migration.upgrade(conn)
+            await conn.execute(
+                text(f"INSERT INTO {SCHEMA_VERSION_TABLE} (version, description) VALUES (:version, :description)"),
+                {"version": migration.VERSION, "description": migration.DESCRIPTION},
+            )
+            applied.append(migration.VERSION)
+    return applied
+
+async def check(engine, migrations: Optional[List] = None):
+    """Raise SchemaVersionError unless the database is at the latest version."""
+    expected = latest_version(migrations)
+    async with engine.connect() as conn:
+        found = await current_version(conn)
+    if found != expected:
+        raise SchemaVersionError(
+            f"Database schema is at version {found}, this build expects {expected}. "
+            "Run `python migrate.py` before starting the API."
+        )
@@ -0,0 +1,85 @@
+from sqlalchemy import text
+
+VERSION = 1
+DESCRIPTION = "Baseline schema (replaces create_all and the ALTERs run at startup)"
+
+# Written with IF NOT EXISTS so it also adopts databases created by the old startup code
+STATEMENTS = [
+    """CREATE TABLE IF NOT EXISTS users (
+        id SERIAL PRIMARY KEY,
+        email VARCHAR NOT NULL,
+        hashed_password VARCHAR NOT NULL
+    )""",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_users_email ON users (email)",
+    "CREATE INDEX IF NOT EXISTS ix_users_id ON users (id)",
+
+    """CREATE TABLE IF NOT EXISTS settings (
+        id SERIAL PRIMARY KEY,
+        year INTEGER NOT NULL,
+        currency VARCHAR,
+        user_id INTEGER REFERENCES users(id),
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT now()
+    )""",
+    "CREATE INDEX IF NOT EXISTS ix_settings_id ON settings (id)",
+
+    """CREATE TABLE IF NOT EXISTS budget_items (
+        id SERIAL PRIMARY KEY,
+        name VARCHAR,
+        category VARCHAR NOT NULL,
+        sub_category VARCHAR,
+        type VARCHAR,
+        is_active BOOLEAN,
+        user_id INTEGER REFERENCES users(id)
+    )""",
+    "CREATE INDEX IF NOT EXISTS ix_budget_items_id ON budget_items (id)",
+    "CREATE INDEX IF NOT EXISTS ix_budget_items_name ON budget_items (name)",
+
+    """CREATE TABLE IF NOT EXISTS monthly_values (
+        id SERIAL PRIMARY KEY,
+        budget_item_id INTEGER NOT NULL REFERENCES budget_items(id),
+        user_id INTEGER REFERENCES users(id),
+        month INTEGER NOT NULL,
+        planned_amount NUMERIC
+    )""",
+    "CREATE INDEX IF NOT EXISTS ix_monthly_values_id ON monthly_values (id)",
+
+    """CREATE TABLE IF NOT EXISTS transactions (
+        id SERIAL PRIMARY KEY,
+        date DATE NOT NULL,
+        amount NUMERIC NOT NULL,
+        budget_item_id INTEGER NOT NULL REFERENCES budget_items(id),
+        user_id INTEGER REFERENCES users(id),
+        comment VARCHAR
+    )""",
+    "CREATE INDEX IF NOT EXISTS ix_transactions_id ON transactions (id)",
+
+    # Tables created before multi-user support (Phase 0) lack user_id
+    "ALTER TABLE settings ADD COLUMN IF NOT EXISTS user_id INTEGER REFERENCES users(id) ON DELETE CASCADE",
+    "ALTER TABLE budget_items ADD COLUMN IF NOT EXISTS user_id INTEGER REFERENCES users(id) ON DELETE CASCADE",
+    "ALTER TABLE monthly_values ADD COLUMN IF NOT EXISTS user_id INTEGER REFERENCES users(id) ON DELETE CASCADE",
+    "ALTER TABLE transactions ADD COLUMN IF NOT EXISTS user_id INTEGER REFERENCES users(id) ON DELETE CASCADE",
+
+    """CREATE TABLE IF NOT EXISTS monthly_rollups (
+        user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+        budget_item_id INTEGER NOT NULL REFERENCES budget_items(id) ON DELETE CASCADE,
+        year INTEGER NOT NULL,
+        month INTEGER NOT NULL,
+        planned_amount NUMERIC NOT NULL,
+        actual_amount NUMERIC NOT NULL,
+        PRIMARY KEY (user_id, budget_item_id, year, month)
+    )""",
+
+    "CREATE INDEX IF NOT EXISTS ix_transactions_user_id_date_id ON transactions (user_id, date, id)",
+    "DROP INDEX IF EXISTS ix_transactions_user_id_date",
+    "CREATE INDEX IF NOT EXISTS ix_transactions_user_id_budget_item_id_date_id ON transactions (user_id, budget_item_id, date, id)",
+    "CREATE INDEX IF NOT EXISTS ix_budget_items_user_id_category ON budget_items (user_id, category)",
+
+    # Monthly values are unique per (item, month); keep the newest duplicate
+    """DELETE FROM monthly_values a USING monthly_values b
+        WHERE a.budget_item_id = b.budget_item_id AND a.month = b.month AND a.id < b.id""",
+    "CREATE UNIQUE INDEX IF NOT EXISTS uq_monthly_values_item_month ON monthly_values (budget_item_id, month)",
+]
+
+async def upgrade(conn):
+    for statement in STATEMENTS:
+        await conn.execute(text(statement))
@@ -0,0 +1,25 @@
+from sqlalchemy import text
+
+VERSION = 2
+DESCRIPTION = "Recompute monthly_rollups from monthly_values and transactions"
+
+# Same computation as services.rollups.rebuild, frozen in SQL so later model changes
+# cannot alter what this migration does
+STATEMENTS = [
+    "DELETE FROM monthly_rollups",
+    """INSERT INTO monthly_rollups (user_id, budget_item_id, year, month, planned_amount, actual_amount)
+        SELECT bi.user_id, mv.budget_item_id, 0, mv.month, SUM(mv.planned_amount), 0
+        FROM monthly_values mv JOIN budget_items bi ON bi.id = mv.budget_item_id
+        WHERE bi.user_id IS NOT NULL
+        GROUP BY bi.user_id, mv.budget_item_id, mv.month""",
+    """INSERT INTO monthly_rollups (user_id, budget_item_id, year, month, planned_amount, actual_amount)
+        SELECT user_id, budget_item_id, CAST(EXTRACT(year FROM date) AS INTEGER),
+               CAST(EXTRACT(month FROM date) AS INTEGER), 0, SUM(amount)
+        FROM transactions
+        WHERE user_id IS NOT NULL
+        GROUP BY user_id, budget_item_id, EXTRACT(year FROM date), EXTRACT(month FROM date)""",
+]
+
+async def upgrade(conn):
+    for statement in STATEMENTS:
+        await conn.execute(text(statement))
@@ -0,0 +1,18 @@
+from sqlalchemy import text
+
+VERSION = 3
+DESCRIPTION = "Index user_id and budget_item_id columns the routers filter on"
+
+# budget_items.user_id and transactions.user_id already lead the composite indexes
+# ix_budget_items_user_id_category and ix_transactions_user_id_date_id, and
+# monthly_values.budget_item_id leads uq_monthly_values_item_month, so only the
+# remaining columns get their own index
+STATEMENTS = [
+    "CREATE INDEX IF NOT EXISTS ix_settings_user_id ON settings (user_id)",
+    "CREATE INDEX IF NOT EXISTS ix_monthly_values_user_id ON monthly_values (user_id)",
+    "CREATE INDEX IF NOT EXISTS ix_transactions_budget_item_id ON transactions (budget_item_id)",
+]
+
+async def upgrade(conn):
+    for statement in STATEMENTS:
+        await conn.execute(text(statement))
@@ -0,0 +1,19 @@
+from sqlalchemy import text
+
+from migrations.v0002_rollup_backfill import STATEMENTS as REBUILD_ROLLUPS
+
+VERSION = 4
+DESCRIPTION = "Store amounts as NUMERIC(14, 2) (rollup sums as NUMERIC(16, 2))"
+
+# Existing amounts are rounded half away from zero, like PostgreSQL casts; the rollups are
+# then recomputed from the rounded values so they stay consistent with the raw tables
+STATEMENTS = [
+    "ALTER TABLE transactions ALTER COLUMN amount TYPE NUMERIC(14, 2) USING round(amount, 2)",
+    "ALTER TABLE monthly_values ALTER COLUMN planned_amount TYPE NUMERIC(14, 2) USING round(planned_amount, 2)",
+    "ALTER TABLE monthly_rollups ALTER COLUMN planned_amount TYPE NUMERIC(16, 2) USING round(planned_amount, 2)",
+    "ALTER TABLE monthly_rollups ALTER COLUMN actual_amount TYPE NUMERIC(16, 2) USING round(actual_amount, 2)",
+] + REBUILD_ROLLUPS
+
+async def upgrade(conn):
+    for statement in STATEMENTS:
+        await conn.execute(text(statement))
@@ -0,0 +1,12 @@
+from sqlalchemy import text
+
+VERSION = 5
+DESCRIPTION = "Add users.data_version for conditional GETs"
+
+STATEMENTS = [
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS data_version BIGINT NOT NULL DEFAULT 0",
+]
+
+async def upgrade(conn):
+    for statement in STATEMENTS:
+        await conn.execute(text(statement))
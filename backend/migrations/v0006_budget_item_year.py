@@ -0,0 +1,14 @@
+from sqlalchemy import text
+
+VERSION = 6
+DESCRIPTION = "Add budget_items.year and rolled_from_id for year rollovers"
+
+STATEMENTS = [
+    "ALTER TABLE budget_items ADD COLUMN IF NOT EXISTS year INTEGER",
+    "ALTER TABLE budget_items ADD COLUMN IF NOT EXISTS rolled_from_id INTEGER REFERENCES budget_items (id) ON DELETE SET NULL",
+    "CREATE INDEX IF NOT EXISTS ix_budget_items_user_id_year ON budget_items (user_id, year)",
+]
+
+async def upgrade(conn):
+    for statement in STATEMENTS:
+        await conn.execute(text(statement))
@@ -0,0 +1,24 @@
+from sqlalchemy import text
+
+VERSION = 7
+DESCRIPTION = "Delete monthly values and transactions with their budget item (ON DELETE CASCADE)"
+
+TABLES = ["monthly_values", "transactions"]
+
+# The existing foreign keys are found by column, not by name: databases created by the old
+# startup code or restored from dumps do not necessarily use the PostgreSQL default names
+FIND_FOREIGN_KEYS = """SELECT con.conname FROM pg_constraint con
+    JOIN pg_attribute att ON att.attrelid = con.conrelid AND att.attnum = ANY (con.conkey)
+    WHERE con.contype = 'f' AND con.conrelid = CAST(:table AS regclass)
+        AND con.confrelid = CAST('budget_items' AS regclass) AND att.attname = 'budget_item_id'"""
+
+ADD_FOREIGN_KEY = """ALTER TABLE {table} ADD CONSTRAINT {table}_budget_item_id_fkey
+    FOREIGN KEY (budget_item_id) REFERENCES budget_items (id) ON DELETE CASCADE"""
+
+async def upgrade(conn):
+    quote = conn.dialect.identifier_preparer.quote
+    for table in TABLES:
+        names = (await conn.execute(text(FIND_FOREIGN_KEYS), {"table": table})).scalars().all()
+        for name in names:
+            await conn.execute(text(f"ALTER TABLE {table} DROP CONSTRAINT {quote(name)}"))
+        await conn.execute(text(ADD_FOREIGN_KEY.format(table=table)))
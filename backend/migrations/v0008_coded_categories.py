@@ -0,0 +1,32 @@
+from sqlalchemy import text
+
+from migrations import SchemaVersionError
+
+VERSION = 8
+DESCRIPTION = "Store budget_items.category and type as SMALLINT codes with CHECK constraints"
+
+# Codes are the positions in models.budget_item.CATEGORIES and ITEM_TYPES. Values are
+# compared case-insensitively; types other than passive were treated as active before.
+CHECK_CATEGORIES = """SELECT DISTINCT category FROM budget_items
+    WHERE category IS NULL OR lower(trim(category)) NOT IN ('income', 'expense', 'saving', 'debt')"""
+
+STATEMENTS = [
+    """ALTER TABLE budget_items ALTER COLUMN category TYPE SMALLINT USING
+        CASE lower(trim(category)) WHEN 'income' THEN 0 WHEN 'expense' THEN 1 WHEN 'saving' THEN 2 WHEN 'debt' THEN 3 END""",
+    "ALTER TABLE budget_items ALTER COLUMN type DROP DEFAULT",
+    "ALTER TABLE budget_items ALTER COLUMN type TYPE SMALLINT USING CASE lower(trim(type)) WHEN 'passive' THEN 1 ELSE 0 END",
+    "ALTER TABLE budget_items ALTER COLUMN type SET DEFAULT 0",
+    "ALTER TABLE budget_items ALTER COLUMN type SET NOT NULL",
+    "ALTER TABLE budget_items ADD CONSTRAINT ck_budget_items_category CHECK (category BETWEEN 0 AND 3)",
+    "ALTER TABLE budget_items ADD CONSTRAINT ck_budget_items_type CHECK (type BETWEEN 0 AND 1)",
+]
+
+async def upgrade(conn):
+    # Items in other categories never reached the dashboard; they need a decision, not a guess
+    unknown = (await conn.execute(text(CHECK_CATEGORIES))).scalars().all()
+    if unknown:
+        raise SchemaVersionError(
+            f"budget_items has categories outside income/expense/saving/debt: {unknown!r}; update them and rerun"
+        )
+    for statement in STATEMENTS:
+        await conn.execute(text(statement))
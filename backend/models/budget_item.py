@@ -1,26 +1,75 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, SmallInteger, String, Boolean, ForeignKey, Index, CheckConstraint
 from sqlalchemy.orm import relationship
+from sqlalchemy.types import TypeDecorator
+from typing import Sequence, Union
 from database import Base
 
+# Stored as SMALLINT codes: the position in these tuples. Only append new names, never reorder.
+CATEGORIES = ("income", "expense", "saving", "debt")
+ITEM_TYPES = ("active", "passive")
+
+class Code(TypeDecorator):
+    """One of `names`, stored as its SMALLINT index. Python code and the API see the name;
+    aggregation code can select the raw code with type_coerce(column, SmallInteger)."""
+    impl = SmallInteger
+    cache_ok = True
+
+    def __init__(self, names: Sequence[str]):
+        super().__init__()
+        self.names = tuple(names)
+        self.codes = {name: code for code, name in enumerate(self.names)}
+
+    def code(self, value: Union[str, int]) -> int:
+        if isinstance(value, int):
+            return value
+        try:
+            return self.codes[value]
+        except KeyError:
+            raise ValueError(f"{value!r} is not one of {', '.join(self.names)}") from None
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else self.code(value)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else self.names[value]
+
+CATEGORY = Code(CATEGORIES)
+ITEM_TYPE = Code(ITEM_TYPES)
+
 class BudgetItem(Base):
     __tablename__ = "budget_items"
+    __table_args__ = (
+        # Resolves a category filter to the user's item ids
+        Index("ix_budget_items_user_id_category", "user_id", "category"),
+        # Items of one budget year (see services.finance_engine.items_in_year)
+        Index("ix_budget_items_user_id_year", "user_id", "year"),
+        CheckConstraint(f"category BETWEEN 0 AND {len(CATEGORIES) - 1}", name="ck_budget_items_category"),
+        CheckConstraint(f"type BETWEEN 0 AND {len(ITEM_TYPES) - 1}", name="ck_budget_items_type"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
     
     # Categories: income, expense, saving, debt
-    category = Column(String, nullable=False)
+    category = Column(CATEGORY, nullable=False)
     
     # Sub-category or grouping
     sub_category = Column(String, nullable=True)
     
     # Active / Passive type (important for some ratio calculations)
-    type = Column(String, default="active") 
+    type = Column(ITEM_TYPE, nullable=False, default="active")
     
     is_active = Column(Boolean, default=True)
+
+    # Budget year, set on items created by a rollover; NULL items are used by every
+    # year that has no items of its own
+    year = Column(Integer, nullable=True)
+    # Item this one was cloned from by a rollover
+    rolled_from_id = Column(Integer, ForeignKey("budget_items.id", ondelete="SET NULL"), nullable=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
 
     # Relationships
     user = relationship("User", back_populates="budget_items")
-    monthly_values = relationship("MonthlyValue", back_populates="budget_item", cascade="all, delete-orphan")
-    transactions = relationship("Transaction", back_populates="budget_item")
+    # The database deletes both with the item (ON DELETE CASCADE), the ORM does not load them for it
+    monthly_values = relationship("MonthlyValue", back_populates="budget_item", cascade="all, delete-orphan", passive_deletes=True)
+    transactions = relationship("Transaction", back_populates="budget_item", cascade="all, delete-orphan", passive_deletes=True)
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, ForeignKey, Numeric
+from database import Base
+
+# Monthly values are not tied to a year, so planned sums are kept under this year
+PLAN_YEAR = 0
+
+class MonthlyRollup(Base):
+    __tablename__ = "monthly_rollups"
+
+    # One row per (user, item, year, month): at most 12 x items rows per year
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    budget_item_id = Column(Integer, ForeignKey("budget_items.id", ondelete="CASCADE"), primary_key=True)
+    year = Column(Integer, primary_key=True)
+    month = Column(Integer, primary_key=True) # 1 to 12
+    # Sums of NUMERIC(14, 2) amounts, two more integer digits of headroom
+    planned_amount = Column(Numeric(16, 2), nullable=False, default=0)
+    actual_amount = Column(Numeric(16, 2), nullable=False, default=0)
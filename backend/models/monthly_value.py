@@ -1,15 +1,19 @@
-from sqlalchemy import Column, Integer, ForeignKey, Numeric
+from sqlalchemy import Column, Integer, ForeignKey, Numeric, UniqueConstraint
 from sqlalchemy.orm import relationship
 from database import Base
 
 class MonthlyValue(Base):
     __tablename__ = "monthly_values"
+    __table_args__ = (
+        # One planned amount per item and month; target of the upsert's ON CONFLICT
+        UniqueConstraint("budget_item_id", "month", name="uq_monthly_values_item_month"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    budget_item_id = Column(Integer, ForeignKey("budget_items.id"), nullable=False)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    budget_item_id = Column(Integer, ForeignKey("budget_items.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
     month = Column(Integer, nullable=False) # 1 to 12
-    planned_amount = Column(Numeric, default=0.00)
+    planned_amount = Column(Numeric(14, 2), default=0) # see services.money
 
     # Relationships
     user = relationship("User", back_populates="monthly_values")
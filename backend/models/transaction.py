@@ -1,14 +1,20 @@
-from sqlalchemy import Column, Integer, String, Date, Numeric, ForeignKey
+from sqlalchemy import Column, Integer, String, Date, Numeric, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from database import Base
 
 class Transaction(Base):
     __tablename__ = "transactions"
+    __table_args__ = (
+        # Year-scoped dashboard scans and (date, id) keyset pagination of the ledger
+        Index("ix_transactions_user_id_date_id", "user_id", "date", "id"),
+        # Ledger filtered by budget item
+        Index("ix_transactions_user_id_budget_item_id_date_id", "user_id", "budget_item_id", "date", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     date = Column(Date, nullable=False)
-    amount = Column(Numeric, nullable=False)
-    budget_item_id = Column(Integer, ForeignKey("budget_items.id"), nullable=False)
+    amount = Column(Numeric(14, 2), nullable=False) # see services.money
+    budget_item_id = Column(Integer, ForeignKey("budget_items.id", ondelete="CASCADE"), nullable=False, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     comment = Column(String, nullable=True)
 
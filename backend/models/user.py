@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import BigInteger, Column, Integer, String
 from sqlalchemy.orm import relationship
 from database import Base
 
@@ -8,6 +8,8 @@ class User(Base):
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String, unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=False)
+    # Bumped in the same transaction as every write to the user's data; drives ETags
+    data_version = Column(BigInteger, nullable=False, default=0, server_default="0")
 
     # Relationships
     settings = relationship("Settings", back_populates="user", cascade="all, delete-orphan")
@@ -0,0 +1,37 @@
+"""Recompute monthly_rollups from monthly_values and transactions.
+
+    python rebuild_rollups.py                 # rebuild every user, then verify
+    python rebuild_rollups.py --user-id 42    # rebuild a single user
+    python rebuild_rollups.py --check         # only verify, exit 1 on drift
+"""
+import argparse
+import asyncio
+import sys
+
+from database import SessionLocal, engine
+# Import models to ensure they are registered with Base.metadata
+from models import user, settings, budget_item, monthly_value, transaction, monthly_rollup
+from services import rollups
+
+async def main(user_id=None, check_only=False) -> int:
+    async with SessionLocal() as db:
+        if not check_only:
+            await rollups.rebuild(db, user_id)
+        mismatches = await rollups.verify(db, user_id)
+        if mismatches:
+            await db.rollback()
+            for m in mismatches[:50]:
+                print(f"Mismatch: {m}")
+            print(f"{len(mismatches)} rollup row(s) differ from raw data")
+            return 1
+        await db.commit()
+    await engine.dispose()
+    print("Rollups verified" if check_only else "Rollups rebuilt and verified")
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--user-id", type=int, default=None)
+    parser.add_argument("--check", action="store_true", help="verify only, do not rebuild")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.user_id, args.check)))
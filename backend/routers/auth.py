@@ -21,7 +21,7 @@ async def register(user_in: schemas.UserCreate, db: AsyncSession = Depends(get_d
         )
     
     # Create new user
-    hashed_password = auth_utils.get_password_hash(user_in.password)
+    hashed_password = await auth_utils.get_password_hash_async(user_in.password)
     db_user = User(
         email=user_in.email,
         hashed_password=hashed_password
@@ -36,16 +36,20 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSessi
     result = await db.execute(select(User).where(User.email == form_data.username))
     user = result.scalars().first()
     
-    if not user or not auth_utils.verify_password(form_data.password, user.hashed_password):
+    if not user or not await auth_utils.verify_password_async(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    access_token = auth_utils.create_access_token(data={"sub": user.email})
+    access_token = auth_utils.create_user_token(user)
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.get("/me", response_model=schemas.User)
-async def get_me(current_user: User = Depends(auth_utils.get_current_user)):
+async def get_me(current_user: auth_utils.Principal = Depends(auth_utils.get_current_principal)):
     return current_user
+
+@router.get("/hash-pool")
+async def get_hash_pool_stats(current_user: auth_utils.Principal = Depends(auth_utils.get_current_principal)):
+    return auth_utils.password_pool_stats()
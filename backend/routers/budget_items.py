@@ -1,43 +1,84 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update, delete, func
 from sqlalchemy.orm import selectinload
-from typing import List
+from typing import List, Optional
 
 from database import get_db
 from models import budget_item as models
-from models.user import User
+from models.monthly_value import MonthlyValue
+from models.settings import Settings
+from models.transaction import Transaction
 from schemas import schemas
-from services import auth_utils
+from services import auth_utils, data_version
+from services.fast_json import FAST_DESCRIPTION, FastJSONResponse
+from services.finance_engine import CATEGORIES, DEFAULT_YEAR, items_in_year
+from services.rollover import clone_year
+from routers.monthly_values import value_rows_by_item
 
 router = APIRouter(prefix="/budget-items", tags=["budget-items"])
 
-@router.get("/", response_model=List[schemas.BudgetItem])
+# Field order of schemas.BudgetItem
+ITEM_COLUMNS = (
+    models.BudgetItem.name, models.BudgetItem.category, models.BudgetItem.sub_category,
+    models.BudgetItem.type, models.BudgetItem.is_active, models.BudgetItem.year, models.BudgetItem.id,
+)
+
+async def item_rows(db: AsyncSession, query, with_monthly_values: bool = True) -> List[dict]:
+    # Plain dicts straight from a select(*ITEM_COLUMNS) query, no ORM instances
+    rows = [dict(row) for row in (await db.execute(query)).mappings().all()]
+    if with_monthly_values:
+        values = await value_rows_by_item(db, [row["id"] for row in rows])
+        for row in rows:
+            row["monthly_values"] = values[row["id"]]
+    return rows
+
+async def settings_year(db: AsyncSession, user_id: int) -> int:
+    result = await db.execute(select(Settings.year).where(Settings.user_id == user_id).limit(1))
+    return result.scalar_one_or_none() or DEFAULT_YEAR
+
+@router.get("/", response_model=List[schemas.BudgetItem], dependencies=[Depends(data_version.conditional_get)])
 async def read_budget_items(
+    response: Response,
     skip: int = 0, 
     limit: int = 100, 
+    year: Optional[int] = Query(None, ge=1900, le=9999, description="Only the items the dashboard uses for this year, by default the settings year"),
+    all_years: bool = Query(False, description="Every item, including those of other years"),
+    fast: bool = Query(False, description=FAST_DESCRIPTION),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(auth_utils.get_current_user)
+    current_user: auth_utils.Principal = Depends(auth_utils.get_current_principal)
 ):
-    # Eager load monthly_values and filter by user
-    result = await db.execute(
-        select(models.BudgetItem)
-        .options(selectinload(models.BudgetItem.monthly_values))
-        .where(models.BudgetItem.user_id == current_user.id)
+    if all_years:
+        scope = models.BudgetItem.user_id == current_user.id
+    else:
+        scope = items_in_year(current_user.id, year or await settings_year(db, current_user.id))
+    rows = await item_rows(db, (
+        select(*ITEM_COLUMNS)
+        .where(scope)
         .offset(skip)
         .limit(limit)
-    )
-    return result.scalars().all()
+    ))
+    if fast:
+        return FastJSONResponse(rows, headers=response.headers)
+    return rows
 
 @router.post("/", response_model=schemas.BudgetItem)
 async def create_budget_item(
     item: schemas.BudgetItemCreate, 
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(auth_utils.get_current_user)
+    current_user: auth_utils.Principal = Depends(auth_utils.get_current_principal)
 ):
     db_item = models.BudgetItem(**item.dict(), user_id=current_user.id)
+    if db_item.year is None:
+        # Once the settings year has rolled-over items, undated ones no longer show up in it
+        year = await settings_year(db, current_user.id)
+        dated = await db.execute(
+            select(models.BudgetItem.id).where(models.BudgetItem.user_id == current_user.id, models.BudgetItem.year == year).limit(1)
+        )
+        if dated.first():
+            db_item.year = year
     db.add(db_item)
-    await db.commit()
+    await data_version.commit_write(db, current_user.id)
     await db.refresh(db_item)
     
     # Reload with relationships to avoid lazy load error during serialization
@@ -48,20 +89,78 @@ async def create_budget_item(
     )
     return result.scalar_one()
 
+@router.post("/rollover", response_model=schemas.BudgetRolloverResult)
+async def rollover_budget(
+    rollover: schemas.BudgetRollover,
+    db: AsyncSession = Depends(get_db),
+    current_user: auth_utils.Principal = Depends(auth_utils.get_current_principal)
+):
+    """Start a new budget year: copy the items of `from_year` and their plan into `to_year`.
+
+    Runs as INSERT ... SELECT statements in one transaction. Amounts can be scaled per
+    category, and the new plan can be the items' average monthly actuals instead.
+    """
+    unknown = sorted(set(rollover.scale) - set(CATEGORIES))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown categories: {', '.join(unknown)}")
+    from_year = rollover.from_year or await settings_year(db, current_user.id)
+    to_year = rollover.to_year or from_year + 1
+    if to_year == from_year:
+        raise HTTPException(status_code=400, detail="to_year must differ from from_year")
+    existing = await db.execute(
+        select(models.BudgetItem.id).where(models.BudgetItem.user_id == current_user.id, models.BudgetItem.year == to_year).limit(1)
+    )
+    if existing.first():
+        raise HTTPException(status_code=409, detail=f"The {to_year} budget already has items")
+
+    items, monthly_values = await clone_year(db, current_user.id, from_year, to_year, rollover.scale, rollover.plan)
+    if rollover.switch_year:
+        switched = await db.execute(update(Settings).where(Settings.user_id == current_user.id).values(year=to_year))
+        if not switched.rowcount:
+            db.add(Settings(year=to_year, user_id=current_user.id))
+    await data_version.commit_write(db, current_user.id)
+    return {"from_year": from_year, "to_year": to_year, "items": items, "monthly_values": monthly_values}
+
+async def delete_items(db: AsyncSession, user_id: int, *conditions) -> dict:
+    """Delete the user's items matching `conditions` with a single DELETE.
+
+    Monthly values, transactions and rollups go with them through ON DELETE CASCADE; the
+    cascaded rows are counted beforehand, none are loaded. The items are locked first
+    (FOR UPDATE, PostgreSQL), which holds off new rows referencing them until commit, so
+    the counts can only be off by rows another transaction deletes in between. They are
+    informational: nothing else is derived from them.
+    """
+    owned = (models.BudgetItem.user_id == user_id, *conditions)
+    item_ids = select(models.BudgetItem.id).where(*owned)
+    await db.execute(item_ids.with_for_update())
+    counts = {}
+    for name, model in (("monthly_values", MonthlyValue), ("transactions", Transaction)):
+        counts[name] = (await db.execute(
+            select(func.count()).select_from(model).where(model.budget_item_id.in_(item_ids))
+        )).scalar_one()
+    result = await db.execute(delete(models.BudgetItem).where(*owned).execution_options(synchronize_session=False))
+    return {"budget_items": result.rowcount, **counts}
+
+@router.post("/bulk-delete", response_model=schemas.BulkDeleteResult)
+async def delete_budget_items(
+    selection: schemas.BudgetItemBulkDelete,
+    db: AsyncSession = Depends(get_db),
+    current_user: auth_utils.Principal = Depends(auth_utils.get_current_principal)
+):
+    """Delete several items with their monthly values and transactions; ids of other users' or missing items are ignored."""
+    deleted = await delete_items(db, current_user.id, models.BudgetItem.id.in_(selection.ids))
+    if deleted["budget_items"]:
+        await data_version.commit_write(db, current_user.id)
+    return deleted
+
 @router.delete("/{item_id}")
 async def delete_budget_item(
     item_id: int, 
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(auth_utils.get_current_user)
+    current_user: auth_utils.Principal = Depends(auth_utils.get_current_principal)
 ):
-    result = await db.execute(
-        select(models.BudgetItem)
-        .where(models.BudgetItem.id == item_id, models.BudgetItem.user_id == current_user.id)
-    )
-    item = result.scalar_one_or_none()
-    if not item:
+    deleted = await delete_items(db, current_user.id, models.BudgetItem.id == item_id)
+    if not deleted["budget_items"]:
         raise HTTPException(status_code=404, detail="Item not found")
-    
-    await db.delete(item)
-    await db.commit()
+    await data_version.commit_write(db, current_user.id)
     return {"ok": True}
@@ -1,17 +1,69 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import date
+from typing import Optional
 from database import get_db
-from models.user import User
 from schemas import schemas
-from services.finance_engine import FinanceEngine
-from services import auth_utils
+from services.finance_engine import FinanceEngine, BACKENDS
+from services.analytics import AnalyticsEngine
+from services.cache import dashboard_cache
+from services.events import dashboard_events, dashboard_stream
+from services import auth_utils, data_version
 
 router = APIRouter(prefix="/dashboard", tags=["dashboard"])
 
-@router.get("/summary", response_model=schemas.DashboardSummary)
+@router.get("/summary", response_model=schemas.DashboardSummary, dependencies=[Depends(data_version.conditional_get)])
 async def get_dashboard_summary(
+    year: Optional[int] = Query(None, ge=1900, le=9999, description="Budget year, defaults to the year in the user's settings"),
+    backend: Optional[str] = Query(None, description=f"Aggregation backend override: {', '.join(BACKENDS)}"),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(auth_utils.get_current_user)
+    current_user: auth_utils.Principal = Depends(auth_utils.get_current_principal)
 ):
-    engine = FinanceEngine(db, current_user.id)
-    return await engine.get_dashboard_summary()
+    if backend is not None and backend not in BACKENDS:
+        raise HTTPException(status_code=400, detail=f"Unknown backend '{backend}'")
+    engine = FinanceEngine(db, current_user.id, year=year, backend=backend)
+    if backend is not None:
+        # Explicit backend comparisons always recompute
+        return await engine.get_dashboard_summary()
+    return await dashboard_cache.get_or_compute(current_user.id, year, engine.get_dashboard_summary)
+
+@router.get("/stream")
+async def stream_dashboard(
+    year: Optional[int] = Query(None, ge=1900, le=9999, description="Budget year, defaults to the year in the user's settings"),
+    db: AsyncSession = Depends(get_db),
+    current_user: auth_utils.Principal = Depends(auth_utils.get_current_principal)
+):
+    """Server-Sent Events: the full summary as a `summary` event, then a `delta` event with
+    the changed category totals, month buckets and breakdown rows after every write.
+
+    Delta payloads use the /dashboard/summary shapes, keyed the same way; breakdown rows
+    carry `budget_item_id`. A new `summary` event replaces the client's copy entirely.
+    """
+    async def load():
+        state = await FinanceEngine(db, current_user.id, year=year).load_state()
+        # Give the connection back to the pool while the stream waits for changes
+        await db.close()
+        return state
+
+    return StreamingResponse(
+        dashboard_stream(dashboard_events, current_user.id, load),
+        media_type="text/event-stream",
+        # X-Accel-Buffering stops nginx-style proxies from holding events back
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/analytics", response_model=schemas.DashboardAnalytics)
+async def get_dashboard_analytics(
+    year: Optional[int] = Query(None, ge=1900, le=9999, description="Year to analyse, defaults to the year in the user's settings"),
+    as_of: Optional[date] = Query(None, description="Reference date for the run-rate projection, defaults to today"),
+    db: AsyncSession = Depends(get_db),
+    current_user: auth_utils.Principal = Depends(auth_utils.get_current_principal)
+):
+    """Rolling 3/6/12-month category averages, year-over-year deltas per item and a
+    run-rate projection of year-end actuals against the plan."""
+    return await AnalyticsEngine(db, current_user.id, year=year, as_of=as_of).get_analytics()
+
+@router.get("/cache-stats")
+async def get_cache_stats(current_user: auth_utils.Principal = Depends(auth_utils.get_current_principal)):
+    return dashboard_cache.stats()
@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import date
+
+from database import get_db
+from services import auth_utils, exporters
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+MEDIA_TYPES = {
+    "csv": ("application/zip", "zip"),
+    "parquet": ("application/zip", "zip"),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx"),
+}
+
+@router.get("/")
+async def export_budget(
+    format: str = Query("csv", description="csv or parquet (one file per table in a ZIP archive), or xlsx (template layout)"),
+    db: AsyncSession = Depends(get_db),
+    current_user: auth_utils.Principal = Depends(auth_utils.get_current_principal)
+):
+    """Download settings, budget items, monthly plan and transactions.
+
+    Rows are fetched from a server-side cursor in chunks and encoded while the response is
+    being sent, so memory stays constant however long the transaction history is.
+    """
+    if format not in exporters.FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format '{format}'")
+    if format == "parquet" and not exporters.parquet_available():
+        raise HTTPException(status_code=400, detail="Parquet export requires pyarrow on the server")
+
+    media_type, extension = MEDIA_TYPES[format]
+    filename = f"budget-{format}-{date.today().isoformat()}.{extension}"
+    return StreamingResponse(
+        exporters.export_stream(format, db, current_user.id),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -0,0 +1,157 @@
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, insert
+from collections import defaultdict
+from decimal import Decimal
+from itertools import islice
+from typing import Dict, Tuple
+
+from database import get_db
+from models.budget_item import BudgetItem
+from models.settings import Settings
+from models.transaction import Transaction
+from routers.monthly_values import upsert_values
+from routers.transactions import IMPORT_BATCH_SIZE, MAX_REPORTED_ERRORS
+from schemas import schemas
+from services import auth_utils, data_version, rollups
+from services.finance_engine import DEFAULT_YEAR
+from services.rollover import ItemYears
+from services.workbook import TemplateWorkbook, WorkbookError
+
+router = APIRouter(prefix="/import", tags=["import"])
+
+def _take(iterator, size: int):
+    return list(islice(iterator, size))
+
+@router.post("/workbook", response_model=schemas.WorkbookImportResult)
+async def import_workbook(
+    file: UploadFile = File(..., description="A filled-in Yearly Budget Template (.xlsm or .xlsx)"),
+    db: AsyncSession = Depends(get_db),
+    current_user: auth_utils.Principal = Depends(auth_utils.get_current_principal)
+):
+    """Import budget lines, the monthly plan and the transaction log of the Excel template.
+
+    Budget lines are matched to existing items by category and name, missing ones are
+    created. Planned amounts overwrite the stored ones; transactions are appended.
+    Everything is written in one database transaction.
+    """
+    # The upload is spooled to disk past 1 MB and the sheets are read row by row in a
+    # worker thread, a batch at a time, so neither memory nor the event loop depend on size
+    try:
+        book = await run_in_threadpool(TemplateWorkbook, file.file)
+    except WorkbookError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        try:
+            settings = await run_in_threadpool(book.settings)
+            income_types = await run_in_threadpool(book.income_types)
+            lines = await run_in_threadpool(lambda: list(book.budget_lines()))
+        except WorkbookError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        year = settings["year"]
+        if year is None:
+            year = (await db.execute(select(Settings.year).where(Settings.user_id == current_user.id).limit(1))).scalar_one_or_none() or DEFAULT_YEAR
+        items_res = await db.execute(
+            select(BudgetItem.id, BudgetItem.category, BudgetItem.name, BudgetItem.year, BudgetItem.rolled_from_id)
+            .where(BudgetItem.user_id == current_user.id)
+            .order_by(BudgetItem.id)
+        )
+        existing = items_res.all()
+        years = ItemYears((item_id, item_year, rolled_from_id) for item_id, _, _, item_year, rolled_from_id in existing)
+        # Names match the items of the workbook's year first (after a rollover, the clones)
+        items: Dict[Tuple[str, str], int] = {}
+        for item_id, category, name, _, _ in sorted(existing, key=lambda row: not years.covers(row[0], year)):
+            items.setdefault((category, (name or "").strip().lower()), item_id)
+        new_item_year = years.year_for_new_items(year)
+        created = 0
+
+        async def create_items(keys):
+            nonlocal created
+            rows = [
+                {"name": name, "category": category, "user_id": current_user.id, "year": new_item_year,
+                 "type": income_types.get(name.lower(), "active") if category == "income" else "active"}
+                for category, name in keys
+            ]
+            if not rows:
+                return
+            result = await db.execute(
+                insert(BudgetItem).returning(BudgetItem.id, BudgetItem.category, BudgetItem.name), rows
+            )
+            for item_id, category, name in result.all():
+                items[(category, name.lower())] = item_id
+                years.add(item_id, new_item_year)
+            created += len(rows)
+
+        new_keys = {}
+        for _, category, name, _ in lines:
+            if (category, name.lower()) not in items:
+                new_keys.setdefault((category, name.lower()), (category, name))
+        await create_items(new_keys.values())
+
+        # Later lines win when the sheet names the same item twice
+        cells: Dict[Tuple[int, int], Decimal] = {}
+        for _, category, name, amounts in lines:
+            item_id = items[(category, name.lower())]
+            for month, amount in enumerate(amounts, start=1):
+                cells[(item_id, month)] = amount
+        if cells:
+            await upsert_values(db, current_user.id, cells)
+
+        inserted, failed, errors = 0, 0, []
+        records = book.transactions()
+        while True:
+            chunk = await run_in_threadpool(_take, records, IMPORT_BATCH_SIZE)
+            if not chunk:
+                break
+            # Items that only appear in the transaction log are created on the fly
+            await create_items({
+                (row["category"], row["budget_item"].lower()): (row["category"], row["budget_item"])
+                for _, row, _ in chunk
+                if row is not None and (row["category"], row["budget_item"].lower()) not in items
+            }.values())
+
+            batch = []
+            deltas = defaultdict(Decimal)
+            for line, row, error in chunk:
+                if error is None:
+                    item_id = years.resolve(items[(row["category"], row["budget_item"].lower())], row["date"].year)
+                    if item_id is None:
+                        error = f"budget item is not part of the {row['date'].year} budget"
+                if error is not None:
+                    failed += 1
+                    if len(errors) < MAX_REPORTED_ERRORS:
+                        errors.append({"line": line, "error": error})
+                    continue
+                batch.append({
+                    "date": row["date"], "amount": row["amount"], "budget_item_id": item_id,
+                    "user_id": current_user.id, "comment": row["comment"],
+                })
+                deltas[(item_id, row["date"].year, row["date"].month)] += row["amount"]
+            if batch:
+                await db.execute(insert(Transaction), batch)
+                await rollups.add_actuals(db, current_user.id, deltas)
+                inserted += len(batch)
+    finally:
+        await run_in_threadpool(book.close)
+
+    if settings["year"] is not None:
+        result = await db.execute(select(Settings).where(Settings.user_id == current_user.id))
+        db_settings = result.scalars().first()
+        if db_settings is None:
+            db_settings = Settings(user_id=current_user.id, year=settings["year"])
+            db.add(db_settings)
+        db_settings.year = settings["year"]
+        if settings["currency"]:
+            db_settings.currency = settings["currency"]
+
+    await data_version.commit_write(db, current_user.id)
+    return {
+        "year": settings["year"],
+        "currency": settings["currency"],
+        "items_created": created,
+        "monthly_values": len(cells),
+        "transactions": {"inserted": inserted, "failed": failed, "errors": errors},
+    }
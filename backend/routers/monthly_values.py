@@ -1,50 +1,106 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from typing import List
+from typing import Dict, Iterable, List, Tuple
+from decimal import Decimal
 
-from database import get_db
+from database import get_db, dialect_insert
 from models import monthly_value as models
-from models.user import User
+from models.budget_item import BudgetItem
 from schemas import schemas
-from services import auth_utils
+from services import auth_utils, data_version, rollups
+from services.fast_json import FAST_DESCRIPTION, FastJSONResponse
 
 router = APIRouter(prefix="/monthly-values", tags=["monthly-values"])
 
-@router.get("/", response_model=List[schemas.MonthlyValue])
+# Cells per INSERT statement, keeps bind parameters well below the driver limit (32767)
+UPSERT_CHUNK_SIZE = 5000
+
+# Field order of schemas.MonthlyValue
+VALUE_COLUMNS = (
+    models.MonthlyValue.budget_item_id, models.MonthlyValue.month,
+    models.MonthlyValue.planned_amount, models.MonthlyValue.id,
+)
+
+async def value_rows_by_item(db: AsyncSession, item_ids: Iterable[int]) -> Dict[int, List[dict]]:
+    grouped = {item_id: [] for item_id in item_ids}
+    if grouped:
+        result = await db.execute(select(*VALUE_COLUMNS).where(models.MonthlyValue.budget_item_id.in_(grouped)))
+        for row in result.mappings().all():
+            grouped[row["budget_item_id"]].append(dict(row))
+    return grouped
+
+@router.get("/", response_model=List[schemas.MonthlyValue], dependencies=[Depends(data_version.conditional_get)])
 async def read_monthly_values(
+    response: Response,
+    fast: bool = Query(False, description=FAST_DESCRIPTION),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(auth_utils.get_current_user)
+    current_user: auth_utils.Principal = Depends(auth_utils.get_current_principal)
 ):
     result = await db.execute(
-        select(models.MonthlyValue)
+        select(*VALUE_COLUMNS)
         .where(models.MonthlyValue.user_id == current_user.id)
     )
-    return result.scalars().all()
+    rows = [dict(row) for row in result.mappings().all()]
+    if fast:
+        return FastJSONResponse(rows, headers=response.headers)
+    return rows
+
+async def upsert_values(db: AsyncSession, user_id: int, cells: Dict[Tuple[int, int], Decimal]):
+    # INSERT ... ON CONFLICT (budget_item_id, month) DO UPDATE for every cell, after checking
+    # that all referenced items belong to the user
+    item_ids = {item_id for item_id, _ in cells}
+    owned = await db.execute(
+        select(BudgetItem.id).where(BudgetItem.id.in_(item_ids), BudgetItem.user_id == user_id)
+    )
+    if len(owned.all()) != len(item_ids):
+        raise HTTPException(status_code=404, detail="Item not found")
+
+    rows = [
+        {"budget_item_id": item_id, "month": month, "planned_amount": amount, "user_id": user_id}
+        for (item_id, month), amount in cells.items()
+    ]
+    saved = []
+    for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+        stmt = dialect_insert(db, models.MonthlyValue).values(rows[start:start + UPSERT_CHUNK_SIZE])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["budget_item_id", "month"],
+            set_={"planned_amount": stmt.excluded.planned_amount, "user_id": stmt.excluded.user_id}
+        ).returning(
+            models.MonthlyValue.id, models.MonthlyValue.budget_item_id,
+            models.MonthlyValue.month, models.MonthlyValue.planned_amount
+        )
+        saved.extend((await db.execute(stmt)).mappings().all())
+    await rollups.set_planned_many(db, user_id, cells)
+    return saved
 
 @router.post("/", response_model=schemas.MonthlyValue)
 async def create_monthly_value(
     value: schemas.MonthlyValueCreate, 
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(auth_utils.get_current_user)
+    current_user: auth_utils.Principal = Depends(auth_utils.get_current_principal)
 ):
-    # Upsert logic: Check if exists for this item, month AND user
-    query = select(models.MonthlyValue).where(
-        models.MonthlyValue.budget_item_id == value.budget_item_id,
-        models.MonthlyValue.month == value.month,
-        models.MonthlyValue.user_id == current_user.id
-    )
-    result = await db.execute(query)
-    db_val = result.scalar_one_or_none()
-
-    if db_val:
-        # Update existing
-        db_val.planned_amount = value.planned_amount
-    else:
-        # Create new
-        db_val = models.MonthlyValue(**value.dict(), user_id=current_user.id)
-        db.add(db_val)
-    
-    await db.commit()
-    await db.refresh(db_val)
-    return db_val
+    cells = {(value.budget_item_id, value.month): value.planned_amount}
+    saved = await upsert_values(db, current_user.id, cells)
+    await data_version.commit_write(db, current_user.id, planned=cells)
+    return saved[0]
+
+@router.post("/batch", response_model=List[schemas.MonthlyValue])
+async def upsert_monthly_values(
+    batch: schemas.MonthlyValueBatch,
+    db: AsyncSession = Depends(get_db),
+    current_user: auth_utils.Principal = Depends(auth_utils.get_current_principal)
+):
+    # Later cells win when the same (item, month) appears twice in one request
+    cells: Dict[Tuple[int, int], Decimal] = {}
+    for row in batch.rows:
+        for month, amount in enumerate(row.planned_amounts, start=1):
+            cells[(row.budget_item_id, month)] = amount
+    for value in batch.values:
+        cells[(value.budget_item_id, value.month)] = value.planned_amount
+    if not cells:
+        return []
+
+    saved = await upsert_values(db, current_user.id, cells)
+    await data_version.commit_write(db, current_user.id, planned=cells)
+    return saved
@@ -5,18 +5,17 @@ from typing import List
 
 from database import get_db
 from models import settings as models
-from models.user import User
 from schemas import schemas
-from services import auth_utils
+from services import auth_utils, data_version
 
 router = APIRouter(prefix="/settings", tags=["settings"])
 
-@router.get("/", response_model=List[schemas.Settings])
+@router.get("/", response_model=List[schemas.Settings], dependencies=[Depends(data_version.conditional_get)])
 async def read_settings(
     skip: int = 0, 
     limit: int = 100, 
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(auth_utils.get_current_user)
+    current_user: auth_utils.Principal = Depends(auth_utils.get_current_principal)
 ):
     result = await db.execute(
         select(models.Settings)
@@ -30,7 +29,7 @@ async def read_settings(
 async def create_settings(
     settings: schemas.SettingsCreate, 
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(auth_utils.get_current_user)
+    current_user: auth_utils.Principal = Depends(auth_utils.get_current_principal)
 ):
     # Check if settings already exist for this user
     result = await db.execute(select(models.Settings).where(models.Settings.user_id == current_user.id))
@@ -45,6 +44,6 @@ async def create_settings(
         db_settings = models.Settings(**settings.dict(), user_id=current_user.id)
         db.add(db_settings)
         
-    await db.commit()
+    await data_version.commit_write(db, current_user.id)
     await db.refresh(db_settings)
     return db_settings
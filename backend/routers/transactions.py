@@ -1,46 +1,118 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, insert, delete, tuple_
 from sqlalchemy.orm import selectinload
-from typing import List
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from typing import List, Optional
+import base64
 
 from database import get_db
 from models.transaction import Transaction
-from models.budget_item import BudgetItem
-from models.user import User
+from models.budget_item import BudgetItem, CATEGORIES
 from schemas import schemas
-from services import auth_utils
+from services import auth_utils, data_version, rollups, importers
+from services.fast_json import FAST_DESCRIPTION, FastJSONResponse
+from services.rollover import ItemYears
+from routers.budget_items import ITEM_COLUMNS, item_rows
 
 router = APIRouter(prefix="/transactions", tags=["transactions"])
 
-@router.get("/", response_model=List[schemas.Transaction])
+# Bulk import tuning
+IMPORT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+
+EXPAND_OPTIONS = ("budget_item", "budget_item.monthly_values")
+
+def _encode_cursor(tx_date: date, tx_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{tx_date.isoformat()}:{tx_id}".encode()).decode().rstrip("=")
+
+def _decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        tx_date, tx_id = raw.split(":")
+        return date.fromisoformat(tx_date), int(tx_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@router.get("/", response_model=List[schemas.Transaction], response_model_exclude_unset=True, dependencies=[Depends(data_version.conditional_get)])
 async def read_transactions(
-    skip: int = 0, 
-    limit: int = 100, 
+    response: Response,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value of the previous page"),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    budget_item_id: Optional[int] = None,
+    category: Optional[str] = None,
+    expand: Optional[str] = Query(None, description=f"Comma separated: {', '.join(EXPAND_OPTIONS)}"),
+    fast: bool = Query(False, description=FAST_DESCRIPTION),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(auth_utils.get_current_user)
+    current_user: auth_utils.Principal = Depends(auth_utils.get_current_principal)
 ):
-    result = await db.execute(
-        select(Transaction)
-        .options(
-            selectinload(Transaction.budget_item)
-            .selectinload(BudgetItem.monthly_values)
-        )
+    """Newest first, paginated by (date, id). The next page cursor is sent in X-Next-Cursor."""
+    expand_set = set(filter(None, (e.strip() for e in (expand or "").split(","))))
+    if not expand_set <= set(EXPAND_OPTIONS):
+        raise HTTPException(status_code=400, detail=f"expand must be one of: {', '.join(EXPAND_OPTIONS)}")
+
+    # Field order of schemas.Transaction
+    query = (
+        select(Transaction.date, Transaction.amount, Transaction.budget_item_id, Transaction.comment, Transaction.id)
         .where(Transaction.user_id == current_user.id)
-        .offset(skip)
-        .limit(limit)
+        .order_by(Transaction.date.desc(), Transaction.id.desc())
+        .limit(limit + 1)
     )
-    return result.scalars().all()
+    if cursor:
+        query = query.where(tuple_(Transaction.date, Transaction.id) < tuple_(*_decode_cursor(cursor)))
+    if date_from:
+        query = query.where(Transaction.date >= date_from)
+    if date_to:
+        query = query.where(Transaction.date <= date_to)
+    if budget_item_id is not None:
+        query = query.where(Transaction.budget_item_id == budget_item_id)
+    if category:
+        if category.lower() not in CATEGORIES:
+            raise HTTPException(status_code=400, detail=f"category must be one of: {', '.join(CATEGORIES)}")
+        query = query.where(Transaction.budget_item_id.in_(
+            select(BudgetItem.id).where(BudgetItem.user_id == current_user.id, BudgetItem.category == category.lower())
+        ))
+
+    rows = [dict(row) for row in (await db.execute(query)).mappings().all()]
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = _encode_cursor(rows[-1]["date"], rows[-1]["id"])
+
+    if expand_set and rows:
+        items = {
+            item["id"]: item
+            for item in await item_rows(
+                db, select(*ITEM_COLUMNS).where(BudgetItem.id.in_({row["budget_item_id"] for row in rows})),
+                with_monthly_values="budget_item.monthly_values" in expand_set,
+            )
+        }
+        for row in rows:
+            row["budget_item"] = items.get(row["budget_item_id"])
+    if fast:
+        return FastJSONResponse(rows, headers=response.headers)
+    return rows
 
 @router.post("/", response_model=schemas.Transaction)
 async def create_transaction(
     transaction: schemas.TransactionCreate, 
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(auth_utils.get_current_user)
+    current_user: auth_utils.Principal = Depends(auth_utils.get_current_principal)
 ):
-    db_transaction = Transaction(**transaction.dict(), user_id=current_user.id)
+    years = await ItemYears.load(db, current_user.id)
+    if transaction.budget_item_id not in years.years:
+        raise HTTPException(status_code=404, detail="Item not found")
+    # Booked on the item of the transaction's year (its rollover clone, say)
+    item_id = years.resolve(transaction.budget_item_id, transaction.date.year)
+    if item_id is None:
+        raise HTTPException(status_code=400, detail=f"The budget item is not part of the {transaction.date.year} budget")
+    db_transaction = Transaction(**transaction.dict(exclude={"budget_item_id"}), budget_item_id=item_id, user_id=current_user.id)
     db.add(db_transaction)
-    await db.commit()
+    await rollups.add_actual(db, current_user.id, item_id, transaction.date, transaction.amount)
+    await data_version.commit_write(db, current_user.id, actuals={(item_id, transaction.date.year, transaction.date.month): transaction.amount})
     await db.refresh(db_transaction)
     
     # Reload with relationships
@@ -58,7 +130,7 @@ async def create_transaction(
 async def delete_transaction(
     tx_id: int, 
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(auth_utils.get_current_user)
+    current_user: auth_utils.Principal = Depends(auth_utils.get_current_principal)
 ):
     result = await db.execute(
         select(Transaction)
@@ -67,7 +139,127 @@ async def delete_transaction(
     tx = result.scalar_one_or_none()
     if not tx:
         raise HTTPException(status_code=404, detail="Transaction not found")
+    change = {(tx.budget_item_id, tx.date.year, tx.date.month): -tx.amount}
+    await rollups.add_actual(db, current_user.id, tx.budget_item_id, tx.date, -tx.amount)
     await db.delete(tx)
-    await db.commit()
+    await data_version.commit_write(db, current_user.id, actuals=change)
     return {"ok": True}
-        
+
+@router.post("/bulk-delete", response_model=schemas.BulkDeleteResult)
+async def delete_transactions(
+    selection: schemas.TransactionBulkDelete,
+    db: AsyncSession = Depends(get_db),
+    current_user: auth_utils.Principal = Depends(auth_utils.get_current_principal)
+):
+    """Delete the transactions matching every given filter (ids, date range, budget item) with a single DELETE."""
+    conditions = [Transaction.user_id == current_user.id]
+    if selection.ids is not None:
+        conditions.append(Transaction.id.in_(selection.ids))
+    if selection.date_from:
+        conditions.append(Transaction.date >= selection.date_from)
+    if selection.date_to:
+        conditions.append(Transaction.date <= selection.date_to)
+    if selection.budget_item_id is not None:
+        conditions.append(Transaction.budget_item_id == selection.budget_item_id)
+    if len(conditions) == 1:
+        raise HTTPException(status_code=400, detail="Pass ids, date_from, date_to or budget_item_id")
+
+    # Rollup deltas from the rows the DELETE actually removed, so a concurrent write cannot slip in between
+    result = await db.execute(
+        delete(Transaction).where(*conditions)
+        .returning(Transaction.budget_item_id, Transaction.date, Transaction.amount)
+        .execution_options(synchronize_session=False)
+    )
+    change, deleted = defaultdict(Decimal), 0
+    for item_id, tx_date, amount in result.all():
+        change[(item_id, tx_date.year, tx_date.month)] -= amount
+        deleted += 1
+    if not deleted:
+        return {"transactions": 0}
+
+    await rollups.add_actuals(db, current_user.id, change)
+    await data_version.commit_write(db, current_user.id, actuals=change)
+    return {"transactions": deleted}
+
+@router.post("/bulk", response_model=schemas.BulkImportResult)
+async def import_transactions(
+    request: Request,
+    format: str = Query("csv", description="csv, ofx or qif"),
+    budget_item_id: Optional[int] = Query(None, description="Budget item for rows that do not name one"),
+    date_format: Optional[str] = Query(None, description="strptime format of the CSV date column, ISO 8601 by default"),
+    absolute: bool = Query(False, description="Store amounts without sign (bank debits are usually negative)"),
+    db: AsyncSession = Depends(get_db),
+    current_user: auth_utils.Principal = Depends(auth_utils.get_current_principal)
+):
+    """Import a statement sent as the raw request body.
+
+    The body is parsed while it streams in and valid rows are inserted in multi-row batches;
+    rows that fail validation are reported by line number and skipped.
+    """
+    if format not in importers.FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format '{format}'")
+
+    items_res = await db.execute(
+        select(BudgetItem.id, BudgetItem.name, BudgetItem.year, BudgetItem.rolled_from_id)
+        .where(BudgetItem.user_id == current_user.id)
+        .order_by(BudgetItem.id)
+    )
+    rows = items_res.all()
+    years = ItemYears((item_id, year, rolled_from_id) for item_id, _, year, rolled_from_id in rows)
+    item_ids, item_names = set(years.years), {}
+    for item_id, name, _, _ in rows:
+        item_names.setdefault((name or "").strip().lower(), item_id)
+    if budget_item_id is not None and budget_item_id not in item_ids:
+        raise HTTPException(status_code=404, detail="Item not found")
+
+    inserted, failed, errors = 0, 0, []
+    batch = []
+    deltas = defaultdict(Decimal)
+    changes = defaultdict(Decimal) # every batch, published to open dashboards after commit
+
+    async def flush():
+        nonlocal inserted
+        if batch:
+            await db.execute(insert(Transaction), batch)
+            await rollups.add_actuals(db, current_user.id, deltas)
+            for key, amount in deltas.items():
+                changes[key] += amount
+            inserted += len(batch)
+            batch.clear()
+            deltas.clear()
+
+    async for line, row, error in importers.get_parser(format, request.stream(), date_format):
+        if row is not None:
+            item_id = row["budget_item_id"]
+            if item_id is None and row["budget_item"]:
+                item_id = item_names.get(row["budget_item"].lower())
+                if item_id is None:
+                    error = f"unknown budget item '{row['budget_item']}'"
+            elif item_id is None:
+                item_id = budget_item_id
+            if error is None and item_id not in item_ids:
+                error = "budget item is missing or does not belong to you"
+            elif error is None:
+                year = row["date"].year
+                item_id = years.resolve(item_id, year)
+                if item_id is None:
+                    error = f"budget item is not part of the {year} budget"
+        if error is not None:
+            failed += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append({"line": line, "error": error})
+            continue
+
+        amount = abs(row["amount"]) if absolute else row["amount"]
+        batch.append({
+            "date": row["date"], "amount": amount, "budget_item_id": item_id,
+            "user_id": current_user.id, "comment": row["comment"],
+        })
+        deltas[(item_id, row["date"].year, row["date"].month)] += amount
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            await flush()
+
+    await flush()
+    if inserted:
+        await data_version.commit_write(db, current_user.id, actuals=changes)
+    return {"inserted": inserted, "failed": failed, "errors": errors}
@@ -1,8 +1,21 @@
-from pydantic import BaseModel
-from typing import Optional, List, Dict
+from pydantic import BaseModel, Field, AfterValidator, BeforeValidator
+from typing import Annotated, Optional, List, Dict, Literal
 from datetime import date, datetime
 from decimal import Decimal
 
+from models.budget_item import CATEGORIES, ITEM_TYPES
+from services.money import quantize
+
+# Amounts are rounded to cents on input, matching the NUMERIC(14, 2) columns
+Money = Annotated[Decimal, AfterValidator(quantize)]
+
+def _lower(value):
+    return value.strip().lower() if isinstance(value, str) else value
+
+# Stored as SMALLINT codes (see models.budget_item), sent and received as names, case-insensitively
+Category = Annotated[Literal[CATEGORIES], BeforeValidator(_lower)]
+ItemType = Annotated[Literal[ITEM_TYPES], BeforeValidator(_lower)]
+
 # Settings
 class SettingsBase(BaseModel):
     year: int
@@ -19,8 +32,8 @@ class Settings(SettingsBase):
 # Monthly Values
 class MonthlyValueBase(BaseModel):
     budget_item_id: int
-    month: int
-    planned_amount: Decimal = Decimal("0.00")
+    month: int = Field(ge=1, le=12)
+    planned_amount: Money = Decimal("0.00")
 
 class MonthlyValueCreate(MonthlyValueBase):
     pass
@@ -30,13 +43,23 @@ class MonthlyValue(MonthlyValueBase):
     class Config:
         from_attributes = True
 
+class MonthlyValueRow(BaseModel):
+    # One line of the planning grid, January first
+    budget_item_id: int
+    planned_amounts: List[Money] = Field(min_length=12, max_length=12)
+
+class MonthlyValueBatch(BaseModel):
+    rows: List[MonthlyValueRow] = []
+    values: List[MonthlyValueCreate] = []
+
 # Budget Items
 class BudgetItemBase(BaseModel):
     name: str
-    category: str
+    category: Category
     sub_category: Optional[str] = None
-    type: str = "active"
+    type: ItemType = "active"
     is_active: bool = True
+    year: Optional[int] = None # None: used by every year without items of its own
 
 class BudgetItemCreate(BudgetItemBase):
     pass
@@ -47,10 +70,25 @@ class BudgetItem(BudgetItemBase):
     class Config:
         from_attributes = True
 
+class BudgetRollover(BaseModel):
+    from_year: Optional[int] = Field(None, ge=1900, le=9999) # defaults to the year in the user's settings
+    to_year: Optional[int] = Field(None, ge=1900, le=9999) # defaults to from_year + 1
+    # Multiplier per category, e.g. {"expense": 1.03} for +3% on expenses
+    scale: Dict[str, Annotated[Decimal, Field(gt=0, le=100)]] = {}
+    # "planned" copies the plan, "actual_average" plans every month at the item's average monthly actual of from_year
+    plan: Literal["planned", "actual_average"] = "planned"
+    switch_year: bool = True # move the settings year to to_year
+
+class BudgetRolloverResult(BaseModel):
+    from_year: int
+    to_year: int
+    items: int
+    monthly_values: int
+
 # Transactions
 class TransactionBase(BaseModel):
     date: date
-    amount: Decimal
+    amount: Money
     budget_item_id: int
     comment: Optional[str] = None
 
@@ -65,6 +103,37 @@ class Transaction(TransactionBase):
     class Config:
         from_attributes = True
 
+class BulkImportError(BaseModel):
+    line: int
+    error: str
+
+class BulkImportResult(BaseModel):
+    inserted: int
+    failed: int
+    errors: List[BulkImportError]
+
+class BudgetItemBulkDelete(BaseModel):
+    ids: List[int] = Field(min_length=1)
+
+class TransactionBulkDelete(BaseModel):
+    # Transactions matching every given filter are deleted; at least one is required
+    ids: Optional[List[int]] = Field(None, min_length=1)
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+    budget_item_id: Optional[int] = None
+
+class BulkDeleteResult(BaseModel):
+    budget_items: int = 0
+    monthly_values: int = 0
+    transactions: int = 0
+
+class WorkbookImportResult(BaseModel):
+    year: Optional[int] = None
+    currency: Optional[str] = None
+    items_created: int
+    monthly_values: int
+    transactions: BulkImportResult
+
 # --- Authentication ---
 class UserBase(BaseModel):
     email: str
@@ -91,6 +160,7 @@ class CategorySummary(BaseModel):
     diff: float
 
 class CategoryBreakdown(BaseModel):
+    budget_item_id: Optional[int] = None
     sub_category: str
     budget: float
     actual: float
@@ -125,3 +195,43 @@ class DashboardSummary(BaseModel):
     breakdown: Dict[str, List[CategoryBreakdown]]
     type_breakdown: Dict[str, TypeSummary]
     settings: DashboardSettings
+
+class RollingPoint(BaseModel):
+    month: int
+    actual: float
+    avg_3: Optional[float] = None
+    avg_6: Optional[float] = None
+    avg_12: Optional[float] = None
+
+class ItemYearOverYear(BaseModel):
+    budget_item_id: int
+    name: Optional[str] = None
+    category: str
+    actual: float
+    previous_actual: float
+    delta: float
+    delta_pct: Optional[float] = None
+
+class Projection(BaseModel):
+    ytd_actual: float
+    projected: Optional[float] = None
+    planned: float
+    projected_diff: Optional[float] = None
+
+class ItemProjection(Projection):
+    budget_item_id: int
+    name: Optional[str] = None
+    category: str
+
+class ProjectionSummary(BaseModel):
+    items: List[ItemProjection]
+    categories: Dict[str, Projection]
+
+class DashboardAnalytics(BaseModel):
+    year: int
+    years: List[int]
+    months_elapsed: int
+    rolling_windows: List[int]
+    rolling: Dict[str, List[RollingPoint]]
+    year_over_year: List[ItemYearOverYear]
+    projection: ProjectionSummary
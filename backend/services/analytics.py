@@ -0,0 +1,213 @@
+from sqlalchemy import select, type_coerce, SmallInteger
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+
+from models.budget_item import BudgetItem, CATEGORY
+from models.monthly_rollup import MonthlyRollup, PLAN_YEAR
+from models.settings import Settings
+from services.finance_engine import CATEGORIES, POSITIVE_CATEGORIES, DEFAULT_YEAR, items_in_year
+from services.money import cents_column
+
+# Multi-year analytics over the items x years x months matrix of monthly_rollups.
+# The matrix is loaded once into NumPy arrays and every metric is a whole-array
+# operation (cumsum windows, axis sums, category one-hot products); nothing loops
+# per item or per month in Python.
+
+ROLLING_WINDOWS = (3, 6, 12)
+
+class MonthlyMatrix:
+    """Planned amounts per (item, month) and actual amounts per (item, year, month)."""
+    __slots__ = ("item_ids", "names", "categories", "years", "planned", "actual")
+
+    def __init__(self, item_ids: np.ndarray, names: List[str], categories: np.ndarray, years: np.ndarray, planned: np.ndarray, actual: np.ndarray):
+        self.item_ids = item_ids      # (I,)
+        self.names = names            # I names
+        self.categories = categories  # (I,) category codes, i.e. indexes into CATEGORIES
+        self.years = years            # (Y,) consecutive years
+        self.planned = planned        # (I, 12)
+        self.actual = actual          # (I, Y, 12)
+
+def build_matrix(items: Sequence[Any], planned_rows: Iterable[Tuple[int, int, Any]], actual_rows: Iterable[Tuple[int, int, int, Any]], years: Iterable[int] = ()) -> MonthlyMatrix:
+    """`items` need `id`, `name` and `category` (name or code); planned rows are (item_id, month, cents),
+    actual rows (item_id, year, month, cents). `years` are always included in the range.
+
+    Amounts are integer cents held in float64, which represents them exactly up to 2**53,
+    so the sums below are exact; only averages and projections are fractional."""
+    order = sorted(items, key=lambda item: item.id)
+    item_ids = np.array([item.id for item in order], dtype=np.int64)
+    categories = np.array([CATEGORY.code(item.category) for item in order], dtype=np.int64)
+
+    p_items, p_months, p_amounts = _columns(planned_rows, 3)
+    a_items, a_years, a_months, a_amounts = _columns(actual_rows, 4)
+
+    bounds = list(years) + ([int(a_years.min()), int(a_years.max())] if len(a_years) else [])
+    first, last = (min(bounds), max(bounds)) if bounds else (DEFAULT_YEAR, DEFAULT_YEAR)
+    year_range = np.arange(first, last + 1, dtype=np.int64)
+
+    shape_planned = (len(item_ids), 12)
+    shape_actual = (len(item_ids), len(year_range), 12)
+    # Rows of items that were not loaded (e.g. deleted meanwhile) are dropped; bincount
+    # over flat cell indexes sums duplicate cells much faster than np.add.at
+    p_idx, p_ok = _positions(item_ids, p_items)
+    p_cells = np.ravel_multi_index((p_idx[p_ok], p_months[p_ok] - 1), shape_planned)
+    planned = np.bincount(p_cells, p_amounts[p_ok], minlength=np.prod(shape_planned)).reshape(shape_planned)
+    a_idx, a_ok = _positions(item_ids, a_items)
+    a_cells = np.ravel_multi_index((a_idx[a_ok], a_years[a_ok] - first, a_months[a_ok] - 1), shape_actual)
+    actual = np.bincount(a_cells, a_amounts[a_ok], minlength=np.prod(shape_actual)).reshape(shape_actual)
+    return MonthlyMatrix(item_ids, [item.name for item in order], categories, year_range, planned, actual)
+
+def _columns(rows, width: int):
+    # One conversion of the row tuples into a (rows x width) float array, then split;
+    # ids, months and cents are all integers and exact in float64
+    table = np.array(list(rows), dtype=float).reshape(-1, width)
+    return [table[:, i].astype(np.int64) for i in range(width - 1)] + [table[:, -1]]
+
+def _positions(item_ids: np.ndarray, ids: np.ndarray):
+    idx = np.searchsorted(item_ids, ids)
+    idx = np.minimum(idx, max(len(item_ids) - 1, 0))
+    ok = (item_ids[idx] == ids) if len(item_ids) else np.zeros(len(ids), dtype=bool)
+    return idx, ok
+
+def rolling_mean(series: np.ndarray, window: int) -> np.ndarray:
+    """Trailing mean over the last axis; NaN until a full window is available."""
+    cumulative = np.cumsum(series, axis=-1)
+    result = np.full(series.shape, np.nan)
+    if series.shape[-1] >= window:
+        sums = cumulative[..., window - 1:].copy()
+        sums[..., 1:] -= cumulative[..., :-window]
+        result[..., window - 1:] = sums / window
+    return result
+
+def months_elapsed(year: int, as_of: date) -> int:
+    if as_of.year > year:
+        return 12
+    if as_of.year < year:
+        return 0
+    return as_of.month
+
+def _signed_diff(categories: np.ndarray, actual: np.ndarray, planned: np.ndarray) -> np.ndarray:
+    # Same convention as the summary: positive means better than planned
+    positive = np.isin(categories, [CATEGORIES.index(c) for c in POSITIVE_CATEGORIES])
+    return np.where(positive, actual - planned, planned - actual)
+
+def _values(array: np.ndarray) -> List[Optional[float]]:
+    return [None if np.isnan(v) else v for v in np.round(array, 2).tolist()]
+
+def _amounts(cents: np.ndarray) -> List[Optional[float]]:
+    # Cents become currency amounts once, when the response is built
+    return _values(cents / 100)
+
+def compute_analytics(matrix: MonthlyMatrix, year: int, elapsed: int) -> Dict[str, Any]:
+    years = matrix.years
+    yi = int(year - years[0])
+    n_items = len(matrix.item_ids)
+
+    # Category aggregation as a (categories x items) one-hot product
+    one_hot = (matrix.categories[None, :] == np.arange(len(CATEGORIES))[:, None]).astype(float)
+    timeline = matrix.actual.reshape(n_items, len(years) * 12)
+    category_timeline = one_hot @ timeline
+
+    # Rolling averages use the whole history but are reported for the requested year
+    year_slice = slice(yi * 12, yi * 12 + 12)
+    rolling = {f"avg_{w}": rolling_mean(category_timeline, w)[:, year_slice] for w in ROLLING_WINDOWS}
+    rolling_series = {}
+    for c, category in enumerate(CATEGORIES):
+        columns = {"actual": _amounts(category_timeline[c, year_slice])}
+        columns.update({key: _amounts(values[c]) for key, values in rolling.items()})
+        rolling_series[category] = [
+            {"month": m + 1, **{key: column[m] for key, column in columns.items()}} for m in range(12)
+        ]
+
+    annual = matrix.actual.sum(axis=2)
+    current = annual[:, yi]
+    previous = annual[:, yi - 1] if yi > 0 else np.zeros(n_items)
+    delta = current - previous
+    with np.errstate(divide="ignore", invalid="ignore"):
+        delta_pct = np.where(previous != 0, delta / np.abs(previous) * 100, np.nan)
+
+    planned_annual = matrix.planned.sum(axis=1)
+    ytd = matrix.actual[:, yi, :elapsed].sum(axis=1)
+    projected = ytd / elapsed * 12 if elapsed else np.full(n_items, np.nan)
+    projected_diff = _signed_diff(matrix.categories, projected, planned_annual)
+
+    category_ytd, category_projected, category_planned = one_hot @ ytd, one_hot @ projected, one_hot @ planned_annual
+    category_ids = np.arange(len(CATEGORIES))
+    category_diff = _signed_diff(category_ids, category_projected, category_planned)
+
+    known = matrix.categories >= 0
+    item_columns = {
+        "actual": _amounts(current), "previous_actual": _amounts(previous),
+        "delta": _amounts(delta), "delta_pct": _values(delta_pct),
+    }
+    projection_columns = {
+        "ytd_actual": _amounts(ytd), "projected": _amounts(projected),
+        "planned": _amounts(planned_annual), "projected_diff": _amounts(projected_diff),
+    }
+    category_columns = {
+        "ytd_actual": _amounts(category_ytd), "projected": _amounts(category_projected),
+        "planned": _amounts(category_planned), "projected_diff": _amounts(category_diff),
+    }
+    items = [
+        (i, int(matrix.item_ids[i]), matrix.names[i], CATEGORIES[matrix.categories[i]])
+        for i in np.flatnonzero(known).tolist()
+    ]
+    return {
+        "year": year,
+        "years": years.tolist(),
+        "months_elapsed": elapsed,
+        "rolling_windows": list(ROLLING_WINDOWS),
+        "rolling": rolling_series,
+        "year_over_year": [
+            {"budget_item_id": item_id, "name": name, "category": category, **{k: v[i] for k, v in item_columns.items()}}
+            for i, item_id, name, category in items
+        ],
+        "projection": {
+            "items": [
+                {"budget_item_id": item_id, "name": name, "category": category, **{k: v[i] for k, v in projection_columns.items()}}
+                for i, item_id, name, category in items
+            ],
+            "categories": {
+                category: {k: v[c] for k, v in category_columns.items()}
+                for c, category in enumerate(CATEGORIES)
+            },
+        },
+    }
+
+class AnalyticsEngine:
+    def __init__(self, db: AsyncSession, user_id: int, year: Optional[int] = None, as_of: Optional[date] = None):
+        self.db = db
+        self.user_id = user_id
+        self.year = year
+        self.as_of = as_of
+
+    async def get_analytics(self) -> Dict[str, Any]:
+        year = self.year
+        if year is None:
+            settings_res = await self.db.execute(select(Settings.year).where(Settings.user_id == self.user_id).limit(1))
+            year = settings_res.scalar_one_or_none() or DEFAULT_YEAR
+        matrix = await self.load_matrix(year)
+        return compute_analytics(matrix, year, months_elapsed(year, self.as_of or date.today()))
+
+    async def load_matrix(self, year: int) -> MonthlyMatrix:
+        items_res = await self.db.execute(
+            select(BudgetItem.id, BudgetItem.name, type_coerce(BudgetItem.category, SmallInteger).label("category"))
+            .where(BudgetItem.user_id == self.user_id)
+        )
+        rollup_res = await self.db.execute(
+            select(MonthlyRollup.budget_item_id, MonthlyRollup.year, MonthlyRollup.month,
+                   cents_column(MonthlyRollup.planned_amount), cents_column(MonthlyRollup.actual_amount))
+            .where(MonthlyRollup.user_id == self.user_id, MonthlyRollup.year <= year)
+        )
+        # Actuals of every item count, the plan only of the year's items (see items_in_year)
+        planned_ids = set((await self.db.execute(select(BudgetItem.id).where(items_in_year(self.user_id, year)))).scalars().all())
+        planned_rows, actual_rows = [], []
+        for item_id, row_year, month, planned, actual in rollup_res.all():
+            if row_year == PLAN_YEAR:
+                if item_id in planned_ids:
+                    planned_rows.append((item_id, month, planned))
+            else:
+                actual_rows.append((item_id, row_year, month, actual))
+        # The previous year is always present so year-over-year deltas have a baseline
+        return build_matrix(items_res.all(), planned_rows, actual_rows, years=(year - 1, year))
@@ -2,12 +2,16 @@ from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from database import get_db
 from models.user import User
 from schemas import schemas
+from services.cache import TTLCache
+import asyncio
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 
@@ -16,6 +20,13 @@ SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-this-in-production"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 # 24 hours
 
+# bcrypt is deliberately slow (~250ms); it runs in a bounded thread pool off the event loop
+PASSWORD_HASH_CONCURRENCY = int(os.getenv("PASSWORD_HASH_CONCURRENCY", "2"))
+
+# Verified principals, so authenticated requests can skip the user lookup
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "4096"))
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", "60")) # seconds
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -26,6 +37,30 @@ def verify_password(plain_password, hashed_password):
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+_password_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_CONCURRENCY, thread_name_prefix="password-hash")
+_password_ops_in_flight = 0
+
+async def _run_password_op(fn, *args):
+    global _password_ops_in_flight
+    _password_ops_in_flight += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_password_executor, fn, *args)
+    finally:
+        _password_ops_in_flight -= 1
+
+async def verify_password_async(plain_password, hashed_password):
+    return await _run_password_op(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password):
+    return await _run_password_op(get_password_hash, password)
+
+def password_pool_stats() -> dict:
+    return {
+        "concurrency": PASSWORD_HASH_CONCURRENCY,
+        "in_flight": _password_ops_in_flight,
+        "queue_depth": max(0, _password_ops_in_flight - PASSWORD_HASH_CONCURRENCY),
+    }
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -36,22 +71,69 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
-    credentials_exception = HTTPException(
+def create_user_token(user) -> str:
+    return create_access_token(data={"sub": user.email, "uid": user.id})
+
+class Principal:
+    """The authenticated user as far as most endpoints care: just its id and email."""
+    __slots__ = ("id", "email")
+
+    def __init__(self, id: int, email: str):
+        self.id = id
+        self.email = email
+
+principal_cache = TTLCache(PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL)
+
+def invalidate_principal(user_id: int):
+    principal_cache.pop(user_id)
+
+@event.listens_for(User, "after_delete")
+def _user_deleted(mapper, connection, target):
+    invalidate_principal(target.id)
+
+@event.listens_for(User, "after_update")
+def _user_updated(mapper, connection, target):
+    # Email or password changes must not keep serving the old principal
+    invalidate_principal(target.id)
+
+def _credentials_exception():
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def _decode_token(token: str):
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
     except JWTError:
-        raise credentials_exception
-        
+        raise _credentials_exception()
+    email: str = payload.get("sub")
+    if email is None:
+        raise _credentials_exception()
+    return payload.get("uid"), email
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
+    _, email = _decode_token(token)
     result = await db.execute(select(User).where(User.email == email))
     user = result.scalars().first()
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
     return user
+
+async def get_current_principal(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)) -> Principal:
+    user_id, email = _decode_token(token)
+    if user_id is not None:
+        principal = principal_cache.get(user_id)
+        if principal is not None and principal.email == email:
+            return principal
+
+    # Tokens issued before "uid" was added only carry the email
+    query = select(User.id, User.email)
+    query = query.where(User.id == user_id) if user_id is not None else query.where(User.email == email)
+    row = (await db.execute(query)).first()
+    if row is None or row.email != email:
+        raise _credentials_exception()
+    principal = Principal(row.id, row.email)
+    principal_cache.set(principal.id, principal)
+    return principal
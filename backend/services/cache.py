@@ -0,0 +1,125 @@
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Optional
+import os
+import time
+
+# Dashboard cache configuration
+DASHBOARD_CACHE_SIZE = int(os.getenv("DASHBOARD_CACHE_SIZE", "1024"))
+DASHBOARD_CACHE_TTL = float(os.getenv("DASHBOARD_CACHE_TTL", "300")) # seconds
+
+_MISSING = object()
+
+class TTLCache:
+    """Bounded LRU mapping whose entries expire `ttl` seconds after they were set."""
+
+    def __init__(self, max_size: int, ttl: Optional[float], clock: Callable[[], float] = time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key, _MISSING)
+        if entry is _MISSING:
+            return default
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= self.clock():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else ttl
+        self._data[key] = (value, self.clock() + ttl if ttl is not None else None)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.pop(key, _MISSING)
+        return default if entry is _MISSING else entry[0]
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+class CacheBackend:
+    """Storage used by DashboardCache.
+
+    The default in-memory backend is per process; a multi-worker deployment can plug in a
+    shared store (e.g. Redis) by implementing these four methods.
+    """
+
+    async def get(self, key: str) -> Any:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        raise NotImplementedError
+
+    async def delete(self, key: str):
+        raise NotImplementedError
+
+    async def incr(self, key: str) -> int:
+        raise NotImplementedError
+
+class InMemoryCacheBackend(CacheBackend):
+    def __init__(self, max_size: int = DASHBOARD_CACHE_SIZE, ttl: Optional[float] = DASHBOARD_CACHE_TTL, clock: Callable[[], float] = time.monotonic):
+        self._store = TTLCache(max_size, ttl, clock)
+
+    async def get(self, key: str) -> Any:
+        return self._store.get(key)
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        self._store.set(key, value, ttl)
+
+    async def delete(self, key: str):
+        self._store.pop(key)
+
+    async def incr(self, key: str) -> int:
+        value = (self._store.get(key) or 0) + 1
+        self._store.set(key, value, float("inf"))
+        return value
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+class DashboardCache:
+    """Computed dashboard summaries keyed by (user_id, year).
+
+    Entries are namespaced by a per-user generation counter; invalidating a user bumps the
+    counter, which orphans every cached year at once and lets LRU/TTL reclaim them.
+    """
+
+    def __init__(self, backend: Optional[CacheBackend] = None):
+        self.backend = backend or InMemoryCacheBackend()
+        self.hits = 0
+        self.misses = 0
+
+    async def _key(self, user_id: int, year: Optional[int]) -> str:
+        generation = await self.backend.get(f"dashboard-gen:{user_id}") or 0
+        return f"dashboard:{user_id}:{generation}:{year or 'default'}"
+
+    async def get_or_compute(self, user_id: int, year: Optional[int], compute: Callable[[], Awaitable[Any]]) -> Any:
+        # The key (and its generation) is resolved before computing, so a write that lands
+        # meanwhile invalidates the result we are about to store instead of being masked by it
+        key = await self._key(user_id, year)
+        value = await self.backend.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        self.misses += 1
+        value = await compute()
+        await self.backend.set(key, value)
+        return value
+
+    async def invalidate(self, user_id: int):
+        await self.backend.incr(f"dashboard-gen:{user_id}")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_ratio": self.hits / lookups if lookups else 0.0}
+
+dashboard_cache = DashboardCache()
@@ -0,0 +1,198 @@
+from typing import Optional, Tuple
+import os
+import zlib
+
+import anyio.to_thread
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError: # optional, responses fall back to gzip
+    brotli = None
+
+# Response compression configuration
+COMPRESSION_ENCODINGS = [e.strip() for e in os.getenv("COMPRESSION_ENCODINGS", "br,gzip").split(",") if e.strip()] # server preference, empty disables
+COMPRESSION_MINIMUM_SIZE = int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1024")) # bytes, smaller bodies are sent as is
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6")) # 1-9
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5")) # 0-11, above 6 costs more CPU than it saves on dynamic JSON
+# Bodies at least this large are compressed in a worker thread instead of on the event loop
+COMPRESSION_THREAD_MINIMUM_SIZE = 128 * 1024
+
+# Server-Sent Events must not be buffered; archives, media and the xlsx workbooks from /export
+# are already compressed. "type/*" excludes a whole top-level type.
+EXCLUDED_CONTENT_TYPES = (
+    "text/event-stream",
+    "application/zip", "application/gzip", "application/x-gzip",
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "image/*", "audio/*", "video/*", "font/woff", "font/woff2",
+)
+
+def brotli_available() -> bool:
+    return brotli is not None
+
+def choose_encoding(accept_encoding: str, encodings: Tuple[str, ...]) -> Optional[str]:
+    """First of `encodings` (server preference) that the Accept-Encoding header allows."""
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name:
+            accepted[name] = quality
+    for encoding in encodings:
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+# Compressor state is allocated on the first compressed body, not for every request
+
+class GzipEncoder:
+    content_encoding = "gzip"
+
+    def __init__(self, level: int):
+        self.level = level
+        self._compressor = None
+
+    def compress(self, body: bytes, more_body: bool) -> bytes:
+        if self._compressor is None:
+            self._compressor = zlib.compressobj(self.level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        # Streaming chunks are flushed so the client can decode each one as it arrives
+        if more_body:
+            return self._compressor.compress(body) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+        return self._compressor.compress(body) + self._compressor.flush()
+
+class BrotliEncoder:
+    content_encoding = "br"
+
+    def __init__(self, quality: int):
+        self.quality = quality
+        self._compressor = None
+
+    def compress(self, body: bytes, more_body: bool) -> bytes:
+        if self._compressor is None:
+            self._compressor = brotli.Compressor(quality=self.quality, mode=brotli.MODE_TEXT)
+        if more_body:
+            return self._compressor.process(body) + self._compressor.flush()
+        return self._compressor.process(body) + self._compressor.finish()
+
+def _excluded(content_type: str, excluded: Tuple[str, ...]) -> bool:
+    media_type = content_type.partition(";")[0].strip().lower()
+    return media_type in excluded or media_type.partition("/")[0] + "/*" in excluded
+
+class CompressionResponder:
+    """Wraps `send` for one response: buffers http.response.start until the first body
+    message shows whether the response is worth compressing, then rewrites the headers.
+
+    Without an encoder (the client accepts none) only Vary: Accept-Encoding is added.
+    """
+
+    def __init__(self, app: ASGIApp, encoder, minimum_size: int, exclude_content_types: Tuple[str, ...]):
+        self.app = app
+        self.encoder = encoder
+        self.minimum_size = minimum_size
+        self.exclude_content_types = exclude_content_types
+        self.send: Optional[Send] = None
+        self.initial_message: Optional[Message] = None
+        self.passthrough = False
+        self.started = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    async def compress(self, body: bytes, more_body: bool) -> bytes:
+        if len(body) >= COMPRESSION_THREAD_MINIMUM_SIZE:
+            return await anyio.to_thread.run_sync(self.encoder.compress, body, more_body)
+        return self.encoder.compress(body, more_body)
+
+    async def send_compressed(self, message: Message):
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            # Already encoded, partial (206) and excluded responses go out untouched
+            self.passthrough = (
+                "content-encoding" in headers or message["status"] == 206
+                or _excluded(headers.get("content-type", ""), self.exclude_content_types)
+            )
+            if self.passthrough:
+                await self.send(message)
+            else:
+                self.initial_message = message
+            return
+        if self.passthrough or message_type != "http.response.body":
+            if self.initial_message is not None and not self.started:
+                self.started = True
+                await self.send(self.initial_message)
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if not self.started:
+            self.started = True
+            if len(body) < self.minimum_size and not more_body:
+                await self.send(self.initial_message)
+                await self.send(message)
+                return
+            headers = MutableHeaders(scope=self.initial_message)
+            headers.add_vary_header("Accept-Encoding")
+            if self.encoder is not None:
+                message["body"] = await self.compress(body, more_body)
+                headers["Content-Encoding"] = self.encoder.content_encoding
+                if more_body or self.initial_message.get("trailers", False):
+                    del headers["Content-Length"]
+                else:
+                    headers["Content-Length"] = str(len(message["body"]))
+            await self.send(self.initial_message)
+            await self.send(message)
+        else:
+            # Remaining chunks of a streaming response
+            if self.encoder is not None:
+                message["body"] = await self.compress(body, more_body)
+            await self.send(message)
+
+class CompressionMiddleware:
+    """Brotli or gzip response compression, negotiated from Accept-Encoding.
+
+    Bodies below `minimum_size` are sent uncompressed. Streaming responses are compressed
+    chunk by chunk and flushed after each one, so they keep streaming. Server-Sent Events
+    and already compressed content types are left alone.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        encodings=COMPRESSION_ENCODINGS,
+        minimum_size: int = COMPRESSION_MINIMUM_SIZE,
+        gzip_level: int = COMPRESSION_GZIP_LEVEL,
+        brotli_quality: int = COMPRESSION_BROTLI_QUALITY,
+        exclude_content_types: Tuple[str, ...] = EXCLUDED_CONTENT_TYPES,
+    ):
+        self.app = app
+        self.encodings = tuple(e for e in encodings if e == "gzip" or (e == "br" and brotli_available()))
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.exclude_content_types = exclude_content_types
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""), self.encodings)
+        if encoding == "br":
+            encoder = BrotliEncoder(self.brotli_quality)
+        elif encoding == "gzip":
+            encoder = GzipEncoder(self.gzip_level)
+        else:
+            encoder = None
+        responder = CompressionResponder(self.app, encoder, self.minimum_size, self.exclude_content_types)
+        await responder(scope, receive, send)
@@ -0,0 +1,70 @@
+from fastapi import Depends, Request, Response
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, Optional, Tuple
+import hashlib
+
+from database import get_db
+from models.user import User
+from services import auth_utils
+from services.cache import dashboard_cache
+from services.events import dashboard_events
+
+# Conditional GETs. Every write bumps users.data_version in the same transaction, and read
+# endpoints derive a weak ETag from that version and the request URL, so a matching
+# If-None-Match is answered with 304 after a single primary key lookup.
+
+class NotModified(Exception):
+    def __init__(self, etag: str):
+        self.etag = etag
+
+async def bump(db: AsyncSession, user_id: int):
+    # Part of the caller's transaction: the version moves exactly when the data does
+    await db.execute(update(User).where(User.id == user_id).values(data_version=User.data_version + 1))
+
+async def commit_write(db: AsyncSession, user_id: int, actuals: Optional[Dict[Tuple[int, int, int], object]] = None,
+                       planned: Optional[Dict[Tuple[int, int], object]] = None):
+    """Commit a write to the user's data and tell every reader about it.
+
+    Bumps the data version (ETags) in the transaction, commits, then drops the cached
+    dashboard and notifies open streams: `actuals` ({(item, year, month): amount}) or
+    `planned` ({(item, month): amount}) send a delta, neither a full summary reset.
+    """
+    await bump(db, user_id)
+    await db.commit()
+    await dashboard_cache.invalidate(user_id)
+    if actuals is not None:
+        await dashboard_events.actuals(user_id, actuals)
+    elif planned is not None:
+        await dashboard_events.planned(user_id, planned)
+    else:
+        await dashboard_events.reset(user_id)
+
+def make_etag(user_id: int, version: int, request: Request) -> str:
+    # The body also depends on the query string (paging, filters, year)
+    url = hashlib.blake2b(f"{user_id}:{request.url.path}?{request.url.query}".encode(), digest_size=8).hexdigest()
+    return f'W/"{version}-{url}"'
+
+def matches(if_none_match: str, etag: str) -> bool:
+    # Weak comparison (RFC 9110 13.1.2): the W/ prefix is ignored on both sides
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(","))
+
+async def conditional_get(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    current_user: auth_utils.Principal = Depends(auth_utils.get_current_principal)
+):
+    """Route dependency: raises NotModified (answered with 304 by the app) when the client's
+    copy is current, otherwise tags the response with its ETag."""
+    version = (await db.execute(select(User.data_version).where(User.id == current_user.id))).scalar_one_or_none() or 0
+    etag = make_etag(current_user.id, version, request)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and matches(if_none_match, etag):
+        raise NotModified(etag)
+    response.headers["ETag"] = etag
+    # Per-user data: browsers may keep it but must revalidate, shared caches must not store it
+    response.headers["Cache-Control"] = "private, no-cache"
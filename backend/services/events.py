@@ -0,0 +1,215 @@
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Set, Tuple
+import asyncio
+import json
+import os
+
+from models.budget_item import CATEGORIES, ITEM_TYPES
+from services.finance_engine import SummaryState
+from services.money import to_cents
+
+# Dashboard stream configuration
+DASHBOARD_EVENTS_QUEUE_SIZE = int(os.getenv("DASHBOARD_EVENTS_QUEUE_SIZE", "256")) # messages per open stream
+DASHBOARD_STREAM_KEEPALIVE = float(os.getenv("DASHBOARD_STREAM_KEEPALIVE", "15")) # seconds between comments on an idle stream
+
+RESET = {"reset": True}
+RELOAD_ATTEMPTS = 3
+
+class Subscription:
+    """Messages published on one channel, in publish order."""
+
+    async def get(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def pending(self) -> int:
+        raise NotImplementedError
+
+    def discard(self):
+        raise NotImplementedError
+
+    async def close(self):
+        raise NotImplementedError
+
+class EventBroker:
+    """Pub/sub used by DashboardEvents.
+
+    The default in-memory broker only reaches streams served by the same process; with
+    several workers plug in a shared one (e.g. Redis pub/sub) implementing these two
+    methods. Messages are JSON-compatible dicts.
+    """
+
+    async def publish(self, channel: str, message: Dict[str, Any]):
+        raise NotImplementedError
+
+    def subscribe(self, channel: str) -> Subscription:
+        raise NotImplementedError
+
+class _QueueSubscription(Subscription):
+    def __init__(self, broker: "InMemoryBroker", channel: str, size: int):
+        self.broker = broker
+        self.channel = channel
+        self.queue: asyncio.Queue = asyncio.Queue(size)
+
+    def put(self, message: Dict[str, Any]):
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # A stream that fell behind drops what it missed and reloads the full summary
+            self.discard()
+            self.queue.put_nowait(RESET)
+
+    async def get(self) -> Dict[str, Any]:
+        return await self.queue.get()
+
+    def pending(self) -> int:
+        return self.queue.qsize()
+
+    def discard(self):
+        while not self.queue.empty():
+            self.queue.get_nowait()
+
+    async def close(self):
+        self.broker._remove(self)
+
+class InMemoryBroker(EventBroker):
+    def __init__(self, queue_size: int = DASHBOARD_EVENTS_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._channels: Dict[str, Set[_QueueSubscription]] = {}
+
+    async def publish(self, channel: str, message: Dict[str, Any]):
+        for subscription in self._channels.get(channel, ()):
+            subscription.put(message)
+
+    def subscribe(self, channel: str) -> Subscription:
+        subscription = _QueueSubscription(self, channel, self.queue_size)
+        self._channels.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def _remove(self, subscription: _QueueSubscription):
+        subscribers = self._channels.get(subscription.channel)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._channels[subscription.channel]
+
+    def __len__(self) -> int:
+        return sum(len(subscribers) for subscribers in self._channels.values())
+
+class DashboardEvents:
+    """Change notifications for a user's open dashboard streams, published after commit.
+
+    Messages carry the cents that changed, not recomputed totals: publishing costs one
+    entry per changed (item, month) cell, and every stream folds the change into the
+    summary it already holds. Changes that reshape the summary (items, settings) send a
+    reset, after which streams reload it.
+    """
+
+    def __init__(self, broker: Optional[EventBroker] = None):
+        self.broker = broker if broker is not None else InMemoryBroker() # an empty broker is falsy
+
+    @staticmethod
+    def _channel(user_id: int) -> str:
+        return f"dashboard:{user_id}"
+
+    async def actuals(self, user_id: int, deltas: Dict[Tuple[int, int, int], Any]):
+        # deltas maps (budget_item_id, year, month) to the amount added, like rollups.add_actuals
+        changes = [[item_id, year, month, to_cents(amount)] for (item_id, year, month), amount in deltas.items()]
+        if changes:
+            await self.broker.publish(self._channel(user_id), {"actual": changes})
+
+    async def planned(self, user_id: int, cells: Dict[Tuple[int, int], Any]):
+        # cells maps (budget_item_id, month) to the new planned amount, like rollups.set_planned_many
+        changes = [[item_id, month, to_cents(amount)] for (item_id, month), amount in cells.items()]
+        if changes:
+            await self.broker.publish(self._channel(user_id), {"planned": changes})
+
+    async def reset(self, user_id: int):
+        await self.broker.publish(self._channel(user_id), RESET)
+
+    def subscribe(self, user_id: int) -> Subscription:
+        return self.broker.subscribe(self._channel(user_id))
+
+dashboard_events = DashboardEvents()
+
+def apply_changes(state: SummaryState, year: int, message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Fold a change message into `state` and return the parts of the summary it changed,
+    or None when nothing in `year` changed."""
+    categories, months, items = set(), set(), set()
+    for item_id, change_year, month, cents in message.get("actual", ()):
+        if change_year == year and item_id in state.items:
+            state.add_actual([(item_id, month, cents)])
+            categories.add(state.items[item_id][1])
+            months.add(month)
+            items.add(item_id)
+    for item_id, month, cents in message.get("planned", ()):
+        acc = state.items.get(item_id)
+        if acc is not None:
+            # Planned cells are sent as new values; the state keeps the old one per month
+            state.add_planned([(item_id, month, cents - acc[6][month-1])])
+            categories.add(acc[1])
+            months.add(month)
+            items.add(item_id)
+    if not items:
+        return None
+
+    # The state works on category and type codes; the delta is keyed by their names
+    breakdown: Dict[str, list] = {}
+    for item_id in sorted(items):
+        breakdown.setdefault(CATEGORIES[state.items[item_id][1]], []).append(state.item_row(item_id))
+    return {
+        "annual_totals": {CATEGORIES[cat]: state.category_total(cat) for cat in sorted(categories)},
+        "ratios": state.ratios(),
+        "monthly_series": [state.month_bucket(month) for month in sorted(months)],
+        "breakdown": breakdown,
+        "type_breakdown": {ITEM_TYPES[t]: state.type_total(t) for t in sorted({state.items[i][7] for i in items})},
+    }
+
+def sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+async def dashboard_stream(
+    events: DashboardEvents,
+    user_id: int,
+    load: Callable[[], Awaitable[Tuple[SummaryState, Dict[str, Any]]]],
+    keepalive: float = DASHBOARD_STREAM_KEEPALIVE,
+) -> AsyncIterator[str]:
+    """Server-Sent Events: a `summary` event, then a `delta` event per change.
+
+    The subscription is opened before the summary loads so no change is missed meanwhile.
+    A reset (or a stream that fell behind) sends a fresh `summary`.
+    """
+    subscription = events.subscribe(user_id)
+
+    async def reload():
+        # Messages queued so far are covered by the fresh read; if more arrive while it runs
+        # they may or may not be, so read again. Returns whether the last read settled.
+        for _ in range(RELOAD_ATTEMPTS):
+            subscription.discard()
+            state, settings = await load()
+            if not subscription.pending():
+                return state, settings, True
+        return state, settings, False
+
+    try:
+        stale = True
+        while True:
+            if stale:
+                # A read that never settled (the user keeps writing) is still sent, so the
+                # dashboard stays current, but no delta is applied on top of it: read again
+                state, settings, settled = await reload()
+                yield sse("summary", state.summary(settings))
+                stale = not settled
+                continue
+            try:
+                message = await asyncio.wait_for(subscription.get(), keepalive)
+            except asyncio.TimeoutError:
+                # Comment line, keeps proxies from closing an idle connection
+                yield ": keepalive\n\n"
+                continue
+            if message.get("reset"):
+                stale = True
+                continue
+            delta = apply_changes(state, settings["year"], message)
+            if delta is not None:
+                yield sse("delta", delta)
+    finally:
+        await subscription.close()
@@ -0,0 +1,273 @@
+import csv
+import io
+import os
+import tempfile
+import zipfile
+from decimal import Decimal
+from typing import AsyncIterator, Dict, List, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.budget_item import BudgetItem
+from models.monthly_value import MonthlyValue
+from models.settings import Settings
+from models.transaction import Transaction
+from services.finance_engine import CATEGORIES
+from services.money import MONEY_PRECISION, MONEY_SCALE, quantize
+from services.workbook import BUDGET_SHEET, SETUP_SHEET, TRANSACTIONS_SHEET
+
+# Streaming exports of a user's settings, budget items, monthly plan and transactions.
+# Rows are read through a server-side cursor (AsyncSession.stream with yield_per) and
+# encoded one chunk at a time, so memory does not grow with the size of the history.
+
+FORMATS = ("csv", "xlsx", "parquet")
+EXPORT_CHUNK_SIZE = 1000
+
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sept", "Oct", "Nov", "Dec"]
+
+# Section titles of the template's Budget sheet and Category labels of its Transactions sheet
+BUDGET_SECTIONS = {"income": "Income Source", "expense": "Expenses", "debt": "Debt", "saving": "Savings & Investments"}
+SECTION_ORDER = ["income", "expense", "debt", "saving"]
+TRANSACTION_LABELS = {"income": "Income", "expense": "Expenses", "debt": "Debt", "saving": "Savings_Investments"}
+
+TABLES = {
+    "settings": ["year", "currency"],
+    "budget_items": ["id", "name", "category", "sub_category", "type", "is_active"],
+    "monthly_values": ["budget_item_id", "budget_item", "category", "month", "planned_amount"],
+    # Same column names as POST /transactions/bulk, so the file can be imported again
+    "transactions": ["id", "date", "amount", "budget_item_id", "budget_item", "category", "comment"],
+}
+
+def _queries(user_id: int) -> Dict:
+    return {
+        "settings": select(Settings.year, Settings.currency).where(Settings.user_id == user_id).order_by(Settings.id).limit(1),
+        "budget_items": (
+            select(BudgetItem.id, BudgetItem.name, BudgetItem.category, BudgetItem.sub_category, BudgetItem.type, BudgetItem.is_active)
+            .where(BudgetItem.user_id == user_id)
+            .order_by(BudgetItem.id)
+        ),
+        "monthly_values": (
+            select(MonthlyValue.budget_item_id, BudgetItem.name, BudgetItem.category, MonthlyValue.month, MonthlyValue.planned_amount)
+            .join(BudgetItem, BudgetItem.id == MonthlyValue.budget_item_id)
+            .where(BudgetItem.user_id == user_id)
+            .order_by(MonthlyValue.budget_item_id, MonthlyValue.month)
+        ),
+        "transactions": (
+            select(Transaction.id, Transaction.date, Transaction.amount, Transaction.budget_item_id, BudgetItem.name, BudgetItem.category, Transaction.comment)
+            .join(BudgetItem, BudgetItem.id == Transaction.budget_item_id)
+            .where(Transaction.user_id == user_id)
+            .order_by(Transaction.date, Transaction.id)
+        ),
+    }
+
+async def iter_chunks(db: AsyncSession, stmt) -> AsyncIterator[List[tuple]]:
+    result = await db.stream(stmt.execution_options(yield_per=EXPORT_CHUNK_SIZE))
+    async for partition in result.partitions():
+        yield [tuple(row) for row in partition]
+
+class _Sink(io.RawIOBase):
+    """Write-only buffer that is drained after every chunk; zipfile sees it as unseekable."""
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._buffer += data
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+async def csv_archive(db: AsyncSession, user_id: int) -> AsyncIterator[bytes]:
+    """ZIP archive with one CSV file per table."""
+    sink = _Sink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for table, stmt in _queries(user_id).items():
+            with archive.open(f"{table}.csv", "w", force_zip64=True) as entry:
+                text = io.TextIOWrapper(entry, encoding="utf-8", newline="", write_through=True)
+                writer = csv.writer(text)
+                writer.writerow(TABLES[table])
+                async for rows in iter_chunks(db, stmt):
+                    writer.writerows(rows)
+                    yield sink.drain()
+                text.detach()
+            yield sink.drain()
+    yield sink.drain()
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow.parquet # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def _parquet_schemas():
+    import pyarrow as pa
+    money = pa.decimal128(MONEY_PRECISION, MONEY_SCALE)
+    return {
+        "settings": pa.schema([("year", pa.int32()), ("currency", pa.string())]),
+        "budget_items": pa.schema([
+            ("id", pa.int64()), ("name", pa.string()), ("category", pa.string()),
+            ("sub_category", pa.string()), ("type", pa.string()), ("is_active", pa.bool_()),
+        ]),
+        "monthly_values": pa.schema([
+            ("budget_item_id", pa.int64()), ("budget_item", pa.string()), ("category", pa.string()),
+            ("month", pa.int8()), ("planned_amount", money),
+        ]),
+        "transactions": pa.schema([
+            ("id", pa.int64()), ("date", pa.date32()), ("amount", money), ("budget_item_id", pa.int64()),
+            ("budget_item", pa.string()), ("category", pa.string()), ("comment", pa.string()),
+        ]),
+    }
+
+def _money(value) -> Optional[Decimal]:
+    # SQLite hands NUMERIC back with extra zeros; Arrow needs the exact scale
+    return None if value is None else quantize(value)
+
+class _Position(io.RawIOBase):
+    # The Parquet writer asks for its position to record offsets; zip entries cannot tell()
+    def __init__(self, raw):
+        self.raw = raw
+        self.position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.raw.write(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+async def parquet_archive(db: AsyncSession, user_id: int) -> AsyncIterator[bytes]:
+    """ZIP archive with one Parquet file per table, one row group per chunk. Requires pyarrow."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schemas = _parquet_schemas()
+    sink = _Sink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_STORED) as archive:
+        for table, stmt in _queries(user_id).items():
+            schema = schemas[table]
+            money_columns = [i for i, field in enumerate(schema) if pa.types.is_decimal(field.type)]
+            with archive.open(f"{table}.parquet", "w", force_zip64=True) as entry:
+                writer = pq.ParquetWriter(_Position(entry), schema, compression="zstd")
+                async for rows in iter_chunks(db, stmt):
+                    columns = list(zip(*rows))
+                    for i in money_columns:
+                        columns[i] = [_money(v) for v in columns[i]]
+                    writer.write_table(pa.Table.from_arrays([pa.array(c, type=f.type) for c, f in zip(columns, schema)], schema=schema))
+                    yield sink.drain()
+                writer.close()
+            yield sink.drain()
+    yield sink.drain()
+
+def _setup_rows(settings_row, items: Dict[str, List[tuple]]) -> List[list]:
+    # Mirrors Initial_Set-Up: income sources (D/E) and expenses (I) from row 12, debts and
+    # savings from the next block; Year in S13 and Currency in S27 like the template
+    first = max(len(items["income"]), len(items["expense"]), 15)
+    second = max(len(items["debt"]), len(items["saving"]))
+    rows = [[] for _ in range(11)]
+    rows.append([None, None, None, "Income Source", "Active?", None, None, None, "Expense"])
+    for i in range(first):
+        row = [None] * 19
+        if i < len(items["income"]):
+            row[3], row[4] = items["income"][i][1], items["income"][i][3] == "active"
+        if i < len(items["expense"]):
+            row[8] = items["expense"][i][1]
+        rows.append(row)
+    rows[12][18] = settings_row[0] if settings_row else None
+    rows[26][18] = settings_row[1] if settings_row else None
+    rows.append([])
+    rows.append([None, None, None, "Debt", None, None, None, None, "Savings"])
+    for i in range(second):
+        row = [None] * 9
+        if i < len(items["debt"]):
+            row[3] = items["debt"][i][1]
+        if i < len(items["saving"]):
+            row[8] = items["saving"][i][1]
+        rows.append(row)
+    return [r or [None] for r in rows]
+
+def _budget_rows(items: Dict[str, List[tuple]], plan: Dict[int, List[Decimal]]) -> List[list]:
+    # Mirrors the Budget sheet: names in column E, Jan..Dec in G..R, total in S
+    rows = [[None] * 4 + ["Annual budget"], [None]]
+    for category in SECTION_ORDER:
+        rows.append([None] * 4 + [BUDGET_SECTIONS[category], None] + MONTHS + ["Total"])
+        totals = [Decimal(0)] * 12
+        for item in items[category]:
+            amounts = plan.get(item[0], [Decimal(0)] * 12)
+            totals = [t + a for t, a in zip(totals, amounts)]
+            rows.append([None] * 4 + [item[1], None] + amounts + [sum(amounts)])
+        rows.append([None] * 4 + [f"Total {BUDGET_SECTIONS[category]}", None] + totals + [sum(totals)])
+        rows.append([None])
+    return rows
+
+async def xlsx_workbook(db: AsyncSession, user_id: int) -> AsyncIterator[bytes]:
+    """Workbook laid out like "Yearly Budget Template.xlsm" (set-up, budget and transaction sheets).
+
+    openpyxl's write-only mode spools every sheet to a temporary file as rows are appended;
+    the xlsx container can only be assembled once all rows are written, after which the
+    file is streamed from disk.
+    """
+    import openpyxl
+    from openpyxl.workbook.defined_name import DefinedName
+
+    queries = _queries(user_id)
+    settings_row = (await db.execute(queries["settings"])).first()
+    # Items and their 12-month plan are bounded by the number of budget lines, not history
+    items: Dict[str, List[tuple]] = {category: [] for category in CATEGORIES}
+    for item in (await db.execute(queries["budget_items"])).all():
+        if item.category in items:
+            items[item.category].append(tuple(item))
+    plan: Dict[int, List[Decimal]] = {}
+    async for rows in iter_chunks(db, queries["monthly_values"]):
+        for item_id, _, _, month, amount in rows:
+            plan.setdefault(item_id, [Decimal(0)] * 12)[month - 1] = Decimal(amount or 0)
+
+    book = openpyxl.Workbook(write_only=True)
+    setup, budget, transactions = (book.create_sheet(name) for name in (SETUP_SHEET, BUDGET_SHEET, TRANSACTIONS_SHEET))
+    for name, cell in (("Year", "$S$13"), ("Currency", "$S$27")):
+        book.defined_names[name] = DefinedName(name, attr_text=f"'{SETUP_SHEET}'!{cell}")
+
+    def append_all(sheet, rows):
+        for row in rows:
+            sheet.append(row)
+
+    await run_in_threadpool(append_all, setup, _setup_rows(settings_row, items))
+    await run_in_threadpool(append_all, budget, _budget_rows(items, plan))
+    transactions.append([None])
+    transactions.append([None, "Date", "Category", "Subcategory", "Amount", "Comments"])
+    async for rows in iter_chunks(db, queries["transactions"]):
+        await run_in_threadpool(append_all, transactions, [
+            [None, tx_date, TRANSACTION_LABELS.get(category, category), name, amount, comment]
+            for _, tx_date, amount, _, name, category, comment in rows
+        ])
+
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    try:
+        await run_in_threadpool(book.save, path)
+        with open(path, "rb") as f:
+            while chunk := await run_in_threadpool(f.read, 64 * 1024):
+                yield chunk
+    finally:
+        os.remove(path)
+
+def export_stream(fmt: str, db: AsyncSession, user_id: int) -> AsyncIterator[bytes]:
+    if fmt == "csv":
+        return csv_archive(db, user_id)
+    if fmt == "xlsx":
+        return xlsx_workbook(db, user_id)
+    if fmt == "parquet":
+        return parquet_archive(db, user_id)
+    raise ValueError(f"Unsupported format: {fmt}")
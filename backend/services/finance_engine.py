@@ -1,96 +1,257 @@
-from sqlalchemy import select
+from sqlalchemy import select, func, extract, and_, or_, exists, type_coerce, SmallInteger
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
-from decimal import Decimal
-from models.budget_item import BudgetItem
+from sqlalchemy.orm import aliased, selectinload
+from models.budget_item import BudgetItem, CATEGORIES, CATEGORY, ITEM_TYPES, ITEM_TYPE
 from models.monthly_value import MonthlyValue
 from models.transaction import Transaction
 from models.settings import Settings
-from typing import Dict, List, Any
+from models.monthly_rollup import MonthlyRollup, PLAN_YEAR
+from typing import Dict, List, Any, Optional, Iterable, Tuple
+from datetime import date
+import os
+import time
+
+from services.money import to_cents, from_cents, cents_column
+from services.metrics import FINANCE_ENGINE_SECONDS
+
+# Aggregation backends:
+#   "python" - hydrate items, monthly values and transactions, sum in Python
+#   "sql"    - push SUM ... GROUP BY into the database, fetch aggregated rows only
+#   "rollup" - read the incrementally maintained monthly_rollups table (12 rows per item and year)
+BACKENDS = ("python", "sql", "rollup")
+DEFAULT_BACKEND = os.getenv("FINANCE_ENGINE_BACKEND", "rollup")
+
+DEFAULT_YEAR = 2025
+DEFAULT_CURRENCY = "EUR"
+
+INCOME, EXPENSE, SAVING, DEBT = (CATEGORY.code(cat) for cat in ("income", "expense", "saving", "debt"))
+# Categories where spending more than planned is good (diff = actual - planned)
+POSITIVE_CATEGORIES = ("income", "saving", "debt")
+POSITIVE_CODES = tuple(CATEGORY.code(cat) for cat in POSITIVE_CATEGORIES)
+
+# (budget_item_id, month, amount in integer cents)
+AmountRow = Tuple[int, int, int]
+
+def items_in_year(user_id: int, year: int):
+    """Filter for the budget items of `year`: the items a rollover created for that year,
+    or the undated items when there are none."""
+    dated = aliased(BudgetItem)
+    return and_(
+        BudgetItem.user_id == user_id,
+        or_(
+            BudgetItem.year == year,
+            and_(BudgetItem.year.is_(None), ~exists().where(dated.user_id == user_id, dated.year == year)),
+        ),
+    )
+
+class SummaryState:
+    """Accumulators behind the dashboard summary, in integer cents.
+
+    `summarize` folds every row in at once; the dashboard stream keeps one state per
+    connection, folds single changes into it and reads back only the buckets they touched.
+    """
+
+    def __init__(self, items: Iterable[Any]):
+        # Category and type codes (see models.budget_item) index these lists
+        self.totals = [{"planned": 0, "actual": 0} for _ in CATEGORIES]
+        self.monthly = [{"income": 0, "expense": 0, "actual_income": 0, "actual_expense": 0} for _ in range(12)]
+        self.types = [{"planned": 0, "actual": 0} for _ in ITEM_TYPES]
+        # item_id -> [item, category, category totals, type totals, planned, actual, planned per month, type]
+        self.items = {}
+        for item in items:
+            # Rows loaded for the summary carry codes, ORM items and callers' objects names
+            cat, item_type = CATEGORY.code(item.category), ITEM_TYPE.code(item.type)
+            self.items[item.id] = [item, cat, self.totals[cat], self.types[item_type], 0, 0, [0] * 12, item_type]
+
+    def add_planned(self, rows: Iterable[AmountRow]):
+        accumulators, monthly = self.items, self.monthly
+        for item_id, month, cents in rows:
+            acc = accumulators.get(item_id)
+            if acc is None or not cents: continue
+            acc[4] += cents
+            acc[6][month-1] += cents
+            acc[2]["planned"] += cents
+            acc[3]["planned"] += cents
+            if acc[1] == INCOME: monthly[month-1]["income"] += cents
+            elif acc[1] == EXPENSE: monthly[month-1]["expense"] += cents
+
+    def add_actual(self, rows: Iterable[AmountRow]):
+        accumulators, monthly = self.items, self.monthly
+        for item_id, month, cents in rows:
+            acc = accumulators.get(item_id)
+            if acc is None or not cents: continue
+            acc[5] += cents
+            acc[2]["actual"] += cents
+            acc[3]["actual"] += cents
+            if acc[1] == INCOME: monthly[month-1]["actual_income"] += cents
+            elif acc[1] == EXPENSE: monthly[month-1]["actual_expense"] += cents
+
+    def category_total(self, cat: int) -> Dict[str, float]:
+        p, a = self.totals[cat]["planned"], self.totals[cat]["actual"]
+        diff = (a - p) if cat in POSITIVE_CODES else (p - a)
+        return {"planned": from_cents(p), "actual": from_cents(a), "diff": from_cents(diff)}
+
+    def month_bucket(self, month: int) -> Dict[str, float]:
+        return {"month": month, **{k: from_cents(v) for k, v in self.monthly[month-1].items()}}
+
+    def item_row(self, item_id: int) -> Dict[str, Any]:
+        item, cat, _, _, p_ann, a_ann, _, item_type = self.items[item_id]
+        return {
+            "budget_item_id": item.id, "sub_category": item.name, "budget": from_cents(p_ann), "actual": from_cents(a_ann),
+            "diff": from_cents((a_ann - p_ann) if cat in POSITIVE_CODES else (p_ann - a_ann)),
+            "type": ITEM_TYPES[item_type]
+        }
+
+    def type_total(self, item_type: int) -> Dict[str, float]:
+        return {k: from_cents(v) for k, v in self.types[item_type].items()}
+
+    def ratios(self) -> Dict[str, float]:
+        # Ratios of exact totals; a zero income total counts as 1 like before (1 currency unit = 100 cents)
+        income, expense, saving, debt = (self.totals[code] for code in (INCOME, EXPENSE, SAVING, DEBT))
+        inc_p, inc_a = income["planned"] or 100, income["actual"] or 100
+        return {
+            "expense_rate": expense["actual"] / inc_a,
+            "savings_rate": saving["actual"] / inc_a,
+            "debt_rate": debt["actual"] / inc_a,
+            "planned_expense_rate": expense["planned"] / inc_p
+        }
+
+    def summary(self, settings: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        breakdown = [[] for _ in CATEGORIES]
+        for item_id, acc in self.items.items():
+            breakdown[acc[1]].append(self.item_row(item_id))
+        return {
+            "annual_totals": {cat: self.category_total(code) for code, cat in enumerate(CATEGORIES)},
+            "ratios": self.ratios(),
+            "monthly_series": [self.month_bucket(month) for month in range(1, 13)],
+            "breakdown": dict(zip(CATEGORIES, breakdown)),
+            "type_breakdown": {t: self.type_total(code) for code, t in enumerate(ITEM_TYPES)},
+            "settings": settings or {"year": DEFAULT_YEAR, "currency": DEFAULT_CURRENCY}
+        }
+
+def summarize(items: Iterable[Any], planned_rows: Iterable[AmountRow], actual_rows: Iterable[AmountRow], settings: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Build the dashboard summary in a single pass over items, planned rows and actual rows.
+
+    `items` only need `id`, `name`, `category` and `type`. Every row is folded into its item,
+    month, category and type buckets at once, so the cost is O(items + rows). Amounts are
+    integer cents, so every total is exact; they become currency amounts only in the result.
+    """
+    state = SummaryState(items)
+    state.add_planned(planned_rows)
+    state.add_actual(actual_rows)
+    return state.summary(settings)
 
 class FinanceEngine:
-    def __init__(self, db: AsyncSession, user_id: int):
+    def __init__(self, db: AsyncSession, user_id: int, year: Optional[int] = None, backend: Optional[str] = None):
+        backend = backend or DEFAULT_BACKEND
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown finance engine backend: {backend}")
         self.db = db
         self.user_id = user_id
+        self.year = year
+        self.backend = backend
 
     async def get_dashboard_summary(self) -> Dict[str, Any]:
+        state, settings = await self.load_state()
+        return state.summary(settings)
+
+    async def load_state(self) -> Tuple[SummaryState, Dict[str, Any]]:
+        start = time.perf_counter()
+        db_settings = await self._get_settings()
+        year = self.year or (db_settings.year if db_settings else DEFAULT_YEAR)
+        currency = db_settings.currency if db_settings else DEFAULT_CURRENCY
+
+        if self.backend == "rollup":
+            items, planned_rows, actual_rows = await self._load_rollup(year)
+        elif self.backend == "sql":
+            items, planned_rows, actual_rows = await self._load_sql(year)
+        else:
+            items, planned_rows, actual_rows = await self._load_python(year)
+        loaded = time.perf_counter()
+        state = SummaryState(items)
+        state.add_planned(planned_rows)
+        state.add_actual(actual_rows)
+        FINANCE_ENGINE_SECONDS.observe(loaded - start, (self.backend, "load"))
+        FINANCE_ENGINE_SECONDS.observe(time.perf_counter() - loaded, (self.backend, "compute"))
+        return state, {"year": year, "currency": currency}
+
+    def _in_year(self, year: int):
+        # Half-open date range so the (user_id, date) index is used as a range scan
+        return (
+            Transaction.user_id == self.user_id,
+            Transaction.date >= date(year, 1, 1),
+            Transaction.date < date(year + 1, 1, 1),
+        )
+
+    async def _get_settings(self):
+        settings_res = await self.db.execute(
+            select(Settings)
+            .where(Settings.user_id == self.user_id)
+            .limit(1)
+        )
+        return settings_res.scalar_one_or_none()
+
+    async def _load_python(self, year: int):
         items_res = await self.db.execute(
             select(BudgetItem)
             .options(selectinload(BudgetItem.monthly_values))
-            .where(BudgetItem.user_id == self.user_id)
+            .where(items_in_year(self.user_id, year))
+            .order_by(BudgetItem.id)
         )
         items = items_res.scalars().all()
         
         tx_res = await self.db.execute(
             select(Transaction)
-            .where(Transaction.user_id == self.user_id)
+            .where(*self._in_year(year))
         )
         transactions = tx_res.scalars().all()
-        
-        settings_res = await self.db.execute(
-            select(Settings)
-            .where(Settings.user_id == self.user_id)
-            .limit(1)
+
+        planned_rows = ((item.id, mv.month, to_cents(mv.planned_amount)) for item in items for mv in item.monthly_values)
+        actual_rows = ((tx.budget_item_id, tx.date.month, to_cents(tx.amount)) for tx in transactions)
+        return items, planned_rows, actual_rows
+
+    async def _load_item_rows(self, year: Optional[int] = None):
+        # Only the columns the summary needs, no ORM hydration; every item without a year
+        scope = BudgetItem.user_id == self.user_id if year is None else items_in_year(self.user_id, year)
+        items_res = await self.db.execute(
+            select(BudgetItem.id, BudgetItem.name,
+                   type_coerce(BudgetItem.category, SmallInteger).label("category"), type_coerce(BudgetItem.type, SmallInteger).label("type"))
+            .where(scope)
+            .order_by(BudgetItem.id)
         )
-        db_settings = settings_res.scalar_one_or_none()
+        return items_res.all()
 
-        categories = ["income", "expense", "saving", "debt"]
-        totals = {cat: {"planned": 0.0, "actual": 0.0} for cat in categories}
-        monthly_series = [{"month": i, "income": 0.0, "expense": 0.0, "actual_income": 0.0, "actual_expense": 0.0} for i in range(1, 13)]
-        type_breakdown = {"active": {"planned": 0.0, "actual": 0.0}, "passive": {"planned": 0.0, "actual": 0.0}}
+    async def _load_sql(self, year: int):
+        items = await self._load_item_rows(year)
 
-        for item in items:
-            cat = item.category.lower()
-            if cat not in totals: continue
-            for mv in item.monthly_values:
-                amt = float(mv.planned_amount)
-                totals[cat]["planned"] += amt
-                if cat == "income": monthly_series[mv.month-1]["income"] += amt
-                elif cat == "expense": monthly_series[mv.month-1]["expense"] += amt
-                type_breakdown[item.type]["planned"] += amt
-
-        item_map = {item.id: item for item in items}
-        for tx in transactions:
-            item = item_map.get(tx.budget_item_id)
-            if not item: continue
-            cat = item.category.lower()
-            amt = float(tx.amount)
-            totals[cat]["actual"] += amt
-            m_idx = tx.date.month - 1
-            if cat == "income": monthly_series[m_idx]["actual_income"] += amt
-            elif cat == "expense": monthly_series[m_idx]["actual_expense"] += amt
-            type_breakdown[item.type]["actual"] += amt
-
-        final_totals = {}
-        for cat in categories:
-            p, a = totals[cat]["planned"], totals[cat]["actual"]
-            diff = (a - p) if cat in ["income", "saving", "debt"] else (p - a)
-            final_totals[cat] = {"planned": p, "actual": a, "diff": diff}
-
-        breakdown = {cat: [] for cat in categories}
-        for item in items:
-            p_ann = sum(float(mv.planned_amount) for mv in item.monthly_values)
-            a_ann = sum(float(tx.amount) for tx in transactions if tx.budget_item_id == item.id)
-            cat = item.category.lower()
-            breakdown[cat].append({
-                "sub_category": item.name, "budget": p_ann, "actual": a_ann, 
-                "diff": (a_ann - p_ann) if cat in ["income", "saving", "debt"] else (p_ann - a_ann),
-                "type": item.type
-            })
-
-        inc_p, inc_a = totals["income"]["planned"] or 1.0, totals["income"]["actual"] or 1.0
-        ratios = {
-            "expense_rate": totals["expense"]["actual"] / inc_a,
-            "savings_rate": totals["saving"]["actual"] / inc_a,
-            "debt_rate": totals["debt"]["actual"] / inc_a,
-            "planned_expense_rate": totals["expense"]["planned"] / inc_p
-        }
+        # Planned and actual totals grouped per (item, month): at most 12 rows per item.
+        # Category and type totals are derived from the item they belong to.
+        planned_res = await self.db.execute(
+            select(MonthlyValue.budget_item_id, MonthlyValue.month, cents_column(func.sum(MonthlyValue.planned_amount)))
+            .join(BudgetItem, BudgetItem.id == MonthlyValue.budget_item_id)
+            .where(items_in_year(self.user_id, year))
+            .group_by(MonthlyValue.budget_item_id, MonthlyValue.month)
+        )
+        tx_month = extract("month", Transaction.date)
+        actual_res = await self.db.execute(
+            select(Transaction.budget_item_id, tx_month, cents_column(func.sum(Transaction.amount)))
+            .where(*self._in_year(year))
+            .group_by(Transaction.budget_item_id, tx_month)
+        )
+        actual_rows = ((item_id, int(month), amount) for item_id, month, amount in actual_res.all())
+        return items, planned_res.all(), actual_rows
 
-        return {
-            "annual_totals": final_totals,
-            "ratios": ratios,
-            "monthly_series": monthly_series,
-            "breakdown": breakdown,
-            "type_breakdown": type_breakdown,
-            "settings": {"year": db_settings.year if db_settings else 2025, "currency": db_settings.currency if db_settings else "EUR"}
-        }
+    async def _load_rollup(self, year: int):
+        items = await self._load_item_rows(year)
+        rollup_res = await self.db.execute(
+            select(MonthlyRollup.budget_item_id, MonthlyRollup.year, MonthlyRollup.month,
+                   cents_column(MonthlyRollup.planned_amount), cents_column(MonthlyRollup.actual_amount))
+            .where(MonthlyRollup.user_id == self.user_id, MonthlyRollup.year.in_((PLAN_YEAR, year)))
+        )
+        planned_rows, actual_rows = [], []
+        for item_id, row_year, month, planned, actual in rollup_res.all():
+            if row_year == PLAN_YEAR:
+                planned_rows.append((item_id, month, planned))
+            else:
+                actual_rows.append((item_id, month, actual))
+        return items, planned_rows, actual_rows
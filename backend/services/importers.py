@@ -0,0 +1,205 @@
+import codecs
+import csv
+import re
+from collections import deque
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+from services.money import quantize
+
+# Streaming parsers for bank statement uploads. Each parser consumes an async iterator of
+# raw byte chunks and yields (line_number, row, error) one record at a time, where row is a
+# dict with date, amount, budget_item_id, budget_item (name) and comment, or None on error.
+
+FORMATS = ("csv", "ofx", "qif")
+# Longest CSV record, quoted line breaks included; an unbalanced quote is reported past it
+MAX_CSV_RECORD_CHARS = 64 * 1024
+
+ParsedRecord = Tuple[int, Optional[Dict], Optional[str]]
+
+async def iter_lines(chunks: AsyncIterator[bytes], encoding: str = "utf-8") -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    pending = ""
+    first = True
+    async for chunk in chunks:
+        text = pending + decoder.decode(chunk)
+        if first and text:
+            text = text.lstrip("\ufeff")
+            first = False
+        lines = text.split("\n")
+        pending = lines.pop()
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+def parse_date(value: str, date_format: Optional[str] = None) -> date:
+    value = value.strip()
+    if date_format:
+        return datetime.strptime(value, date_format).date()
+    return date.fromisoformat(value[:10])
+
+def parse_amount(value: str) -> Decimal:
+    try:
+        amount = Decimal(value.strip().replace(" ", ""))
+    except InvalidOperation:
+        raise ValueError(f"invalid amount '{value}'")
+    if not amount.is_finite():
+        raise ValueError(f"invalid amount '{value}'")
+    return quantize(amount)
+
+async def parse_csv(chunks: AsyncIterator[bytes], date_format: Optional[str] = None) -> AsyncIterator[ParsedRecord]:
+    """CSV with a header row: date, amount and optionally budget_item_id, budget_item, comment."""
+    header = None
+    source = iter_lines(chunks)
+    read, exhausted = 0, False
+    backlog = deque() # (line_number, line) to read again after an unbalanced quote
+    record, record_chars, quotes = [], 0, 0
+    while True:
+        if backlog:
+            line_no, line = backlog.popleft()
+        elif not exhausted:
+            try:
+                line = await source.__anext__()
+            except StopAsyncIteration:
+                exhausted = True
+                line = None
+            else:
+                read += 1
+                line_no = read
+        else:
+            line = None
+        if line is None and not record:
+            break
+
+        if not record and not line.count('"') % 2:
+            record_line, text = line_no, line
+        else:
+            # A quoted field may span physical lines; join them until the quotes balance
+            if line is not None:
+                record.append((line_no, line))
+                record_chars += len(line) + 1
+                quotes += line.count('"')
+            if quotes % 2:
+                if line is not None and record_chars <= MAX_CSV_RECORD_CHARS:
+                    continue
+                # A stray quote would swallow the rest of the upload: the record's first line is
+                # reported and the lines after it are read again as records of their own
+                record_line = record[0][0]
+                backlog.extendleft(reversed(record[1:]))
+                record, record_chars, quotes = [], 0, 0
+                if line is None:
+                    yield record_line, None, "unterminated quoted field"
+                else:
+                    yield record_line, None, f"unbalanced quote, no closing quote within {MAX_CSV_RECORD_CHARS} characters"
+                continue
+            record_line = record[0][0]
+            text = "\n".join(part for _, part in record)
+            record, record_chars, quotes = [], 0, 0
+        if not text.strip():
+            continue
+
+        fields = next(csv.reader([text]))
+        if header is None:
+            header = [f.strip().lower() for f in fields]
+            missing = {"date", "amount"} - set(header)
+            if missing:
+                yield record_line, None, f"missing column(s): {', '.join(sorted(missing))}"
+                return
+            continue
+
+        values = dict(zip(header, fields))
+        try:
+            item_id = values.get("budget_item_id", "").strip()
+            yield record_line, {
+                "date": parse_date(values["date"], date_format),
+                "amount": parse_amount(values["amount"]),
+                "budget_item_id": int(item_id) if item_id else None,
+                "budget_item": values.get("budget_item", "").strip() or None,
+                "comment": values.get("comment", "").strip() or None,
+            }, None
+        except (ValueError, KeyError) as e:
+            yield record_line, None, str(e)
+
+_OFX_TAG = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<]*)")
+
+async def parse_ofx(chunks: AsyncIterator[bytes]) -> AsyncIterator[ParsedRecord]:
+    """OFX 1.x (SGML) and 2.x (XML) statements; every <STMTTRN> block is one transaction."""
+    current, start_line, line_no = None, 0, 0
+    async for line in iter_lines(chunks, "latin-1"):
+        line_no += 1
+        for closing, tag, value in _OFX_TAG.findall(line):
+            tag = tag.upper()
+            if tag == "STMTTRN":
+                if not closing:
+                    current, start_line = {}, line_no
+                    continue
+                if current is None:
+                    continue
+                try:
+                    posted = current.get("DTPOSTED")
+                    amount = current.get("TRNAMT")
+                    if not posted or not amount:
+                        raise ValueError("transaction without DTPOSTED or TRNAMT")
+                    yield start_line, {
+                        "date": datetime.strptime(posted[:8], "%Y%m%d").date(),
+                        "amount": parse_amount(amount),
+                        "budget_item_id": None,
+                        "budget_item": None,
+                        "comment": " - ".join(v for v in (current.get("NAME"), current.get("MEMO")) if v) or None,
+                    }, None
+                except ValueError as e:
+                    yield start_line, None, str(e)
+                current = None
+            elif current is not None and not closing and value.strip():
+                current[tag] = value.strip()
+
+_QIF_DATE_FORMATS = ("%m/%d/%Y", "%m/%d/%y", "%m/%d'%y", "%Y-%m-%d", "%d.%m.%Y")
+
+def _parse_qif_date(value: str) -> date:
+    value = value.strip().replace(" ", "")
+    for fmt in _QIF_DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"invalid date '{value}'")
+
+async def parse_qif(chunks: AsyncIterator[bytes]) -> AsyncIterator[ParsedRecord]:
+    """QIF bank records; the L (category) field is matched against budget item names."""
+    current, start_line, line_no = {}, 0, 0
+    async for line in iter_lines(chunks, "latin-1"):
+        line_no += 1
+        if not line.strip() or line.startswith("!"):
+            continue
+        code, value = line[0], line[1:].strip()
+        if code != "^":
+            if not current:
+                start_line = line_no
+            current.setdefault(code, value)
+            continue
+        try:
+            amount = current.get("T") or current.get("U")
+            if not current.get("D") or not amount:
+                raise ValueError("record without date or amount")
+            yield start_line, {
+                "date": _parse_qif_date(current["D"]),
+                "amount": parse_amount(amount.replace(",", "")),
+                "budget_item_id": None,
+                "budget_item": current.get("L") or None,
+                "comment": " - ".join(v for v in (current.get("P"), current.get("M")) if v) or None,
+            }, None
+        except ValueError as e:
+            yield start_line, None, str(e)
+        current = {}
+
+def get_parser(fmt: str, chunks: AsyncIterator[bytes], date_format: Optional[str] = None) -> AsyncIterator[ParsedRecord]:
+    if fmt == "csv":
+        return parse_csv(chunks, date_format)
+    if fmt == "ofx":
+        return parse_ofx(chunks)
+    if fmt == "qif":
+        return parse_qif(chunks)
+    raise ValueError(f"Unsupported format: {fmt}")
@@ -0,0 +1,264 @@
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import logging
+import os
+import random
+import re
+import time
+
+from fastapi import HTTPException, Request
+import secrets
+
+from database import env_bool
+from services.query_tracer import tracer
+
+# Request metrics in the Prometheus text format (GET /metrics): per-route latency, DB time
+# and statement count histograms, in-flight requests and dashboard compute time. A small
+# in-process registry; each worker exposes its own series, which Prometheus aggregates.
+METRICS_ENABLED = env_bool("METRICS_ENABLED", True)
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "") # when set, /metrics and /debug/sql-stats require "Authorization: Bearer <token>"
+
+# Sampled profiling of slow requests, off unless PROFILE_SAMPLE_RATE > 0
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0")) # fraction of requests, 0 to 1
+PROFILE_THRESHOLD_MS = float(os.getenv("PROFILE_THRESHOLD_MS", "500")) # only slower requests are dumped
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILER = os.getenv("PROFILER", "cprofile") # cprofile (.prof for pstats/snakeviz) or pyinstrument (.html)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+
+logger = logging.getLogger("metrics.profile")
+
+Labels = Tuple[str, ...]
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(names: Sequence[str], values: Labels, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.values: Dict[Labels, float] = {}
+
+    def inc(self, labels: Labels = (), amount: float = 1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}" for labels, value in sorted(self.values.items())]
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, labels: Labels = (), amount: float = 1):
+        self.inc(labels, -amount)
+
+    def set(self, value: float, labels: Labels = ()):
+        self.values[labels] = value
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [count per bucket (not cumulative), +Inf count, sum]
+        self.values: Dict[Labels, list] = {}
+
+    def observe(self, value: float, labels: Labels = ()):
+        series = self.values.get(labels)
+        if series is None:
+            series = self.values[labels] = [[0] * len(self.buckets), 0, 0.0]
+        i = bisect_left(self.buckets, value)
+        if i < len(self.buckets):
+            series[0][i] += 1
+        series[1] += 1
+        series[2] += value
+
+    def samples(self) -> List[str]:
+        lines = []
+        for labels, (counts, total, value_sum) in sorted(self.values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = 'le="%s"' % _number(bound)
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            inf = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, inf)} {total}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(value_sum)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {total}")
+        return lines
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+        # Called before rendering, for values read from elsewhere (e.g. cache counters)
+        self.collectors: List[Callable[[], None]] = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        for collect in self.collectors:
+            collect()
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+REQUESTS = registry.register(Counter("http_requests_total", "HTTP requests by route and status", ("method", "route", "status")))
+REQUEST_SECONDS = registry.register(Histogram("http_request_duration_seconds", "Time until the response body is sent", ("method", "route")))
+IN_FLIGHT = registry.register(Gauge("http_requests_in_flight", "Requests currently being served"))
+PASSWORD_OPS = registry.register(Gauge("password_hash_operations", "bcrypt hashes/verifications running in the pool or queued for it", ("state",)))
+DB_SECONDS = registry.register(Histogram("http_request_db_seconds", "Time spent in SQL statements per request", ("method", "route")))
+DB_STATEMENTS = registry.register(Histogram("http_request_db_statements", "SQL statements per request", ("method", "route"), STATEMENT_BUCKETS))
+FINANCE_ENGINE_SECONDS = registry.register(Histogram(
+    "finance_engine_seconds", "Dashboard summary time: load (queries and rows) and compute (aggregation)", ("backend", "phase")
+))
+DASHBOARD_CACHE = registry.register(Counter("dashboard_cache_lookups_total", "Dashboard cache lookups by result", ("result",)))
+
+def _collect_cache():
+    # DashboardCache keeps its own counters, copied at scrape time
+    from services.cache import dashboard_cache
+    DASHBOARD_CACHE.values[("hit",)] = dashboard_cache.hits
+    DASHBOARD_CACHE.values[("miss",)] = dashboard_cache.misses
+
+registry.collectors.append(_collect_cache)
+
+def _collect_password_pool():
+    from services.auth_utils import password_pool_stats
+    stats = password_pool_stats()
+    PASSWORD_OPS.set(stats["in_flight"] - stats["queue_depth"], ("running",))
+    PASSWORD_OPS.set(stats["queue_depth"], ("queued",))
+
+registry.collectors.append(_collect_password_pool)
+
+SQL_STATEMENTS = registry.register(Counter("sql_statements_total", "SQL statements executed"))
+SQL_SECONDS = registry.register(Counter("sql_statement_seconds_total", "Time spent in SQL statements"))
+SQL_SLOW_QUERIES = registry.register(Counter("sql_slow_queries_total", "Statements slower than SQL_SLOW_QUERY_MS (recorded with SQL_TRACE only)"))
+
+def _collect_sql():
+    # Totals kept by the QueryTracer engine events, copied at scrape time
+    SQL_STATEMENTS.values[()] = tracer.statements
+    SQL_SECONDS.values[()] = tracer.db_time
+    SQL_SLOW_QUERIES.values[()] = tracer.slow_query_count
+
+registry.collectors.append(_collect_sql)
+
+def require_metrics_token(request: Request):
+    # FastAPI dependency for the monitoring endpoints; open when METRICS_TOKEN is unset
+    if METRICS_TOKEN and not secrets.compare_digest(request.headers.get("authorization", ""), f"Bearer {METRICS_TOKEN}"):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+
+def route_label(scope) -> str:
+    # The route template keeps label cardinality bounded; unmatched paths share one label
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+class RequestProfiler:
+    """Profiles a random sample of requests and keeps the profiles of slow ones.
+
+    cProfile traces the whole thread, so it also records whatever else the event loop ran
+    meanwhile; pyinstrument's async mode attributes awaited time to the profiled request.
+    One request is profiled at a time.
+    """
+
+    def __init__(self, sample_rate: float = PROFILE_SAMPLE_RATE, threshold_ms: float = PROFILE_THRESHOLD_MS,
+                 directory: str = PROFILE_DIR, kind: str = PROFILER):
+        self.sample_rate = sample_rate
+        self.threshold_ms = threshold_ms
+        self.directory = directory
+        self.kind = kind
+        self.active = False
+
+    def start(self):
+        if self.active or random.random() >= self.sample_rate:
+            return None
+        self.active = True
+        if self.kind == "pyinstrument":
+            from pyinstrument import Profiler
+            profiler = Profiler(async_mode="enabled")
+            profiler.start()
+        else:
+            import cProfile
+            profiler = cProfile.Profile()
+            profiler.enable()
+        return profiler
+
+    def finish(self, profiler, method: str, route: str, elapsed: float) -> Optional[str]:
+        self.active = False
+        if self.kind == "pyinstrument":
+            profiler.stop()
+        else:
+            profiler.disable()
+        if elapsed * 1000 < self.threshold_ms:
+            return None
+        os.makedirs(self.directory, exist_ok=True)
+        name = re.sub(r"[^A-Za-z0-9]+", "_", f"{method}{route}").strip("_")
+        path = os.path.join(self.directory, f"{time.strftime('%Y%m%d-%H%M%S')}-{name}-{elapsed * 1000:.0f}ms")
+        if self.kind == "pyinstrument":
+            path += ".html"
+            with open(path, "w") as f:
+                f.write(profiler.output_html())
+        else:
+            path += ".prof"
+            profiler.dump_stats(path)
+        logger.warning("slow request %s %s (%.0f ms), profile written to %s", method, route, elapsed * 1000, path)
+        return path
+
+class MetricsMiddleware:
+    """ASGI middleware recording the request metrics above.
+
+    DB time comes from the QueryTracer engine events, through the request's stats.
+    Server-Sent Events streams are counted but kept out of the latency histogram, since
+    their duration is the lifetime of the connection.
+    """
+
+    def __init__(self, app, profiler: Optional[RequestProfiler] = None):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status, streaming = 500, False
+
+        async def send_with_status(message):
+            nonlocal status, streaming
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                streaming = any(k == b"content-type" and v.startswith(b"text/event-stream") for k, v in message.get("headers", []))
+            await send(message)
+
+        IN_FLIGHT.inc()
+        stats = tracer.start_request(scope)
+        profile = self.profiler.start() if self.profiler else None
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            IN_FLIGHT.dec()
+            labels = (scope["method"], route_label(scope))
+            REQUESTS.inc(labels + (str(status),))
+            if not streaming:
+                REQUEST_SECONDS.observe(elapsed, labels)
+            DB_SECONDS.observe(stats.db_time, labels)
+            DB_STATEMENTS.observe(stats.statements, labels)
+            if profile is not None:
+                self.profiler.finish(profile, *labels, elapsed)
@@ -0,0 +1,33 @@
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Union
+
+from sqlalchemy import BigInteger, cast, func
+
+# Money is stored as NUMERIC(14, 2) and aggregated as integer cents (minor units): sums of
+# ints are exact and cheap, and each total is turned into a currency amount only once,
+# when the response is built.
+
+MONEY_PRECISION = 14
+MONEY_SCALE = 2
+CENT = Decimal("0.01")
+MAX_AMOUNT = Decimal(10) ** (MONEY_PRECISION - MONEY_SCALE) - CENT
+
+def quantize(value: Union[Decimal, int, str]) -> Decimal:
+    """Round to cents the way PostgreSQL rounds NUMERIC (half away from zero)."""
+    amount = Decimal(value).quantize(CENT, rounding=ROUND_HALF_UP)
+    if abs(amount) > MAX_AMOUNT:
+        raise ValueError(f"amount {value} exceeds {MONEY_PRECISION - MONEY_SCALE} integer digits")
+    return amount
+
+def to_cents(value) -> int:
+    if value is None:
+        return 0
+    return int(Decimal(value).quantize(CENT, rounding=ROUND_HALF_UP).scaleb(MONEY_SCALE))
+
+def from_cents(cents: int) -> float:
+    # Shortest float repr of n/100 is the exact two-decimal amount, e.g. 1000.25
+    return cents / 100
+
+def cents_column(expr):
+    """SQL expression for `expr` in integer cents, for exact aggregation in Python."""
+    return cast(func.round(expr * 100), BigInteger)
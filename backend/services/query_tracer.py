@@ -0,0 +1,135 @@
+import logging
+import os
+import time
+from contextvars import ContextVar
+from typing import List, Optional
+
+from sqlalchemy import event
+
+from database import env_bool
+
+# Opt-in SQL tracing: per-request statement count and DB time, plus slow statements.
+# Statement text is only kept for slow queries, truncated and without parameters.
+# /metrics installs the same hooks for DB time alone; slow queries are only recorded
+# and logged with SQL_TRACE on.
+SQL_TRACE = env_bool("SQL_TRACE", False)
+SQL_SLOW_QUERY_MS = float(os.getenv("SQL_SLOW_QUERY_MS", "200"))
+MAX_SLOW_QUERIES = 50
+STATEMENT_PREVIEW_CHARS = 300
+
+logger = logging.getLogger("sql.slow")
+
+class RequestStats:
+    __slots__ = ("statements", "db_time")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_time = 0.0 # seconds
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("sql_request_stats", default=None)
+
+class QueryTracer:
+    def __init__(self, slow_query_ms: float = SQL_SLOW_QUERY_MS, track_slow_queries: bool = True):
+        self.slow_query_ms = slow_query_ms
+        self.track_slow_queries = track_slow_queries
+        self.requests = 0
+        self.statements = 0
+        self.db_time = 0.0
+        self.slow_queries: List[dict] = []
+        self.slow_query_count = 0
+        self.max_request_statements = 0
+        self.max_request_db_time = 0.0
+        self._installed = set()
+
+    def install(self, engine):
+        sync_engine = getattr(engine, "sync_engine", engine)
+        if id(sync_engine) in self._installed:
+            return
+        event.listen(sync_engine, "before_cursor_execute", self._before)
+        event.listen(sync_engine, "after_cursor_execute", self._after)
+        self._installed.add(id(sync_engine))
+
+    # The start time lives on the statement's execution context, so a statement that fails
+    # (no after_cursor_execute) leaves nothing behind on the connection
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._query_start = time.perf_counter()
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        start = getattr(context, "_query_start", None)
+        if start is None:
+            return
+        elapsed = time.perf_counter() - start
+        stats = _current.get()
+        if stats is not None:
+            stats.statements += 1
+            stats.db_time += elapsed
+        self.statements += 1
+        self.db_time += elapsed
+        if self.track_slow_queries and elapsed * 1000 >= self.slow_query_ms:
+            self.slow_query_count += 1
+            preview = " ".join(statement.split())[:STATEMENT_PREVIEW_CHARS]
+            self.slow_queries.append({"duration_ms": round(elapsed * 1000, 2), "statement": preview})
+            del self.slow_queries[:-MAX_SLOW_QUERIES]
+            logger.warning("slow query (%.1f ms): %s", elapsed * 1000, preview)
+
+    def start_request(self, scope: Optional[dict] = None) -> RequestStats:
+        # Middlewares wrapping the same request (tracing, metrics) share its stats via the scope
+        stats = scope.get("sql_stats") if scope is not None else None
+        if stats is None:
+            stats = RequestStats()
+            if scope is not None:
+                scope["sql_stats"] = stats
+        _current.set(stats)
+        return stats
+
+    def finish_request(self, stats: RequestStats):
+        self.requests += 1
+        self.max_request_statements = max(self.max_request_statements, stats.statements)
+        self.max_request_db_time = max(self.max_request_db_time, stats.db_time)
+
+    def snapshot(self) -> dict:
+        return {
+            "requests": self.requests,
+            "statements": self.statements,
+            "db_time_seconds": round(self.db_time, 6),
+            "statements_per_request": self.statements / self.requests if self.requests else 0.0,
+            "max_request_statements": self.max_request_statements,
+            "max_request_db_time_seconds": round(self.max_request_db_time, 6),
+            "slow_query_threshold_ms": self.slow_query_ms,
+            "slow_queries_total": self.slow_query_count,
+            "recent_slow_queries": list(self.slow_queries),
+        }
+
+def current_request_stats() -> Optional[RequestStats]:
+    return _current.get()
+
+tracer = QueryTracer(track_slow_queries=SQL_TRACE)
+
+class QueryTracerMiddleware:
+    """ASGI middleware scoping SQL stats to each HTTP request.
+
+    The totals are also sent to the client as a Server-Timing header
+    (`db;dur=<ms>;desc="<n> queries"`), visible in browser dev tools.
+    """
+
+    def __init__(self, app, tracer: QueryTracer = tracer):
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = self.tracer.start_request(scope)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                timing = f'db;dur={stats.db_time * 1000:.1f};desc="{stats.statements} queries"'
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", timing.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            self.tracer.finish_request(stats)
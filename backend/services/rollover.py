@@ -0,0 +1,132 @@
+from sqlalchemy import select, func, case, cast, literal, true, type_coerce, union_all, Integer, Numeric, SmallInteger
+from sqlalchemy.ext.asyncio import AsyncSession
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from typing import Dict, Iterable, Optional, Tuple
+
+from models.budget_item import BudgetItem, CATEGORY
+from models.monthly_rollup import MonthlyRollup
+from models.monthly_value import MonthlyValue
+from services import rollups
+from services.analytics import months_elapsed
+from services.finance_engine import items_in_year
+
+# Year rollover: the items of one year and their plan are copied into another with
+# INSERT ... SELECT, so the cost is a handful of statements whatever the budget size.
+# Like services.rollups, everything runs in the caller's session and commits with it.
+
+ITEM_COPY_COLUMNS = ["name", "category", "sub_category", "type", "is_active", "user_id"]
+
+def _multiplier(scale: Dict[str, Decimal], divisor: int):
+    # Per-category factor applied to the copied amounts. The division is folded in here because
+    # SQLite stores whole NUMERIC values as integers and would divide them as integers.
+    default = cast(literal(str(Decimal(1) / divisor)), Numeric)
+    if not scale:
+        return default
+    whens = {CATEGORY.code(category): cast(literal(str(Decimal(factor) / divisor)), Numeric) for category, factor in scale.items()}
+    return case(whens, value=type_coerce(BudgetItem.category, SmallInteger), else_=default)
+
+class ItemYears:
+    """Which year each of a user's budget items belongs to, following items_in_year.
+
+    A transaction is booked on the item of its date's year: one sent to an item of another
+    year is moved along the rollover chain (original <-> clones) to the item of that year.
+    """
+
+    def __init__(self, rows: Iterable[Tuple[int, Optional[int], Optional[int]]]):
+        # rows of (id, year, rolled_from_id)
+        self.years: Dict[int, Optional[int]] = {}
+        self.links = defaultdict(list)
+        for item_id, year, rolled_from_id in rows:
+            self.years[item_id] = year
+            if rolled_from_id is not None:
+                self.links[item_id].append(rolled_from_id)
+                self.links[rolled_from_id].append(item_id)
+        self.dated = {year for year in self.years.values() if year is not None}
+        self._resolved: Dict[Tuple[int, int], Optional[int]] = {}
+
+    @classmethod
+    async def load(cls, db: AsyncSession, user_id: int) -> "ItemYears":
+        rows = await db.execute(
+            select(BudgetItem.id, BudgetItem.year, BudgetItem.rolled_from_id).where(BudgetItem.user_id == user_id)
+        )
+        return cls(rows.all())
+
+    def add(self, item_id: int, year: Optional[int]):
+        self.years[item_id] = year
+        if year is not None:
+            self.dated.add(year)
+        self._resolved.clear()
+
+    def covers(self, item_id: int, year: int) -> bool:
+        item_year = self.years[item_id]
+        return item_year == year or (item_year is None and year not in self.dated)
+
+    def resolve(self, item_id: int, year: int) -> Optional[int]:
+        """The item standing for `item_id` in `year`, None if the item has no counterpart there."""
+        key = (item_id, year)
+        if key not in self._resolved:
+            found, seen, pending = None, {item_id}, [item_id]
+            while pending and found is None:
+                current = pending.pop()
+                if current in self.years and self.covers(current, year):
+                    found = current
+                for linked in self.links.get(current, ()):
+                    if linked not in seen:
+                        seen.add(linked)
+                        pending.append(linked)
+            self._resolved[key] = found
+        return self._resolved[key]
+
+    def year_for_new_items(self, year: int) -> Optional[int]:
+        # New items of a year that already has dated items must be dated too, or items_in_year hides them
+        return year if year in self.dated else None
+
+async def clone_year(db: AsyncSession, user_id: int, from_year: int, to_year: int,
+                     scale: Dict[str, Decimal], plan: str = "planned", as_of: Optional[date] = None) -> Tuple[int, int]:
+    """Copy the items of `from_year` (see items_in_year) into `to_year` with their plan.
+
+    `plan` is "planned" to copy the planned amounts or "actual_average" to plan every month at
+    the item's average monthly actual of `from_year`, over the months elapsed by `as_of` (today)
+    while that year is still running. Returns (items, monthly values) inserted.
+    """
+    source = (
+        select(*(getattr(BudgetItem, name) for name in ITEM_COPY_COLUMNS), literal(to_year, Integer), BudgetItem.id)
+        .where(items_in_year(user_id, from_year))
+        .order_by(BudgetItem.id)
+    )
+    items = await db.execute(
+        BudgetItem.__table__.insert().from_select(ITEM_COPY_COLUMNS + ["year", "rolled_from_id"], source)
+    )
+
+    # The new items, joined back to the plan or actuals of the items they were cloned from
+    clones = (BudgetItem.user_id == user_id, BudgetItem.year == to_year, BudgetItem.rolled_from_id.is_not(None))
+    if plan == "actual_average":
+        elapsed = max(months_elapsed(from_year, as_of or date.today()), 1)
+        totals = (
+            select(MonthlyRollup.budget_item_id, func.sum(MonthlyRollup.actual_amount).label("amount"))
+            .where(MonthlyRollup.user_id == user_id, MonthlyRollup.year == from_year)
+            .group_by(MonthlyRollup.budget_item_id)
+            .subquery()
+        )
+        months = union_all(*(select(literal(month, Integer).label("month")) for month in range(1, 13))).subquery()
+        values = (
+            select(BudgetItem.id, BudgetItem.user_id, months.c.month,
+                   func.round(totals.c.amount * _multiplier(scale, elapsed), 2))
+            .join(totals, totals.c.budget_item_id == BudgetItem.rolled_from_id)
+            .join(months, true())
+            .where(*clones)
+        )
+    else:
+        values = (
+            select(BudgetItem.id, BudgetItem.user_id, MonthlyValue.month,
+                   func.round(MonthlyValue.planned_amount * _multiplier(scale, 1), 2))
+            .join(MonthlyValue, MonthlyValue.budget_item_id == BudgetItem.rolled_from_id)
+            .where(*clones)
+        )
+    monthly_values = await db.execute(
+        MonthlyValue.__table__.insert().from_select(["budget_item_id", "user_id", "month", "planned_amount"], values)
+    )
+    await rollups.insert_planned(db, user_id, to_year)
+    return items.rowcount, monthly_values.rowcount
@@ -0,0 +1,136 @@
+from sqlalchemy import select, delete, func, extract, cast, literal, Integer
+from sqlalchemy.ext.asyncio import AsyncSession
+from decimal import Decimal
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from database import dialect_insert
+from models.budget_item import BudgetItem
+from models.monthly_value import MonthlyValue
+from models.transaction import Transaction
+from models.monthly_rollup import MonthlyRollup, PLAN_YEAR
+
+# Incremental maintenance of monthly_rollups. Every helper only adds statements to the
+# caller's session, so the rollup changes commit (or roll back) with the write they mirror.
+
+RollupKey = Tuple[int, int, int, int] # (user_id, budget_item_id, year, month)
+KEY_COLUMNS = ["user_id", "budget_item_id", "year", "month"]
+
+async def add_actual(db: AsyncSession, user_id: int, budget_item_id: int, tx_date: date, amount):
+    # Pass a negative amount to take a deleted transaction back out
+    stmt = dialect_insert(db, MonthlyRollup).values(
+        user_id=user_id, budget_item_id=budget_item_id, year=tx_date.year, month=tx_date.month,
+        planned_amount=0, actual_amount=amount
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=KEY_COLUMNS,
+        set_={"actual_amount": MonthlyRollup.actual_amount + stmt.excluded.actual_amount}
+    )
+    await db.execute(stmt)
+
+async def add_actuals(db: AsyncSession, user_id: int, deltas: Dict[Tuple[int, int, int], Decimal]):
+    # Bulk variant of add_actual: deltas maps (budget_item_id, year, month) to the amount to add
+    if not deltas:
+        return
+    stmt = dialect_insert(db, MonthlyRollup)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=KEY_COLUMNS,
+        set_={"actual_amount": MonthlyRollup.actual_amount + stmt.excluded.actual_amount}
+    )
+    await db.execute(stmt, [
+        {"user_id": user_id, "budget_item_id": item_id, "year": year, "month": month,
+         "planned_amount": 0, "actual_amount": amount}
+        for (item_id, year, month), amount in deltas.items()
+    ])
+
+async def set_planned(db: AsyncSession, user_id: int, budget_item_id: int, month: int, amount):
+    await set_planned_many(db, user_id, {(budget_item_id, month): amount})
+
+async def set_planned_many(db: AsyncSession, user_id: int, cells: Dict[Tuple[int, int], Decimal]):
+    # Bulk variant of set_planned: cells maps (budget_item_id, month) to the planned amount
+    if not cells:
+        return
+    stmt = dialect_insert(db, MonthlyRollup)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=KEY_COLUMNS,
+        set_={"planned_amount": stmt.excluded.planned_amount}
+    )
+    await db.execute(stmt, [
+        {"user_id": user_id, "budget_item_id": item_id, "year": PLAN_YEAR, "month": month,
+         "planned_amount": amount, "actual_amount": 0}
+        for (item_id, month), amount in cells.items()
+    ])
+
+def _raw_planned(user_id: Optional[int] = None):
+    query = (
+        select(
+            BudgetItem.user_id, MonthlyValue.budget_item_id, literal(PLAN_YEAR).label("year"), MonthlyValue.month,
+            func.sum(MonthlyValue.planned_amount).label("planned_amount"), literal(0).label("actual_amount")
+        )
+        .join(BudgetItem, BudgetItem.id == MonthlyValue.budget_item_id)
+        .where(BudgetItem.user_id.is_not(None))
+        .group_by(BudgetItem.user_id, MonthlyValue.budget_item_id, MonthlyValue.month)
+    )
+    if user_id is not None:
+        query = query.where(BudgetItem.user_id == user_id)
+    return query
+
+def _raw_actual(user_id: Optional[int] = None):
+    tx_year = cast(extract("year", Transaction.date), Integer)
+    tx_month = cast(extract("month", Transaction.date), Integer)
+    query = (
+        select(
+            Transaction.user_id, Transaction.budget_item_id, tx_year.label("year"), tx_month.label("month"),
+            literal(0).label("planned_amount"), func.sum(Transaction.amount).label("actual_amount")
+        )
+        .where(Transaction.user_id.is_not(None))
+        .group_by(Transaction.user_id, Transaction.budget_item_id, tx_year, tx_month)
+    )
+    if user_id is not None:
+        query = query.where(Transaction.user_id == user_id)
+    return query
+
+async def rebuild(db: AsyncSession, user_id: Optional[int] = None):
+    # Recompute rollups from monthly_values and transactions with INSERT ... SELECT
+    scope = delete(MonthlyRollup)
+    if user_id is not None:
+        scope = scope.where(MonthlyRollup.user_id == user_id)
+    await db.execute(scope)
+
+    columns = KEY_COLUMNS + ["planned_amount", "actual_amount"]
+    await db.execute(MonthlyRollup.__table__.insert().from_select(columns, _raw_planned(user_id)))
+    await db.execute(MonthlyRollup.__table__.insert().from_select(columns, _raw_actual(user_id)))
+
+async def insert_planned(db: AsyncSession, user_id: int, year: int):
+    # Planned rollups of the items a rollover just created for `year`, which have none yet
+    columns = KEY_COLUMNS + ["planned_amount", "actual_amount"]
+    await db.execute(MonthlyRollup.__table__.insert().from_select(columns, _raw_planned(user_id).where(BudgetItem.year == year)))
+
+async def verify(db: AsyncSession, user_id: Optional[int] = None) -> List[Dict]:
+    """Compare the stored rollups against sums computed from raw data.
+
+    Returns one entry per mismatching key; an empty list means the rollups are consistent.
+    """
+    expected: Dict[RollupKey, List[Decimal]] = {}
+    for query in (_raw_planned(user_id), _raw_actual(user_id)):
+        for row in (await db.execute(query)).all():
+            expected[tuple(row[:4])] = [Decimal(row[4] or 0), Decimal(row[5] or 0)]
+
+    stored_query = select(MonthlyRollup)
+    if user_id is not None:
+        stored_query = stored_query.where(MonthlyRollup.user_id == user_id)
+    stored: Dict[RollupKey, List[Decimal]] = {}
+    for r in (await db.execute(stored_query)).scalars().all():
+        stored[(r.user_id, r.budget_item_id, r.year, r.month)] = [Decimal(r.planned_amount or 0), Decimal(r.actual_amount or 0)]
+
+    zero = [Decimal(0), Decimal(0)]
+    mismatches = []
+    for key in sorted(expected.keys() | stored.keys()):
+        want, have = expected.get(key, zero), stored.get(key, zero)
+        if want != have:
+            mismatches.append({
+                **dict(zip(KEY_COLUMNS, key)),
+                "expected_planned": want[0], "expected_actual": want[1],
+                "stored_planned": have[0], "stored_actual": have[1],
+            })
+    return mismatches
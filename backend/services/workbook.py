@@ -0,0 +1,175 @@
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+import re
+
+import openpyxl
+
+from services.importers import parse_date
+from services.money import quantize
+
+# Reader for the bundled "Yearly Budget Template.xlsm". The workbook is opened in openpyxl's
+# read-only mode, which streams each sheet's XML row by row instead of building the cell
+# grid, so memory stays flat however long the transaction log grows. Cached formula
+# results are read (data_only), which is what Excel last displayed.
+
+SETUP_SHEET = "Initial_Set-Up"
+BUDGET_SHEET = "Budget"
+TRANSACTIONS_SHEET = "Transactions"
+
+# Budget sheet: line names in column E, Jan..Dec in columns G..R
+BUDGET_NAME_COL = 5
+BUDGET_FIRST_MONTH_COL = 7
+
+# Initial_Set-Up: income sources in column D with the "Active?" flag in column E
+SETUP_INCOME_COL = 4
+
+# Transactions sheet: Date, Category, Subcategory, Amount, Comments from column B
+TRANSACTIONS_FIRST_COL = 2
+
+CURRENCY_SYMBOLS = {"€": "EUR", "$": "USD", "£": "GBP", "¥": "JPY", "CHF": "CHF"}
+
+# Section headers of the Budget sheet and the Category column of the Transactions sheet
+_CATEGORY_LABELS = {
+    "income": "income", "incomesource": "income", "incomesources": "income",
+    "expense": "expense", "expenses": "expense",
+    "saving": "saving", "savings": "saving", "savingsinvestments": "saving",
+    "debt": "debt", "debts": "debt",
+}
+
+ParsedRecord = Tuple[int, Optional[Dict], Optional[str]]
+
+class WorkbookError(ValueError):
+    pass
+
+def category_for(label) -> Optional[str]:
+    if not isinstance(label, str):
+        return None
+    return _CATEGORY_LABELS.get(re.sub(r"[^a-z]", "", label.lower()))
+
+def _amount(value) -> Decimal:
+    if value is None or value == "":
+        return Decimal(0)
+    if isinstance(value, bool):
+        raise ValueError(f"invalid amount '{value}'")
+    try:
+        # str() keeps floats such as 0.1 from expanding to their binary representation
+        amount = Decimal(str(value).strip().replace(" ", ""))
+    except InvalidOperation:
+        raise ValueError(f"invalid amount '{value}'")
+    if not amount.is_finite():
+        raise ValueError(f"invalid amount '{value}'")
+    return quantize(amount)
+
+def _text(value) -> Optional[str]:
+    if value is None:
+        return None
+    return str(value).strip() or None
+
+class TemplateWorkbook:
+    def __init__(self, file: BinaryIO):
+        try:
+            self.book = openpyxl.load_workbook(file, read_only=True, data_only=True, keep_links=False)
+        except Exception as e:
+            raise WorkbookError(f"not a readable .xlsx/.xlsm workbook: {e}")
+        missing = {BUDGET_SHEET, TRANSACTIONS_SHEET} - set(self.book.sheetnames)
+        if missing:
+            self.close()
+            raise WorkbookError(f"missing sheet(s): {', '.join(sorted(missing))}")
+
+    def close(self):
+        self.book.close()
+
+    def _named_value(self, name: str):
+        defined = self.book.defined_names.get(name)
+        if defined is None:
+            return None
+        for sheet, coord in defined.destinations:
+            if sheet in self.book.sheetnames:
+                return self.book[sheet][coord.replace("$", "")].value
+        return None
+
+    def settings(self) -> Dict:
+        """Year and currency from the workbook's `Year` and `Currency` names, when set."""
+        year = self._named_value("Year")
+        currency = _text(self._named_value("Currency"))
+        return {
+            "year": int(year) if isinstance(year, (int, float)) and 1900 <= year <= 9999 else None,
+            "currency": CURRENCY_SYMBOLS.get(currency, currency.upper() if currency and len(currency) == 3 else None),
+        }
+
+    def income_types(self) -> Dict[str, str]:
+        """Lower-cased income source name -> "active"/"passive" from the set-up sheet."""
+        if SETUP_SHEET not in self.book.sheetnames:
+            return {}
+        types = {}
+        rows = self.book[SETUP_SHEET].iter_rows(min_col=SETUP_INCOME_COL, max_col=SETUP_INCOME_COL + 1, values_only=True)
+        in_income = False
+        for name, flag in rows:
+            if isinstance(name, str) and name.strip().lower() == "income source":
+                in_income = True
+                continue
+            if in_income:
+                name = _text(name)
+                if name is None:
+                    if flag is None:
+                        break
+                    continue
+                types[name.lower()] = "active" if flag is True else "passive"
+        return types
+
+    def budget_lines(self) -> Iterator[Tuple[int, str, str, List[Decimal]]]:
+        """Yield (row, category, name, twelve planned amounts) for every named line of the Budget sheet."""
+        sheet = self.book[BUDGET_SHEET]
+        category = None
+        rows = sheet.iter_rows(min_col=BUDGET_NAME_COL, max_col=BUDGET_FIRST_MONTH_COL + 11, values_only=True)
+        for row_no, row in enumerate(rows, start=1):
+            label = _text(row[0])
+            months = row[BUDGET_FIRST_MONTH_COL - BUDGET_NAME_COL:]
+            if label is None:
+                continue
+            if label.lower().startswith("total"):
+                category = None
+            elif isinstance(months[0], str):
+                # Section header: the month columns hold "Jan", "Feb", ...
+                category = category_for(label)
+            elif category is not None:
+                try:
+                    yield row_no, category, label, [_amount(v) for v in months]
+                except ValueError as e:
+                    raise WorkbookError(f"{BUDGET_SHEET} row {row_no}: {e}")
+
+    def transactions(self) -> Iterator[ParsedRecord]:
+        """Yield (row, record, error) for the transaction log, like the statement parsers."""
+        sheet = self.book[TRANSACTIONS_SHEET]
+        rows = sheet.iter_rows(min_col=TRANSACTIONS_FIRST_COL, max_col=TRANSACTIONS_FIRST_COL + 4, values_only=True)
+        header_seen = False
+        for row_no, (tx_date, label, name, amount, comment) in enumerate(rows, start=1):
+            if not header_seen:
+                header_seen = isinstance(tx_date, str) and tx_date.strip().lower() == "date"
+                continue
+            if tx_date is None and amount is None and label is None and name is None:
+                continue
+            try:
+                if isinstance(tx_date, datetime):
+                    tx_date = tx_date.date()
+                elif isinstance(tx_date, str):
+                    tx_date = parse_date(tx_date)
+                elif not isinstance(tx_date, date):
+                    raise ValueError("missing date")
+                if amount is None or amount == "":
+                    raise ValueError("missing amount")
+                category = category_for(label)
+                if category is None:
+                    raise ValueError(f"unknown category '{label}'")
+                if _text(name) is None:
+                    raise ValueError("missing subcategory")
+                yield row_no, {
+                    "date": tx_date,
+                    "amount": _amount(amount),
+                    "category": category,
+                    "budget_item": _text(name),
+                    "comment": _text(comment),
+                }, None
+            except ValueError as e:
+                yield row_no, None, str(e)
@@ -0,0 +1,70 @@
+import pytest
+from datetime import date
+
+from benchmarks.bench_analytics import make_data, naive_analytics
+from services.analytics import build_matrix, compute_analytics, months_elapsed, rolling_mean
+
+
+def test_rolling_mean_needs_a_full_window():
+    import numpy as np
+    result = rolling_mean(np.array([[1.0, 2.0, 3.0, 4.0]]), 3)
+    assert np.isnan(result[0, :2]).all()
+    assert result[0, 2:].tolist() == [2.0, 3.0]
+
+
+def test_months_elapsed():
+    assert months_elapsed(2024, date(2025, 3, 1)) == 12
+    assert months_elapsed(2025, date(2025, 3, 1)) == 3
+    assert months_elapsed(2026, date(2025, 3, 1)) == 0
+
+
+def assert_close(actual, expected):
+    # Both sides are rounded to cents; cumulative and direct float sums may straddle a rounding edge
+    if isinstance(expected, dict):
+        assert actual.keys() >= expected.keys()
+        for key in expected:
+            assert_close(actual[key], expected[key])
+    elif isinstance(expected, list):
+        assert len(actual) == len(expected)
+        for a, e in zip(actual, expected):
+            assert_close(a, e)
+    elif expected is None:
+        assert actual is None
+    else:
+        assert actual == pytest.approx(expected, abs=0.011)
+
+
+@pytest.mark.parametrize("elapsed", [0, 5, 12])
+def test_vectorized_matches_python_loops(elapsed):
+    items, planned_rows, actual_rows = make_data(n_items=40, years=range(2019, 2025), seed=7)
+    year = 2024
+    result = compute_analytics(build_matrix(items, planned_rows, actual_rows, years=(year - 1, year)), year, elapsed)
+    expected = naive_analytics(items, planned_rows, actual_rows, year, elapsed)
+
+    assert_close(result["rolling"], expected["rolling"])
+    assert_close(result["year_over_year"], expected["year_over_year"])
+    assert_close(result["projection"]["items"], expected["projection"])
+    for category, totals in expected["categories"].items():
+        summary = result["projection"]["categories"][category]
+        assert summary["planned"] == pytest.approx(totals["planned"], abs=0.01)
+        assert summary["ytd_actual"] == pytest.approx(totals["ytd_actual"], abs=0.01)
+
+
+@pytest.mark.asyncio
+async def test_analytics_endpoint(client, auth_headers):
+    rent = (await client.post("/budget-items/", json={"name": "Rent", "category": "expense"}, headers=auth_headers)).json()["id"]
+    await client.post("/monthly-values/batch", json={"rows": [{"budget_item_id": rent, "planned_amounts": [900] * 12}]}, headers=auth_headers)
+    lines = ["date,amount,budget_item_id"]
+    lines += [f"2023-{m:02d}-01,800,{rent}" for m in range(1, 13)]
+    lines += [f"2024-{m:02d}-01,1000,{rent}" for m in range(1, 7)]
+    await client.post("/transactions/bulk", content="\n".join(lines).encode(), headers=auth_headers)
+
+    response = await client.get("/dashboard/analytics?year=2024&as_of=2024-06-30", headers=auth_headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["years"] == [2023, 2024] and body["months_elapsed"] == 6
+    assert body["year_over_year"][0]["delta"] == -3600
+    assert body["projection"]["items"][0]["projected"] == 12000
+    assert body["projection"]["categories"]["expense"]["projected_diff"] == 10800 - 12000
+    june = body["rolling"]["expense"][5]
+    assert (june["avg_3"], june["avg_6"], june["avg_12"]) == (1000, 1000, 900)
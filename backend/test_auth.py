@@ -0,0 +1,69 @@
+import pytest
+from jose import jwt
+from sqlalchemy import select
+
+from conftest import register_and_login
+from models.user import User
+from services import auth_utils
+
+
+@pytest.mark.asyncio
+async def test_token_carries_user_id_and_principal_is_cached(client, auth_headers):
+    token = auth_headers["Authorization"].split()[1]
+    payload = jwt.decode(token, auth_utils.SECRET_KEY, algorithms=[auth_utils.ALGORITHM])
+    assert payload["sub"] == "user@example.com"
+
+    response = await client.get("/auth/me", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json() == {"email": "user@example.com", "id": payload["uid"]}
+    assert auth_utils.principal_cache.get(payload["uid"]).email == "user@example.com"
+
+
+@pytest.mark.asyncio
+async def test_deleted_user_is_evicted_from_principal_cache(client, session_factory, auth_headers):
+    assert (await client.get("/settings/", headers=auth_headers)).status_code == 200
+
+    async with session_factory() as db:
+        user = (await db.execute(select(User).where(User.email == "user@example.com"))).scalar_one()
+        user_id = user.id
+        await db.delete(user)
+        await db.commit()
+
+    assert auth_utils.principal_cache.get(user_id) is None
+    assert (await client.get("/settings/", headers=auth_headers)).status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_credential_change_evicts_principal(client, session_factory, auth_headers):
+    assert (await client.get("/settings/", headers=auth_headers)).status_code == 200
+
+    async with session_factory() as db:
+        user = (await db.execute(select(User).where(User.email == "user@example.com"))).scalar_one()
+        user.email = "renamed@example.com"
+        await db.commit()
+
+    # The old token names the old email and must stop working
+    assert (await client.get("/settings/", headers=auth_headers)).status_code == 401
+    new_headers = await register_and_login(client, "user@example.com", "other")
+    assert (await client.get("/auth/me", headers=new_headers)).json()["email"] == "user@example.com"
+
+
+@pytest.mark.asyncio
+async def test_password_hashing_runs_off_the_event_loop():
+    import asyncio
+
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.001)
+
+    task = asyncio.create_task(ticker())
+    hashed = await auth_utils.get_password_hash_async("secret")
+    assert await auth_utils.verify_password_async("secret", hashed)
+    task.cancel()
+    # The loop kept running other coroutines while bcrypt worked in the pool
+    assert ticks > 10
+    assert auth_utils.password_pool_stats()["in_flight"] == 0
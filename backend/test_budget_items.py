@@ -0,0 +1,23 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+
+
+@pytest.mark.asyncio
+async def test_category_and_type_are_stored_as_checked_codes(client, auth_headers, session_factory):
+    response = await client.post("/budget-items/", json={"name": "ETF", "category": " Saving", "type": "Passive"}, headers=auth_headers)
+    assert response.status_code == 200
+    assert (response.json()["category"], response.json()["type"]) == ("saving", "passive")
+    assert (await client.post("/budget-items/", json={"name": "Misc", "category": "misc"}, headers=auth_headers)).status_code == 422
+    assert (await client.post("/budget-items/", json={"name": "Misc", "category": "expense", "type": "other"}, headers=auth_headers)).status_code == 422
+
+    async with session_factory() as db:
+        assert (await db.execute(text("SELECT category, type FROM budget_items"))).all() == [(2, 1)]
+        with pytest.raises(IntegrityError):
+            await db.execute(text("UPDATE budget_items SET category = 7"))
+
+    items = (await client.get("/budget-items/?fast=true", headers=auth_headers)).json()
+    assert (items[0]["category"], items[0]["type"]) == ("saving", "passive")
+    summary = (await client.get("/dashboard/summary", headers=auth_headers)).json()
+    assert summary["breakdown"]["saving"][0]["type"] == "passive"
+    assert (await client.get("/transactions/?category=misc", headers=auth_headers)).status_code == 400
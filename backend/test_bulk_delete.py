@@ -0,0 +1,78 @@
+import pytest
+from sqlalchemy import event, func, select
+
+from conftest import register_and_login
+from models.monthly_rollup import MonthlyRollup
+from models.transaction import Transaction
+from services import rollups
+from test_transactions import create_item, import_csv
+
+
+@pytest.mark.asyncio
+async def test_deleting_items_cascades_in_the_database(client, auth_headers, session_factory):
+    rent = await create_item(client, auth_headers, "Rent", "expense")
+    food = await create_item(client, auth_headers, "Food", "expense")
+    salary = await create_item(client, auth_headers, "Salary", "income")
+    await client.post("/monthly-values/batch", json={"rows": [
+        {"budget_item_id": item, "planned_amounts": [100] * 12} for item in (rent, food, salary)
+    ]}, headers=auth_headers)
+    await import_csv(client, auth_headers, f"date,amount,budget_item_id\n2024-01-01,900,{rent}\n2024-02-01,900,{rent}\n2024-01-05,50,{food}\n2024-01-31,3000,{salary}\n")
+    other_headers = await register_and_login(client, "other@example.com")
+    other = await create_item(client, other_headers, "Rent", "expense")
+
+    statements = []
+    engine = session_factory.kw["bind"].sync_engine
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        response = await client.post("/budget-items/bulk-delete", json={"ids": [rent, food, other]}, headers=auth_headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    assert response.json() == {"budget_items": 2, "monthly_values": 24, "transactions": 3}
+    assert len([s for s in statements if s.startswith("DELETE")]) == 1
+
+    async with session_factory() as db:
+        assert (await db.execute(select(func.count()).select_from(Transaction))).scalar_one() == 1
+        assert (await db.execute(select(func.count()).where(MonthlyRollup.budget_item_id == rent))).scalar_one() == 0
+        assert await rollups.verify(db) == []
+    assert len((await client.get("/budget-items/", headers=other_headers)).json()) == 1
+
+    # A single item with transactions no longer fails on the foreign key
+    assert (await client.delete(f"/budget-items/{salary}", headers=auth_headers)).json() == {"ok": True}
+    assert (await client.delete(f"/budget-items/{salary}", headers=auth_headers)).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_bulk_delete_transactions_keeps_rollups_in_step(client, auth_headers, session_factory):
+    rent = await create_item(client, auth_headers, "Rent", "expense")
+    food = await create_item(client, auth_headers, "Food", "expense")
+    await import_csv(client, auth_headers, (
+        "date,amount,budget_item_id\n"
+        f"2024-01-01,900.10,{rent}\n2024-02-01,900,{rent}\n2024-01-05,50.05,{food}\n2024-03-05,20,{food}\n2023-12-31,10,{food}\n"
+    ))
+    assert (await client.post("/transactions/bulk-delete", json={}, headers=auth_headers)).status_code == 400
+
+    statements = []
+    engine = session_factory.kw["bind"].sync_engine
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        response = await client.post("/transactions/bulk-delete", json={"date_from": "2024-01-01", "date_to": "2024-01-31"}, headers=auth_headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    assert response.json() == {"budget_items": 0, "monthly_values": 0, "transactions": 2}
+    # The rollup change comes from the deleted rows themselves, not from a SELECT run before the DELETE
+    assert not [s for s in statements if s.startswith("SELECT") and "FROM transactions" in s]
+    assert [s for s in statements if s.startswith("DELETE FROM transactions") and "RETURNING" in s]
+    response = await client.post("/transactions/bulk-delete", json={"budget_item_id": food, "date_from": "2024-01-01"}, headers=auth_headers)
+    assert response.json()["transactions"] == 1
+
+    remaining = (await client.get("/transactions/", headers=auth_headers)).json()
+    assert sorted(tx["date"] for tx in remaining) == ["2023-12-31", "2024-02-01"]
+    response = await client.post("/transactions/bulk-delete", json={"ids": [tx["id"] for tx in remaining]}, headers=auth_headers)
+    assert response.json()["transactions"] == 2
+
+    async with session_factory() as db:
+        assert await rollups.verify(db) == []
+    summary = (await client.get("/dashboard/summary?year=2024", headers=auth_headers)).json()
+    assert summary["annual_totals"]["expense"]["actual"] == 0
@@ -0,0 +1,69 @@
+import pytest
+
+from services.cache import TTLCache, InMemoryCacheBackend, DashboardCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(max_size=2, ttl=None)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_ttl_cache_expires_entries():
+    clock = FakeClock()
+    cache = TTLCache(max_size=10, ttl=5, clock=clock)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=60)
+    clock.now = 5
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+
+
+@pytest.mark.asyncio
+async def test_dashboard_cache_hits_until_user_is_invalidated():
+    cache = DashboardCache(InMemoryCacheBackend(max_size=100, ttl=60))
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return {"n": len(calls)}
+
+    assert await cache.get_or_compute(1, 2024, compute) == {"n": 1}
+    assert await cache.get_or_compute(1, 2024, compute) == {"n": 1}
+    assert await cache.get_or_compute(1, None, compute) == {"n": 2}
+    assert await cache.get_or_compute(2, 2024, compute) == {"n": 3}
+
+    await cache.invalidate(1)
+    assert await cache.get_or_compute(1, 2024, compute) == {"n": 4}
+    assert await cache.get_or_compute(1, None, compute) == {"n": 5}
+    assert await cache.get_or_compute(2, 2024, compute) == {"n": 3}
+    assert cache.stats() == {"hits": 2, "misses": 5, "hit_ratio": 2 / 7}
+
+
+@pytest.mark.asyncio
+async def test_write_during_compute_is_not_masked():
+    cache = DashboardCache(InMemoryCacheBackend(max_size=100, ttl=60))
+
+    async def stale():
+        await cache.invalidate(1)
+        return "stale"
+
+    assert await cache.get_or_compute(1, 2024, stale) == "stale"
+
+    async def fresh():
+        return "fresh"
+
+    assert await cache.get_or_compute(1, 2024, fresh) == "fresh"
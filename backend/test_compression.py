@@ -0,0 +1,101 @@
+import zlib
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+from services.compression import CompressionMiddleware, choose_encoding
+
+
+def test_choose_encoding_follows_server_preference_and_q_values():
+    assert choose_encoding("gzip, deflate, br", ("br", "gzip")) == "br"
+    assert choose_encoding("gzip, br;q=0", ("br", "gzip")) == "gzip"
+    assert choose_encoding("*", ("br", "gzip")) == "br"
+    assert choose_encoding("identity", ("br", "gzip")) is None
+
+
+def make_app(chunks):
+    async def page(request):
+        return JSONResponse([{"category": "expense", "amount": "12.50", "n": i} for i in range(200)])
+
+    async def stream(request):
+        async def body():
+            for chunk in chunks:
+                yield chunk
+        return StreamingResponse(body(), media_type="text/csv")
+
+    async def small(request):
+        return JSONResponse({"ok": True})
+
+    app = Starlette(routes=[Route("/page", page), Route("/stream", stream), Route("/small", small)])
+    return CompressionMiddleware(app, encodings=["br", "gzip"], minimum_size=500)
+
+
+@pytest.mark.asyncio
+async def test_compresses_json_and_streams():
+    from httpx import AsyncClient, ASGITransport
+
+    chunks = [f"{i},expense,12.50\n".encode() * 50 for i in range(5)]
+    async with AsyncClient(transport=ASGITransport(app=make_app(chunks)), base_url="http://test") as client:
+        response = await client.get("/page", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert int(response.headers["content-length"]) < len(response.content) / 5
+        assert "accept-encoding" in response.headers["vary"].lower()
+
+        response = await client.get("/small", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+
+        response = await client.get("/stream", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip" and "content-length" not in response.headers
+        assert response.content == b"".join(chunks)
+
+        pytest.importorskip("brotli")
+        response = await client.get("/stream", headers={"Accept-Encoding": "br, gzip"})
+        assert response.headers["content-encoding"] == "br"
+        assert response.content == b"".join(chunks)
+
+
+@pytest.mark.asyncio
+async def test_each_streamed_chunk_decodes_on_arrival():
+    # Every chunk is flushed, so whatever the client has received so far decodes completely
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/plain")]})
+        for i in range(3):
+            await send({"type": "http.response.body", "body": b"x" * 600 + bytes([i]), "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    sent = []
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            sent.append(message["body"])
+
+    middleware = CompressionMiddleware(app, encodings=["gzip"], minimum_size=500)
+    await middleware({"type": "http", "headers": [(b"accept-encoding", b"gzip")]}, None, send)
+    decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    assert [decoder.decompress(chunk) for chunk in sent[:3]] == [b"x" * 600 + bytes([i]) for i in range(3)]
+
+
+@pytest.mark.asyncio
+async def test_leaves_excluded_and_encoded_responses_alone():
+    body = b"data: " + b"x" * 2000 + b"\n\n"
+    cases = [
+        (200, [(b"content-type", b"text/event-stream")]),
+        (200, [(b"content-type", b"image/png")]),
+        (200, [(b"content-type", b"text/plain"), (b"content-encoding", b"br")]),
+        (206, [(b"content-type", b"text/plain")]),
+    ]
+    for status, headers in cases:
+        async def app(scope, receive, send):
+            await send({"type": "http.response.start", "status": status, "headers": list(headers)})
+            await send({"type": "http.response.body", "body": body})
+
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        middleware = CompressionMiddleware(app, encodings=["gzip"], minimum_size=500)
+        await middleware({"type": "http", "headers": [(b"accept-encoding", b"gzip")]}, None, send)
+        assert sent[0]["headers"] == headers and sent[1]["body"] == body
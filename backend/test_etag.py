@@ -0,0 +1,77 @@
+import pytest
+from sqlalchemy import event
+
+from services.data_version import matches
+
+
+def test_weak_comparison():
+    assert matches('W/"3-abc"', 'W/"3-abc"')
+    assert matches('"1-x", "3-abc"', 'W/"3-abc"')
+    assert matches("*", 'W/"3-abc"')
+    assert not matches('W/"2-abc"', 'W/"3-abc"')
+
+
+@pytest.mark.asyncio
+async def test_conditional_get_answers_304_until_the_next_write(client, auth_headers, session_factory):
+    await client.post("/budget-items/", json={"name": "Rent", "category": "expense"}, headers=auth_headers)
+    first = await client.get("/budget-items/", headers=auth_headers)
+    etag = first.headers["etag"]
+    assert first.status_code == 200 and etag.startswith('W/"')
+
+    statements = []
+    engine = session_factory.kw["bind"].sync_engine
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        cached = await client.get("/budget-items/", headers={**auth_headers, "If-None-Match": etag})
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    assert cached.status_code == 304 and cached.content == b""
+    assert cached.headers["etag"] == etag
+    assert len(statements) == 1 and "data_version" in statements[0]
+
+    # Other URLs of the same user get their own tag
+    other = await client.get("/budget-items/?limit=5", headers={**auth_headers, "If-None-Match": etag})
+    assert other.status_code == 200 and other.headers["etag"] != etag
+
+    await client.post("/settings/", json={"year": 2024, "currency": "EUR"}, headers=auth_headers)
+    fresh = await client.get("/budget-items/", headers={**auth_headers, "If-None-Match": etag})
+    assert fresh.status_code == 200 and fresh.headers["etag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_every_read_endpoint_is_conditional(client, auth_headers):
+    for url in ("/transactions/", "/monthly-values/", "/settings/", "/dashboard/summary"):
+        response = await client.get(url, headers=auth_headers)
+        assert response.status_code == 200
+        again = await client.get(url, headers={**auth_headers, "If-None-Match": response.headers["etag"]})
+        assert again.status_code == 304, url
+
+
+@pytest.mark.asyncio
+async def test_commit_write_bumps_commits_invalidates_and_publishes(client, auth_headers, session_factory, monkeypatch):
+    from sqlalchemy import select
+    from models.user import User
+    from services import data_version
+    from services.cache import dashboard_cache
+    from services.events import dashboard_events
+
+    user_id = (await client.get("/auth/me", headers=auth_headers)).json()["id"]
+    invalidated = []
+
+    async def invalidate(uid):
+        invalidated.append(uid)
+
+    monkeypatch.setattr(dashboard_cache, "invalidate", invalidate)
+    subscription = dashboard_events.subscribe(user_id)
+
+    async with session_factory() as db:
+        before = (await db.execute(select(User.data_version).where(User.id == user_id))).scalar_one()
+        await data_version.commit_write(db, user_id, actuals={(1, 2024, 3): 5})
+        await data_version.commit_write(db, user_id)
+    async with session_factory() as db:
+        assert (await db.execute(select(User.data_version).where(User.id == user_id))).scalar_one() == before + 2
+    assert invalidated == [user_id, user_id]
+    assert await subscription.get() == {"actual": [[1, 2024, 3, 500]]}
+    assert await subscription.get() == {"reset": True}
+    await subscription.close()
@@ -0,0 +1,105 @@
+import json
+
+import pytest
+
+from services.events import RELOAD_ATTEMPTS, DashboardEvents, InMemoryBroker, dashboard_events, dashboard_stream
+from services.finance_engine import FinanceEngine
+
+
+def parse(frame):
+    event, data = frame.strip().split("\n")
+    return event.removeprefix("event: "), json.loads(data.removeprefix("data: "))
+
+
+@pytest.mark.asyncio
+async def test_broker_fans_out_and_resets_slow_subscribers():
+    events = DashboardEvents(InMemoryBroker(queue_size=2))
+    first, second, other = events.subscribe(1), events.subscribe(1), events.subscribe(2)
+
+    await events.actuals(1, {(10, 2024, 3): 5})
+    assert await first.get() == {"actual": [[10, 2024, 3, 500]]}
+    assert await second.get() == {"actual": [[10, 2024, 3, 500]]}
+    assert other.pending() == 0
+
+    # `first` keeps up, `second` overflows and gets a single reset instead of stale deltas
+    await events.planned(1, {(10, 1): "12.345"})
+    assert await first.get() == {"planned": [[10, 1, 1235]]}
+    await events.actuals(1, {(10, 2024, 4): 1})
+    await events.actuals(1, {(10, 2024, 5): 1})
+    assert second.pending() == 1 and await second.get() == {"reset": True}
+
+    await first.close()
+    await second.close()
+    await other.close()
+    assert len(events.broker) == 0
+
+
+@pytest.mark.asyncio
+async def test_stream_sends_summary_then_deltas(client, auth_headers, session_factory):
+    user_id = (await client.get("/auth/me", headers=auth_headers)).json()["id"]
+    await client.post("/settings/", json={"year": 2024, "currency": "EUR"}, headers=auth_headers)
+    rent = (await client.post("/budget-items/", json={"name": "Rent", "category": "expense"}, headers=auth_headers)).json()["id"]
+
+    async def load():
+        async with session_factory() as db:
+            return await FinanceEngine(db, user_id).load_state()
+
+    stream = dashboard_stream(dashboard_events, user_id, load, keepalive=0.05)
+    event, summary = parse(await anext(stream))
+    assert event == "summary" and summary["annual_totals"]["expense"]["actual"] == 0
+
+    await client.post("/transactions/", json={"date": "2024-03-05", "amount": 900.10, "budget_item_id": rent}, headers=auth_headers)
+    event, delta = parse(await anext(stream))
+    assert event == "delta"
+    assert delta["annual_totals"] == {"expense": {"planned": 0.0, "actual": 900.1, "diff": -900.1}}
+    assert delta["monthly_series"] == [{"month": 3, "income": 0.0, "expense": 0.0, "actual_income": 0.0, "actual_expense": 900.1}]
+    assert delta["breakdown"]["expense"][0]["budget_item_id"] == rent
+
+    # Transactions outside the streamed year do not produce events, only keepalives
+    await client.post("/transactions/", json={"date": "2023-03-05", "amount": 50, "budget_item_id": rent}, headers=auth_headers)
+    assert await anext(stream) == ": keepalive\n\n"
+
+    await client.post("/monthly-values/", json={"budget_item_id": rent, "month": 3, "planned_amount": 1000}, headers=auth_headers)
+    await client.post("/monthly-values/", json={"budget_item_id": rent, "month": 3, "planned_amount": 950}, headers=auth_headers)
+    await anext(stream)
+    event, delta = parse(await anext(stream))
+    full = (await client.get("/dashboard/summary", headers=auth_headers)).json()
+    assert delta["annual_totals"]["expense"] == full["annual_totals"]["expense"]
+    assert delta["monthly_series"][0] == full["monthly_series"][2]
+    assert delta["ratios"] == full["ratios"]
+
+    # New items reshape the summary, so the stream reloads it
+    await client.post("/budget-items/", json={"name": "Salary", "category": "income"}, headers=auth_headers)
+    event, summary = parse(await anext(stream))
+    assert event == "summary"
+    assert [row["sub_category"] for row in summary["breakdown"]["income"]] == ["Salary"]
+    await stream.aclose()
+    assert len(dashboard_events.broker) == 0
+
+
+@pytest.mark.asyncio
+async def test_unsettled_reload_is_read_again_instead_of_patched():
+    events = DashboardEvents(InMemoryBroker())
+    loads = []
+
+    class State:
+        # apply_changes would fail on this state: pending messages must never be applied to it
+        def __init__(self, n):
+            self.n = n
+
+        def summary(self, settings):
+            return {"load": self.n}
+
+    async def load():
+        # A write commits during each of the first reads
+        loads.append(1)
+        if len(loads) <= RELOAD_ATTEMPTS:
+            await events.actuals(1, {(10, 2024, 3): 5})
+        return State(len(loads)), {"year": 2024}
+
+    stream = dashboard_stream(events, 1, load, keepalive=0.05)
+    assert parse(await anext(stream)) == ("summary", {"load": RELOAD_ATTEMPTS})
+    # The unsettled read is followed by another one, not by deltas applied on top of it
+    assert parse(await anext(stream)) == ("summary", {"load": RELOAD_ATTEMPTS + 1})
+    assert await anext(stream) == ": keepalive\n\n"
+    await stream.aclose()
@@ -0,0 +1,79 @@
+import csv
+import io
+import zipfile
+
+import pytest
+
+from conftest import register_and_login
+
+
+async def seed(client, headers):
+    rent = (await client.post("/budget-items/", json={"name": "Rent", "category": "expense"}, headers=headers)).json()["id"]
+    salary = (await client.post("/budget-items/", json={"name": "Salary", "category": "income", "type": "passive"}, headers=headers)).json()["id"]
+    await client.post("/settings/", json={"year": 2024, "currency": "USD"}, headers=headers)
+    await client.post("/monthly-values/batch", json={"rows": [
+        {"budget_item_id": rent, "planned_amounts": [900] * 12},
+        {"budget_item_id": salary, "planned_amounts": [3000] * 12},
+    ]}, headers=headers)
+    lines = ["date,amount,budget_item_id,comment"] + [
+        f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d},{i}.25,{rent if i % 2 else salary},row {i}" for i in range(2500)
+    ]
+    response = await client.post("/transactions/bulk", content="\n".join(lines).encode(), headers=headers)
+    assert response.json()["inserted"] == 2500
+
+
+@pytest.mark.asyncio
+async def test_csv_export_has_one_file_per_table(client, auth_headers):
+    await seed(client, auth_headers)
+    response = await client.get("/export/?format=csv", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+
+    archive = zipfile.ZipFile(io.BytesIO(response.content))
+    tables = {name: list(csv.DictReader(io.TextIOWrapper(archive.open(name), "utf-8"))) for name in archive.namelist()}
+    assert sorted(tables) == ["budget_items.csv", "monthly_values.csv", "settings.csv", "transactions.csv"]
+    assert tables["settings.csv"] == [{"year": "2024", "currency": "USD"}]
+    assert len(tables["monthly_values.csv"]) == 24
+    transactions = tables["transactions.csv"]
+    assert len(transactions) == 2500
+    assert [(t["date"], int(t["id"])) for t in transactions] == sorted((t["date"], int(t["id"])) for t in transactions)
+    assert {t["budget_item"] for t in transactions} == {"Rent", "Salary"}
+
+
+@pytest.mark.asyncio
+async def test_xlsx_export_round_trips_through_workbook_import(client, auth_headers):
+    pytest.importorskip("openpyxl")
+    await seed(client, auth_headers)
+    response = await client.get("/export/?format=xlsx", headers=auth_headers)
+    assert response.status_code == 200
+
+    other = await register_and_login(client, "other@example.com", "secret")
+    result = (await client.post("/import/workbook", files={"file": ("budget.xlsx", response.content)}, headers=other)).json()
+    assert (result["year"], result["currency"]) == (2024, "USD")
+    assert result["items_created"] == 2 and result["monthly_values"] == 24
+    assert result["transactions"]["inserted"] == 2500
+
+    original = (await client.get("/dashboard/summary?year=2024", headers=auth_headers)).json()
+    imported = (await client.get("/dashboard/summary?year=2024", headers=other)).json()
+    assert imported["annual_totals"] == original["annual_totals"]
+    assert imported["type_breakdown"] == original["type_breakdown"]
+
+
+@pytest.mark.asyncio
+async def test_parquet_export(client, auth_headers):
+    pq = pytest.importorskip("pyarrow.parquet")
+    await seed(client, auth_headers)
+    response = await client.get("/export/?format=parquet", headers=auth_headers)
+    assert response.status_code == 200
+
+    archive = zipfile.ZipFile(io.BytesIO(response.content))
+    table = pq.read_table(io.BytesIO(archive.read("transactions.parquet")))
+    assert table.num_rows == 2500
+    assert pq.ParquetFile(io.BytesIO(archive.read("transactions.parquet"))).num_row_groups == 3
+    assert str(table.schema.field("amount").type) == "decimal128(14, 2)"
+
+
+@pytest.mark.asyncio
+async def test_unknown_format(client, auth_headers):
+    response = await client.get("/export/?format=ods", headers=auth_headers)
+    assert response.status_code == 400
@@ -0,0 +1,32 @@
+import pytest
+
+from test_transactions import create_item, import_csv
+
+
+@pytest.mark.asyncio
+async def test_fast_path_matches_validated_responses(client, auth_headers):
+    rent = await create_item(client, auth_headers, "Rent", "expense")
+    salary = await create_item(client, auth_headers, "Salary", "income")
+    await client.post("/monthly-values/batch", json={"rows": [{"budget_item_id": rent, "planned_amounts": [900.5] * 12}]}, headers=auth_headers)
+    await import_csv(client, auth_headers, (
+        "date,amount,budget_item_id,comment\n"
+        f"2024-01-01,900.5,{rent},\n2024-02-01,900,{rent},late\n2024-01-31,3000.25,{salary},\n"
+    ))
+
+    for url in (
+        "/transactions/?limit=2&expand=budget_item.monthly_values",
+        "/transactions/?expand=budget_item",
+        "/transactions/",
+        "/budget-items/",
+        "/monthly-values/",
+    ):
+        validated = await client.get(url, headers=auth_headers)
+        fast = await client.get(url + ("&" if "?" in url else "?") + "fast=true", headers=auth_headers)
+        assert fast.status_code == 200 and fast.headers["content-type"] == "application/json"
+        assert fast.json() == validated.json(), url
+        assert fast.headers.get("x-next-cursor") == validated.headers.get("x-next-cursor")
+        assert "etag" in fast.headers
+
+    page = (await client.get("/transactions/?fast=true&limit=1&expand=budget_item.monthly_values", headers=auth_headers)).json()
+    assert page[0]["amount"] == "900.00"
+    assert page[0]["budget_item"]["monthly_values"][0]["planned_amount"] == "900.50"
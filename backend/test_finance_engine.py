@@ -0,0 +1,111 @@
+import pytest
+from datetime import date
+from decimal import Decimal
+
+from models.user import User
+from models.settings import Settings
+from models.budget_item import BudgetItem
+from models.monthly_value import MonthlyValue
+from models.transaction import Transaction
+from services.finance_engine import FinanceEngine, BACKENDS
+from services import rollups
+
+
+async def seed(db):
+    user = User(email="a@example.com", hashed_password="x")
+    other = User(email="b@example.com", hashed_password="x")
+    db.add_all([user, other])
+    await db.flush()
+    db.add(Settings(year=2024, currency="USD", user_id=user.id))
+
+    salary = BudgetItem(name="Salary", category="income", type="active", user_id=user.id)
+    rent = BudgetItem(name="Rent", category="expense", type="active", user_id=user.id)
+    etf = BudgetItem(name="ETF", category="saving", type="passive", user_id=user.id)
+    foreign = BudgetItem(name="Other", category="expense", type="active", user_id=other.id)
+    db.add_all([salary, rent, etf, foreign])
+    await db.flush()
+
+    for month in range(1, 13):
+        db.add(MonthlyValue(budget_item_id=salary.id, user_id=user.id, month=month, planned_amount=Decimal("3000")))
+        db.add(MonthlyValue(budget_item_id=rent.id, user_id=user.id, month=month, planned_amount=Decimal("1000.50")))
+    db.add(MonthlyValue(budget_item_id=foreign.id, user_id=other.id, month=1, planned_amount=Decimal("999")))
+
+    db.add_all([
+        Transaction(date=date(2024, 1, 31), amount=Decimal("3100"), budget_item_id=salary.id, user_id=user.id),
+        Transaction(date=date(2024, 2, 1), amount=Decimal("950.25"), budget_item_id=rent.id, user_id=user.id),
+        Transaction(date=date(2024, 2, 15), amount=Decimal("50"), budget_item_id=rent.id, user_id=user.id),
+        Transaction(date=date(2024, 3, 3), amount=Decimal("400"), budget_item_id=etf.id, user_id=user.id),
+        Transaction(date=date(2024, 3, 3), amount=Decimal("77"), budget_item_id=foreign.id, user_id=other.id),
+        Transaction(date=date(2023, 12, 31), amount=Decimal("2900"), budget_item_id=salary.id, user_id=user.id),
+        Transaction(date=date(2025, 1, 1), amount=Decimal("3200"), budget_item_id=salary.id, user_id=user.id),
+    ])
+    await db.flush()
+    await rollups.rebuild(db)
+    await db.commit()
+    return user
+
+
+@pytest.mark.asyncio
+async def test_backends_return_identical_summaries(session_factory):
+    async with session_factory() as db:
+        user = await seed(db)
+        summaries = [await FinanceEngine(db, user.id, backend=b).get_dashboard_summary() for b in BACKENDS]
+
+    expected = summaries[0]
+    assert expected["annual_totals"]["income"] == {"planned": 36000.0, "actual": 3100.0, "diff": -32900.0}
+    assert expected["annual_totals"]["expense"]["actual"] == 1000.25
+    assert expected["monthly_series"][1]["actual_expense"] == 1000.25
+    assert expected["type_breakdown"]["passive"] == {"planned": 0.0, "actual": 400.0}
+    assert expected["settings"] == {"year": 2024, "currency": "USD"}
+    for summary in summaries[1:]:
+        assert summary == expected
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        FinanceEngine(None, 1, backend="bogus")
+
+
+@pytest.mark.asyncio
+async def test_summary_is_scoped_to_requested_year(session_factory):
+    async with session_factory() as db:
+        user = await seed(db)
+        for backend in BACKENDS:
+            summary = await FinanceEngine(db, user.id, year=2023, backend=backend).get_dashboard_summary()
+            assert summary["settings"] == {"year": 2023, "currency": "USD"}
+            assert summary["annual_totals"]["income"]["actual"] == 2900.0
+            assert summary["monthly_series"][11]["actual_income"] == 2900.0
+            assert summary["annual_totals"]["expense"]["actual"] == 0.0
+
+
+@pytest.mark.asyncio
+async def test_rollups_follow_incremental_writes(session_factory):
+    async with session_factory() as db:
+        user = await seed(db)
+        assert await rollups.verify(db) == []
+
+        rent_id = (await FinanceEngine(db, user.id, backend="python")._load_item_rows())[1].id
+        tx = Transaction(date=date(2024, 5, 5), amount=Decimal("12.34"), budget_item_id=rent_id, user_id=user.id)
+        db.add(tx)
+        await rollups.add_actual(db, user.id, rent_id, tx.date, tx.amount)
+        await rollups.set_planned(db, user.id, rent_id, 5, Decimal("1200"))
+        await db.execute(
+            MonthlyValue.__table__.update()
+            .where(MonthlyValue.budget_item_id == rent_id, MonthlyValue.month == 5)
+            .values(planned_amount=Decimal("1200"))
+        )
+        await db.commit()
+        assert await rollups.verify(db) == []
+
+        await rollups.add_actual(db, user.id, rent_id, tx.date, -tx.amount)
+        await db.delete(tx)
+        await db.commit()
+        assert await rollups.verify(db) == []
+
+        python = await FinanceEngine(db, user.id, backend="python").get_dashboard_summary()
+        rollup = await FinanceEngine(db, user.id, backend="rollup").get_dashboard_summary()
+        assert rollup == python
+
+        await rollups.add_actual(db, user.id, rent_id, date(2024, 6, 1), Decimal("1"))
+        drift = await rollups.verify(db)
+        assert len(drift) == 1 and drift[0]["month"] == 6
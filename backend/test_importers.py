@@ -0,0 +1,115 @@
+import pytest
+from datetime import date
+from decimal import Decimal
+
+from conftest import register_and_login
+from services import importers, rollups
+
+
+async def chunked(data: bytes, size: int = 7):
+    # Small chunks so records straddle chunk boundaries
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+async def collect(parser):
+    return [record async for record in parser]
+
+
+@pytest.mark.asyncio
+async def test_csv_rows_stream_across_chunks():
+    data = (
+        "\ufeffDate,Amount,Budget_Item,Comment\r\n"
+        "2024-01-05,12.50,Groceries,\"multi\nline\"\r\n"
+        "2024-13-01,1,Groceries,\r\n"
+        "2024-01-06,abc,Groceries,\r\n"
+    ).encode()
+    records = await collect(importers.parse_csv(chunked(data)))
+    assert records[0] == (2, {
+        "date": date(2024, 1, 5), "amount": Decimal("12.50"), "budget_item_id": None,
+        "budget_item": "Groceries", "comment": "multi\nline",
+    }, None)
+    assert [(line, error is not None) for line, _, error in records[1:]] == [(4, True), (5, True)]
+
+
+@pytest.mark.asyncio
+async def test_csv_stray_quote_costs_only_its_row(monkeypatch):
+    monkeypatch.setattr(importers, "MAX_CSV_RECORD_CHARS", 100)
+    rows = "".join(f"2024-01-{day:02d},{day},Groceries,\n" for day in range(2, 12))
+    data = f"date,amount,budget_item,comment\n2024-01-01,1,Groceries,\"oops\n{rows}".encode()
+    records = await collect(importers.parse_csv(chunked(data)))
+    assert records[0] == (2, None, "unbalanced quote, no closing quote within 100 characters")
+    assert [(line, row["amount"]) for line, row, _ in records[1:]] == [(day + 1, day) for day in range(2, 12)]
+
+    # At the end of the upload, whatever the open quote held is read again as well
+    records = await collect(importers.parse_csv(chunked(b'date,amount\n2024-01-01,"1\n2024-01-02,2\n')))
+    assert records == [(2, None, "unterminated quoted field"), (3, {
+        "date": date(2024, 1, 2), "amount": Decimal("2.00"), "budget_item_id": None, "budget_item": None, "comment": None,
+    }, None)]
+
+
+@pytest.mark.asyncio
+async def test_csv_requires_date_and_amount_columns():
+    records = await collect(importers.parse_csv(chunked(b"when,value\n2024-01-01,1\n")))
+    assert records == [(1, None, "missing column(s): amount, date")]
+
+
+@pytest.mark.asyncio
+async def test_ofx_sgml_and_qif():
+    ofx = (
+        b"OFXHEADER:100\n<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>\n"
+        b"<STMTTRN>\n<TRNTYPE>DEBIT\n<DTPOSTED>20240131120000[0:GMT]\n<TRNAMT>-42.10\n<NAME>SHOP\n</STMTTRN>\n"
+        b"<STMTTRN><DTPOSTED>20240201<TRNAMT>1500.00<MEMO>Salary</STMTTRN>\n"
+        b"</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>\n"
+    )
+    records = await collect(importers.parse_ofx(chunked(ofx)))
+    assert [(r["date"], r["amount"], r["comment"]) for _, r, _ in records] == [
+        (date(2024, 1, 31), Decimal("-42.10"), "SHOP"),
+        (date(2024, 2, 1), Decimal("1500.00"), "Salary"),
+    ]
+
+    qif = b"!Type:Bank\nD01/31/2024\nT-1,042.10\nPShop\nLGroceries\n^\nD02/01'24\nT5\n^\nPno date\n^\n"
+    records = await collect(importers.parse_qif(chunked(qif)))
+    assert records[0] == (2, {
+        "date": date(2024, 1, 31), "amount": Decimal("-1042.10"), "budget_item_id": None,
+        "budget_item": "Groceries", "comment": "Shop",
+    }, None)
+    assert records[1][1]["date"] == date(2024, 2, 1)
+    assert records[2] == (10, None, "record without date or amount")
+
+
+@pytest.mark.asyncio
+async def test_bulk_endpoint_inserts_valid_rows_and_reports_errors(client, session_factory, auth_headers):
+    response = await client.post("/budget-items/", json={"name": "Groceries", "category": "expense"}, headers=auth_headers)
+    item_id = response.json()["id"]
+    other_headers = await register_and_login(client, "other@example.com")
+    other_item = (await client.post("/budget-items/", json={"name": "Rent", "category": "expense"}, headers=other_headers)).json()["id"]
+
+    body = (
+        "date,amount,budget_item_id,budget_item\n"
+        f"2024-03-01,10.00,{item_id},\n"
+        "2024-03-02,-5.25,,groceries\n"
+        f"2024-03-03,7,{other_item},\n"
+        "2024-03-04,1,,Unknown\n"
+        "2024-03-05,2,,\n"
+    )
+    response = await client.post(
+        "/transactions/bulk?absolute=true", content=body.encode(),
+        headers={**auth_headers, "Content-Type": "text/csv"}
+    )
+    assert response.status_code == 200
+    result = response.json()
+    assert result["inserted"] == 2
+    assert result["failed"] == 3
+    assert [e["line"] for e in result["errors"]] == [4, 5, 6]
+
+    summary = (await client.get("/dashboard/summary?year=2024", headers=auth_headers)).json()
+    assert summary["annual_totals"]["expense"]["actual"] == 15.25
+    async with session_factory() as db:
+        assert await rollups.verify(db) == []
+
+    response = await client.post(
+        f"/transactions/bulk?budget_item_id={other_item}", content=b"date,amount\n",
+        headers={**auth_headers, "Content-Type": "text/csv"}
+    )
+    assert response.status_code == 404
@@ -0,0 +1,84 @@
+import pstats
+
+import pytest
+
+from services.metrics import Counter, Histogram, Registry, RequestProfiler, registry
+from services.query_tracer import tracer
+
+
+def test_prometheus_text_format():
+    local = Registry()
+    requests = local.register(Counter("requests_total", "Requests", ("route",)))
+    latency = local.register(Histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1)))
+    requests.inc(('/a"b',))
+    for value in (0.05, 0.5, 3):
+        latency.observe(value, ("/a",))
+    assert local.render().splitlines() == [
+        "# HELP requests_total Requests",
+        "# TYPE requests_total counter",
+        'requests_total{route="/a\\"b"} 1',
+        "# HELP latency_seconds Latency",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{route="/a",le="0.1"} 1',
+        'latency_seconds_bucket{route="/a",le="1"} 2',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 3',
+        'latency_seconds_sum{route="/a"} 3.55',
+        'latency_seconds_count{route="/a"} 3',
+    ]
+
+
+def sample(text, prefix):
+    return sum(float(line.rsplit(" ", 1)[1]) for line in text.splitlines() if line.startswith(prefix))
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_reports_routes_db_time_and_engine(client, auth_headers, session_factory):
+    tracer.install(session_factory.kw["bind"])
+    before = registry.render()
+    await client.get("/dashboard/summary?backend=sql", headers=auth_headers)
+    await client.get("/no-such-page")
+    text = (await client.get("/metrics")).text
+
+    route = 'method="GET",route="/dashboard/summary"'
+    assert sample(text, f'http_requests_total{{{route},status="200"}}') == sample(before, f'http_requests_total{{{route},status="200"}}') + 1
+    assert sample(text, f"http_request_duration_seconds_count{{{route}}}") >= 1
+    assert sample(text, f"http_request_db_statements_sum{{{route}}}") - sample(before, f"http_request_db_statements_sum{{{route}}}") >= 3
+    assert sample(text, 'finance_engine_seconds_count{backend="sql",phase="compute"}') >= 1
+    assert 'route="unmatched",status="404"' in text
+    assert "http_requests_in_flight 1" in text # the /metrics request itself
+    assert sample(text, "sql_statements_total") == tracer.statements >= 3
+    assert "sql_slow_queries_total 0" in text
+    assert 'password_hash_operations{state="queued"} 0' in text
+    # Metrics alone time the statements but do not record or log slow ones (that is SQL_TRACE)
+    assert tracer.slow_query_count == 0
+
+
+@pytest.mark.asyncio
+async def test_metrics_token(client, monkeypatch):
+    import main
+    from services import metrics
+
+    monkeypatch.setattr(metrics, "METRICS_TOKEN", "s3cret")
+    monkeypatch.setattr(main, "SQL_TRACE", True)
+    for path in ("/metrics", "/debug/sql-stats"):
+        assert (await client.get(path)).status_code == 401
+        assert (await client.get(path, headers={"Authorization": "Bearer nope"})).status_code == 401
+        assert (await client.get(path, headers={"Authorization": "Bearer s3cret"})).status_code == 200
+
+
+def test_profiler_keeps_only_slow_requests(tmp_path):
+    profiler = RequestProfiler(sample_rate=1, threshold_ms=10_000, directory=str(tmp_path), kind="cprofile")
+    assert profiler.finish(profiler.start(), "GET", "/fast", 0.01) is None
+    profiler.threshold_ms = 0
+    path = profiler.finish(profiler.start(), "GET", "/dashboard/summary", 0.75)
+    assert path.endswith("-GET_dashboard_summary-750ms.prof")
+    pstats.Stats(path) # readable by pstats/snakeviz
+
+
+def test_password_pool_gauge(monkeypatch):
+    from services import auth_utils
+
+    monkeypatch.setattr(auth_utils, "_password_ops_in_flight", auth_utils.PASSWORD_HASH_CONCURRENCY + 3)
+    text = registry.render()
+    assert f'password_hash_operations{{state="running"}} {auth_utils.PASSWORD_HASH_CONCURRENCY}' in text
+    assert 'password_hash_operations{state="queued"} 3' in text
@@ -0,0 +1,54 @@
+import pytest
+from decimal import Decimal
+from types import SimpleNamespace
+from hypothesis import given, settings, strategies as st
+
+from services.finance_engine import CATEGORIES, summarize
+from services.money import MAX_AMOUNT, from_cents, quantize, to_cents
+
+
+amounts = st.decimals(min_value=-MAX_AMOUNT, max_value=MAX_AMOUNT, places=2, allow_nan=False, allow_infinity=False)
+small_amounts = st.decimals(min_value=Decimal("-100000"), max_value=Decimal("100000"), places=2)
+rows = st.lists(st.tuples(st.integers(1, 6), st.integers(1, 12), small_amounts), max_size=300)
+
+
+def test_quantize_rounds_half_away_from_zero_and_bounds():
+    assert quantize("0.125") == Decimal("0.13")
+    assert quantize("-0.125") == Decimal("-0.13")
+    with pytest.raises(ValueError):
+        quantize(MAX_AMOUNT + 1)
+
+
+@given(amounts)
+def test_cents_round_trip(amount):
+    assert to_cents(amount) == int(amount * 100)
+    assert from_cents(to_cents(amount)) == float(amount)
+    assert str(Decimal(repr(from_cents(to_cents(amount))))) == str(float(amount))
+
+
+@settings(max_examples=200, deadline=None)
+@given(st.lists(st.sampled_from(CATEGORIES), min_size=6, max_size=6), rows, rows)
+def test_summary_matches_decimal_reference(categories, planned, actual):
+    items = [SimpleNamespace(id=i, name=f"Item {i}", category=c, type="active") for i, c in enumerate(categories, start=1)]
+    summary = summarize(
+        items,
+        [(item_id, month, to_cents(amount)) for item_id, month, amount in planned],
+        [(item_id, month, to_cents(amount)) for item_id, month, amount in actual],
+    )
+
+    for category in CATEGORIES:
+        ids = {item.id for item in items if item.category == category}
+        planned_sum = sum((a for i, _, a in planned if i in ids), Decimal(0))
+        actual_sum = sum((a for i, _, a in actual if i in ids), Decimal(0))
+        totals = summary["annual_totals"][category]
+        # Exact sums, converted once: the float is the one closest to the Decimal total
+        assert totals["planned"] == float(planned_sum)
+        assert totals["actual"] == float(actual_sum)
+
+    for point in summary["monthly_series"]:
+        expected = sum((a for i, m, a in actual if m == point["month"] and items[i - 1].category == "expense"), Decimal(0))
+        assert point["actual_expense"] == float(expected)
+
+    for item in items:
+        row = next(r for r in summary["breakdown"][item.category] if r["sub_category"] == item.name)
+        assert row["actual"] == float(sum((a for i, _, a in actual if i == item.id), Decimal(0)))
@@ -0,0 +1,53 @@
+import pytest
+from sqlalchemy import select, func
+
+from conftest import register_and_login
+from models.monthly_value import MonthlyValue
+from services import rollups
+
+
+@pytest.mark.asyncio
+async def test_batch_upserts_whole_grid(client, session_factory, auth_headers):
+    items = [
+        (await client.post("/budget-items/", json={"name": name, "category": "expense"}, headers=auth_headers)).json()["id"]
+        for name in ("Rent", "Food")
+    ]
+    grid = {"rows": [{"budget_item_id": item_id, "planned_amounts": [100 * (i + 1)] * 12} for i, item_id in enumerate(items)]}
+    response = await client.post("/monthly-values/batch", json=grid, headers=auth_headers)
+    assert response.status_code == 200
+    assert len(response.json()) == 24
+
+    # Update a row and single cells in one request; the cell overrides the row value
+    update = {
+        "rows": [{"budget_item_id": items[0], "planned_amounts": [150] * 12}],
+        "values": [{"budget_item_id": items[0], "month": 3, "planned_amount": 175}],
+    }
+    response = await client.post("/monthly-values/batch", json=update, headers=auth_headers)
+    assert response.status_code == 200
+    assert len(response.json()) == 12
+
+    response = await client.post("/monthly-values/", json={"budget_item_id": items[1], "month": 1, "planned_amount": 250}, headers=auth_headers)
+    assert response.status_code == 200
+
+    async with session_factory() as db:
+        assert (await db.execute(select(func.count()).select_from(MonthlyValue))).scalar() == 24
+        assert await rollups.verify(db) == []
+
+    summary = (await client.get("/dashboard/summary", headers=auth_headers)).json()
+    assert summary["annual_totals"]["expense"]["planned"] == 150 * 11 + 175 + 200 * 11 + 250
+
+
+@pytest.mark.asyncio
+async def test_batch_rejects_foreign_items_and_bad_rows(client, auth_headers):
+    other_headers = await register_and_login(client, "other@example.com")
+    foreign = (await client.post("/budget-items/", json={"name": "Rent", "category": "expense"}, headers=other_headers)).json()["id"]
+
+    response = await client.post("/monthly-values/batch", json={"values": [{"budget_item_id": foreign, "month": 1, "planned_amount": 1}]}, headers=auth_headers)
+    assert response.status_code == 404
+    response = await client.post("/monthly-values/", json={"budget_item_id": foreign, "month": 1, "planned_amount": 1}, headers=auth_headers)
+    assert response.status_code == 404
+
+    response = await client.post("/monthly-values/batch", json={"rows": [{"budget_item_id": foreign, "planned_amounts": [1] * 11}]}, headers=auth_headers)
+    assert response.status_code == 422
+    response = await client.post("/monthly-values/batch", json={"values": [{"budget_item_id": foreign, "month": 13}]}, headers=auth_headers)
+    assert response.status_code == 422
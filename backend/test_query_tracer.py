@@ -0,0 +1,43 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from main import app
+from services.query_tracer import QueryTracer, QueryTracerMiddleware
+
+
+@pytest.mark.asyncio
+async def test_tracer_counts_statements_per_request(client, session_factory, auth_headers):
+    tracer = QueryTracer(slow_query_ms=0)
+    tracer.install(session_factory.kw["bind"])
+    traced = QueryTracerMiddleware(app, tracer=tracer)
+
+    async with AsyncClient(transport=ASGITransport(app=traced), base_url="http://test") as ac:
+        response = await ac.get("/dashboard/summary", headers=auth_headers)
+    assert response.status_code == 200
+    timing = response.headers["server-timing"]
+    assert timing.startswith("db;dur=") and 'queries"' in timing
+
+    snapshot = tracer.snapshot()
+    assert snapshot["requests"] == 1
+    assert snapshot["statements"] == snapshot["max_request_statements"] > 0
+    # Every statement is "slow" at a 0 ms threshold; only the SQL text is kept, never parameters
+    assert snapshot["slow_queries_total"] == snapshot["statements"]
+    assert all("SELECT" in q["statement"].upper() for q in snapshot["recent_slow_queries"])
+
+
+@pytest.mark.asyncio
+async def test_failed_statements_leave_no_timing_state(session_factory):
+    from sqlalchemy import text
+
+    tracer = QueryTracer(slow_query_ms=10_000)
+    engine = session_factory.kw["bind"]
+    tracer.install(engine)
+    async with engine.connect() as conn:
+        for _ in range(3):
+            with pytest.raises(Exception):
+                await conn.execute(text("SELECT * FROM no_such_table"))
+            await conn.rollback()
+        await conn.execute(text("SELECT 1"))
+        info = (await conn.get_raw_connection()).info
+    assert "query_start" not in info
+    assert tracer.statements == 1
@@ -0,0 +1,99 @@
+import pytest
+from datetime import date
+from sqlalchemy import select
+
+from models.budget_item import BudgetItem
+from models.monthly_value import MonthlyValue
+from services import rollups
+from services.rollover import clone_year
+from test_transactions import create_item, import_csv
+
+
+@pytest.mark.asyncio
+async def test_rollover_copies_scaled_plan_into_the_next_year(client, auth_headers, session_factory):
+    await client.post("/settings/", json={"year": 2024, "currency": "EUR"}, headers=auth_headers)
+    rent = await create_item(client, auth_headers, "Rent", "expense")
+    salary = await create_item(client, auth_headers, "Salary", "income")
+    await client.post("/monthly-values/batch", json={"rows": [
+        {"budget_item_id": rent, "planned_amounts": [1000] * 12},
+        {"budget_item_id": salary, "planned_amounts": [3000] * 12},
+    ]}, headers=auth_headers)
+    await import_csv(client, auth_headers, f"date,amount,budget_item_id\n2024-03-01,980,{rent}\n")
+    before = (await client.get("/dashboard/summary", headers=auth_headers)).json()
+
+    response = await client.post("/budget-items/rollover", json={"scale": {"expense": "1.03"}}, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json() == {"from_year": 2024, "to_year": 2025, "items": 2, "monthly_values": 24}
+
+    summary = (await client.get("/dashboard/summary", headers=auth_headers)).json()
+    assert summary["settings"]["year"] == 2025
+    assert summary["annual_totals"]["expense"] == {"planned": 12360.0, "actual": 0.0, "diff": 12360.0}
+    assert summary["annual_totals"]["income"]["planned"] == 36000.0
+    assert [row["sub_category"] for row in summary["breakdown"]["expense"]] == ["Rent"]
+
+    # The source year keeps its undated items, plan and actuals
+    assert (await client.get("/dashboard/summary?year=2024", headers=auth_headers)).json()["annual_totals"] == before["annual_totals"]
+    items = (await client.get("/budget-items/?year=2025", headers=auth_headers)).json()
+    assert {item["year"] for item in items} == {2025} and len(items) == 2
+
+    async with session_factory() as db:
+        assert await rollups.verify(db) == []
+
+    again = await client.post("/budget-items/rollover", json={"from_year": 2024, "to_year": 2025}, headers=auth_headers)
+    assert again.status_code == 409
+
+
+@pytest.mark.asyncio
+async def test_rollover_plans_average_actuals(client, auth_headers):
+    await client.post("/settings/", json={"year": 2024, "currency": "EUR"}, headers=auth_headers)
+    food = await create_item(client, auth_headers, "Food", "expense")
+    await import_csv(client, auth_headers, f"date,amount,budget_item_id\n2024-01-10,500,{food}\n2024-06-10,700,{food}\n2023-06-10,9999,{food}\n")
+
+    response = await client.post("/budget-items/rollover", json={"plan": "actual_average", "switch_year": False}, headers=auth_headers)
+    assert response.json()["monthly_values"] == 12
+
+    summary = (await client.get("/dashboard/summary?year=2025", headers=auth_headers)).json()
+    assert summary["monthly_series"][0]["expense"] == 100.0
+    assert summary["annual_totals"]["expense"]["planned"] == 1200.0
+    assert (await client.get("/settings/", headers=auth_headers)).json()[0]["year"] == 2024
+
+    assert (await client.post("/budget-items/rollover", json={"scale": {"fun": 2}}, headers=auth_headers)).status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_new_year_transactions_follow_the_rollover(client, auth_headers):
+    await client.post("/settings/", json={"year": 2024, "currency": "EUR"}, headers=auth_headers)
+    rent = await create_item(client, auth_headers, "Rent", "expense")
+    await client.post("/budget-items/rollover", json={}, headers=auth_headers)
+    clone = (await client.get("/budget-items/", headers=auth_headers)).json()
+    assert [(item["name"], item["year"]) for item in clone] == [("Rent", 2025)]
+    assert len((await client.get("/budget-items/?all_years=true", headers=auth_headers)).json()) == 2
+
+    # Booked against the original item, the transaction lands on its 2025 clone
+    response = await client.post("/transactions/", json={"date": "2025-02-01", "amount": 950, "budget_item_id": rent}, headers=auth_headers)
+    assert response.json()["budget_item_id"] == clone[0]["id"]
+    await import_csv(client, auth_headers, f"date,amount,budget_item_id\n2025-03-01,50,{rent}\n2024-12-01,10,{clone[0]['id']}\n")
+    for backend in ("rollup", "python", "sql"):
+        summary = (await client.get(f"/dashboard/summary?backend={backend}", headers=auth_headers)).json()
+        assert summary["annual_totals"]["expense"]["actual"] == 1000.0
+        summary = (await client.get(f"/dashboard/summary?year=2024&backend={backend}", headers=auth_headers)).json()
+        assert summary["annual_totals"]["expense"]["actual"] == 10.0
+
+    # Items created after the rollover belong to the new year only
+    gym = (await client.post("/budget-items/", json={"name": "Gym", "category": "expense"}, headers=auth_headers)).json()
+    assert gym["year"] == 2025
+    response = await client.post("/transactions/", json={"date": "2024-05-01", "amount": 30, "budget_item_id": gym["id"]}, headers=auth_headers)
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_actual_average_of_a_running_year_uses_elapsed_months(client, auth_headers, session_factory):
+    food = await create_item(client, auth_headers, "Food", "expense")
+    await import_csv(client, auth_headers, f"date,amount,budget_item_id\n2024-01-10,300,{food}\n2024-03-10,300,{food}\n")
+    async with session_factory() as db:
+        user_id = (await db.execute(select(BudgetItem.user_id).where(BudgetItem.id == food))).scalar_one()
+        await clone_year(db, user_id, 2024, 2025, {}, "actual_average", as_of=date(2024, 6, 15))
+        planned = (await db.execute(
+            select(MonthlyValue.planned_amount).join(BudgetItem).where(BudgetItem.year == 2025)
+        )).scalars().all()
+    assert planned == [100] * 12
@@ -0,0 +1,65 @@
+import pytest
+
+
+async def create_item(client, headers, name, category):
+    response = await client.post("/budget-items/", json={"name": name, "category": category}, headers=headers)
+    return response.json()["id"]
+
+
+async def import_csv(client, headers, body):
+    response = await client.post("/transactions/bulk", content=body.encode(), headers={**headers, "Content-Type": "text/csv"})
+    assert response.status_code == 200 and response.json()["failed"] == 0
+
+
+@pytest.mark.asyncio
+async def test_keyset_pagination_walks_all_rows_once(client, auth_headers):
+    rent = await create_item(client, auth_headers, "Rent", "expense")
+    salary = await create_item(client, auth_headers, "Salary", "income")
+    lines = ["date,amount,budget_item_id"]
+    for i in range(25):
+        lines.append(f"2024-{i % 3 + 1:02d}-01,{i},{rent if i % 2 else salary}")
+    await import_csv(client, auth_headers, "\n".join(lines) + "\n")
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        url = "/transactions/?limit=10" + (f"&cursor={cursor}" if cursor else "")
+        response = await client.get(url, headers=auth_headers)
+        assert response.status_code == 200
+        page = response.json()
+        pages += 1
+        seen.extend(page)
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert pages == 3
+    assert len({tx["id"] for tx in seen}) == 25
+    keys = [(tx["date"], tx["id"]) for tx in seen]
+    assert keys == sorted(keys, reverse=True)
+    assert "budget_item" not in seen[0]
+
+
+@pytest.mark.asyncio
+async def test_filters_and_expand(client, auth_headers):
+    rent = await create_item(client, auth_headers, "Rent", "expense")
+    salary = await create_item(client, auth_headers, "Salary", "income")
+    await client.post("/monthly-values/", json={"budget_item_id": rent, "month": 1, "planned_amount": 900}, headers=auth_headers)
+    await import_csv(client, auth_headers, (
+        "date,amount,budget_item_id\n"
+        f"2024-01-01,900,{rent}\n2024-02-01,900,{rent}\n2024-01-31,3000,{salary}\n"
+    ))
+
+    page = (await client.get("/transactions/?category=Income", headers=auth_headers)).json()
+    assert [tx["budget_item_id"] for tx in page] == [salary]
+
+    page = (await client.get(f"/transactions/?budget_item_id={rent}&date_from=2024-01-15", headers=auth_headers)).json()
+    assert [tx["date"] for tx in page] == ["2024-02-01"]
+
+    page = (await client.get("/transactions/?date_to=2024-01-31&expand=budget_item", headers=auth_headers)).json()
+    assert [tx["budget_item"]["name"] for tx in page] == ["Salary", "Rent"]
+    assert "monthly_values" not in page[0]["budget_item"]
+
+    page = (await client.get(f"/transactions/?budget_item_id={rent}&expand=budget_item.monthly_values", headers=auth_headers)).json()
+    assert float(page[0]["budget_item"]["monthly_values"][0]["planned_amount"]) == 900
+
+    assert (await client.get("/transactions/?expand=user", headers=auth_headers)).status_code == 400
+    assert (await client.get("/transactions/?cursor=!!!", headers=auth_headers)).status_code == 400
@@ -0,0 +1,50 @@
+import io
+import os
+
+import pytest
+
+from services import rollups
+
+TEMPLATE = os.path.join(os.path.dirname(__file__), "..", "Yearly Budget Template.xlsm")
+
+
+async def upload(client, headers, data, filename="budget.xlsm"):
+    return await client.post("/import/workbook", files={"file": (filename, data)}, headers=headers)
+
+
+@pytest.mark.asyncio
+async def test_bundled_template_import(client, session_factory, auth_headers):
+    pytest.importorskip("openpyxl")
+    with open(TEMPLATE, "rb") as f:
+        data = f.read()
+
+    response = await upload(client, auth_headers, data)
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert (result["year"], result["currency"]) == (2025, "EUR")
+    assert result["items_created"] == 21
+    assert result["monthly_values"] == 21 * 12
+    assert result["transactions"] == {"inserted": 83, "failed": 0, "errors": []}
+
+    items = {i["name"]: i for i in (await client.get("/budget-items/", headers=auth_headers)).json()}
+    assert items["Side Gigs"]["category"] == "income" and items["Side Gigs"]["type"] == "active"
+    assert items["CAF"]["type"] == "passive"
+    assert sorted(float(v["planned_amount"]) for v in items["Side Gigs"]["monthly_values"])[-1] == 1500
+
+    summary = (await client.get("/dashboard/summary?year=2025", headers=auth_headers)).json()
+    assert summary["annual_totals"]["income"]["planned"] == 29890
+    assert summary["settings"] == {"year": 2025, "currency": "EUR"}
+    async with session_factory() as db:
+        assert await rollups.verify(db) == []
+
+    # A second import reuses the items, overwrites the plan and appends the log again
+    result = (await upload(client, auth_headers, data)).json()
+    assert result["items_created"] == 0
+    assert result["transactions"]["inserted"] == 83
+
+
+@pytest.mark.asyncio
+async def test_rejects_non_workbook(client, auth_headers):
+    pytest.importorskip("openpyxl")
+    response = await upload(client, auth_headers, io.BytesIO(b"date,amount\n"), "budget.csv")
+    assert response.status_code == 400